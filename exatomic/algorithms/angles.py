@@ -4,10 +4,14 @@
 """
 Two Body Properties Computations
 #####################################
+Bond angles are computed from a compressed sparse row (CSR) adjacency of the
+bonded (or all) pairs of the atom two body table; all triplets (one center,
+two neighbors) are enumerated in compiled code, across all frames at once.
 """
 import numpy as np
 import numba as nb
 import pandas as pd
+from multiprocessing.pool import ThreadPool
 from IPython.display import display
 from ipywidgets import FloatProgress
 from exatomic.base import nbpll
@@ -33,13 +37,195 @@ def angles(dx, dy, dz, dr, atom0, atom1):
     return rad, adx
 
 
+@nb.jit(nopython=True, nogil=True)
+def _bond_csr(atom0, atom1, dx, dy, dz, natom):
+    """
+    Build the CSR adjacency of pairs (given by atom positions, 0 to natom - 1)
+    with the vectors from each atom to its neighbors.
+
+    Pair vectors follow the two body convention, (dx, dy, dz) pointing from
+    atom1 to atom0.
+
+    Returns:
+        indptr (array): Offsets of the neighbors of each atom (length natom + 1)
+        nbr (array): Neighbor atom positions
+        vx, vy, vz (array): Vectors from the atom to its neighbors
+    """
+    indptr = np.zeros((natom + 1, ), dtype=np.int64)
+    for p in range(len(atom0)):
+        indptr[atom0[p] + 1] += 1
+        indptr[atom1[p] + 1] += 1
+    for i in range(natom):
+        indptr[i + 1] += indptr[i]
+    fill = indptr[:-1].copy()
+    n = indptr[natom]
+    nbr = np.empty((n, ), dtype=np.int64)
+    vx = np.empty((n, ), dtype=np.float64)
+    vy = np.empty((n, ), dtype=np.float64)
+    vz = np.empty((n, ), dtype=np.float64)
+    for p in range(len(atom0)):
+        i = atom0[p]
+        j = atom1[p]
+        k = fill[i]
+        nbr[k] = j
+        vx[k] = -dx[p]
+        vy[k] = -dy[p]
+        vz[k] = -dz[p]
+        fill[i] += 1
+        k = fill[j]
+        nbr[k] = i
+        vx[k] = dx[p]
+        vy[k] = dy[p]
+        vz[k] = dz[p]
+        fill[j] += 1
+    return indptr, nbr, vx, vy, vz
+
+
+@nb.jit(nopython=True, nogil=True)
+def _triplet_fill(indptr, nbr, vx, vy, vz, offset, c0, c1, center, atom1, atom2, rad):
+    """
+    Fill the angles of all triplets centered on atoms c0 to c1 (triplets of
+    center c start at offset[c]).
+    """
+    for c in range(c0, c1):
+        k = offset[c]
+        for p in range(indptr[c], indptr[c + 1]):
+            rp = np.sqrt(vx[p]**2 + vy[p]**2 + vz[p]**2)
+            for q in range(p + 1, indptr[c + 1]):
+                rq = np.sqrt(vx[q]**2 + vy[q]**2 + vz[q]**2)
+                cos = (vx[p]*vx[q] + vy[p]*vy[q] + vz[p]*vz[q])/(rp*rq)
+                center[k] = c
+                atom1[k] = nbr[p]
+                atom2[k] = nbr[q]
+                rad[k] = np.arccos(min(max(cos, -1.0), 1.0))
+                k += 1
+
+
+def _pair_vectors(universe, atom_two):
+    """
+    Vectors (dx, dy, dz) of two body pairs; computed from atomic positions
+    (minimum image convention for periodic universes) if not present.
+    """
+    if "dx" in atom_two.columns:
+        return [atom_two[c].values.astype(np.float64) for c in ("dx", "dy", "dz")]
+    idx = universe.atom.index
+    xyz = universe.atom[['x', 'y', 'z']].values.astype(np.float64)
+    i0 = _positions(idx, atom_two['atom0'].values)
+    d = xyz[i0] - xyz[_positions(idx, atom_two['atom1'].values)]
+    if universe.periodic:
+        cols = ["xi", "yi", "zi", "xj", "yj", "zj", "xk", "yk", "zk"]
+        frames = universe.atom['frame'].values[i0]
+        cells = universe.frame.loc[frames, cols].values.astype(np.float64).reshape(-1, 3, 3)
+        frac = np.einsum('ni,nij->nj', d, np.linalg.inv(cells))
+        d -= np.einsum('nj,njk->nk', np.round(frac), cells)
+    return d[:, 0], d[:, 1], d[:, 2]
+
+
+def _positions(index, labels):
+    """Positions of atom index values in index; raises if any is missing."""
+    pos = index.get_indexer(labels)
+    if (pos < 0).any():
+        raise KeyError('Pairs reference atoms not in the atom table: {}.'.format(
+                       np.unique(np.asarray(labels)[pos < 0])[:10].tolist()))
+    return pos
+
+
+def _angle_table(index, atom0, atom1, dx, dy, dz, workers=1):
+    """
+    Enumerate all angles among pairs of atoms (see
+    :func:`~exatomic.algorithms.angles.compute_angles`).
+
+    Args:
+        index (array): Atom index values
+        atom0 (array): Atom index values of the first atom of each pair
+        atom1 (array): Atom index values of the second atom of each pair
+        dx, dy, dz (array): Pair vectors (pointing from atom1 to atom0)
+        workers (int): Number of threads among which atoms (centers) are distributed
+
+    Returns:
+        angles (:class:`~pandas.DataFrame`): Center (atom0), neighbors (atom1, atom2), angle (radians)
+    """
+    index = pd.Index(index)
+    natom = len(index)
+    indptr, nbr, vx, vy, vz = _bond_csr(_positions(index, atom0), _positions(index, atom1),
+                                        dx, dy, dz, natom)
+    deg = np.diff(indptr)
+    offset = np.zeros((natom + 1, ), dtype=np.int64)
+    np.cumsum(deg*(deg - 1)//2, out=offset[1:])
+    n = offset[-1]
+    center = np.empty((n, ), dtype=np.int64)
+    first = np.empty((n, ), dtype=np.int64)
+    second = np.empty((n, ), dtype=np.int64)
+    rad = np.empty((n, ), dtype=np.float64)
+    # Split centers into chunks of (about) equal numbers of triplets
+    cuts = np.searchsorted(offset, np.linspace(0, n, max(workers, 1) + 1))
+    cuts[0] = 0
+    cuts[-1] = natom
+    chunks = [(cuts[i], cuts[i + 1]) for i in range(len(cuts) - 1)]
+
+    def run(chunk):
+        _triplet_fill(indptr, nbr, vx, vy, vz, offset, chunk[0], chunk[1],
+                      center, first, second, rad)
+
+    if workers > 1:
+        pool = ThreadPool(workers)
+        try:
+            pool.map(run, chunks)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for chunk in chunks:
+            run(chunk)
+    values = index.values
+    return pd.DataFrame.from_dict({'atom0': values[center], 'atom1': values[first],
+                                   'atom2': values[second], 'angle': rad})
+
+
+def compute_angles(universe, bond=True, workers=1):
+    """
+    Compute all (bond) angles of all frames in a single pass.
+
+    .. code-block:: python
+
+        uni.compute_atom_two(vector=True)
+        angles = compute_angles(uni)
+        angles['angle'].apply(np.degrees).hist()
+
+    Args:
+        universe (:class:`~exatomic.core.universe.Universe`): Universe with atom two body data
+        bond (bool): Restrict to bond angles (default True)
+        workers (int): Number of threads among which the angles are computed
+
+    Returns:
+        angles (:class:`~pandas.DataFrame`): Central atom (atom0), neighbors (atom1, atom2), angle (radians), and frame
+
+    Note:
+        Pair vectors are taken from the two body table if present (see
+        the vector argument of :func:`~exatomic.core.two.compute_atom_two`)
+        and computed from the atomic positions otherwise.
+
+    Warning:
+        If bond is set to False, the number of angles may be very large.
+    """
+    two = universe.atom_two
+    if bond:
+        two = two[two['bond'] == True]
+    dx, dy, dz = _pair_vectors(universe, two)
+    adf = _angle_table(universe.atom.index.values, two['atom0'].values,
+                       two['atom1'].values, dx, dy, dz, workers=workers)
+    adf['frame'] = universe.atom['frame'].values[universe.atom.index.get_indexer(adf['atom0'])]
+    return adf
+
+
 # Angles
 def compute_angles_out_of_core(hdfname, uni, bond=True):
     """
     Given an HDF of atom two body properties, compute angles.
 
     Atomic two body data is expected to have been computed (see
-    :func:`~exatomic.core.two.compute_atom_two_out_of_core`)
+    :func:`~exatomic.core.two.compute_atom_two_out_of_core`); angles of each
+    frame are stored with keys of the form ``frame_fdx/atom_angle``.
 
     Args:
         hdfname (str): Path to HDF file containing two body data
@@ -50,28 +236,20 @@ def compute_angles_out_of_core(hdfname, uni, bond=True):
         If bond is set to False, this process may take a very long time.
     """
     store = pd.HDFStore(hdfname, mode="a")
-    f = u.atom['frame'].unique()
+    f = uni.atom['frame'].unique()
     n = len(f)
     fp = FloatProgress(description="Computing:")
     display(fp)
     for i, fdx in enumerate(f):
         tdf = store.get("frame_"+str(fdx) + "/atom_two")
-        indexes = []
-        radians = []
-        for atom0, group in tdf[tdf['bond'] == True].groupby("atom0"):
-            dx = group['dx'].values.astype(float)
-            dy = group['dy'].values.astype(float)
-            dz = group['dz'].values.astype(float)
-            dr = group['dr'].values.astype(float)
-            atom1 = group['atom1'].values.astype(int)
-            rad, adx = angles(dx, dy, dz, dr, atom0, atom1)
-            indexes.append(adx)
-            radians.append(rad)
-        indexes = np.concatenate(indexes)
-        radians = np.concatenate(radians)
-        adf = pd.DataFrame(indexes, columns=("atom0", "atom1", "atom2"))
-        adf['angle'] = radians
+        if bond:
+            tdf = tdf[tdf['bond'] == True]
+        index = uni.atom.index[uni.atom['frame'] == fdx].values
+        adf = _angle_table(index, tdf['atom0'].values, tdf['atom1'].values,
+                           tdf['dx'].values.astype(np.float64),
+                           tdf['dy'].values.astype(np.float64),
+                           tdf['dz'].values.astype(np.float64))
         store.put("frame_"+str(fdx) + "/atom_angle", adf)
-        fp.value = i/n*100
+        fp.value = (i + 1)/n*100
     store.close()
     fp.close()
@@ -16,6 +16,7 @@ from collections import OrderedDict, Counter, defaultdict
 from itertools import combinations_with_replacement as cwr
 import numpy as np
 import pandas as pd
+from numba import jit
 from numexpr import evaluate
 try:
     from symengine import var, exp, cos, sin, Mul, Integer, Float
@@ -23,8 +24,12 @@ except ImportError:
     from sympy import symbols as var
     from sympy import exp, cos, sin, Mul, Integer, Float
 from exa import Series
-from exatomic.algorithms.overlap import _cartesian_shell_pairs, _iter_atom_shells
-from exatomic.algorithms.numerical import fac, _tri_indices, _triangle, _enum_spherical
+from exatomic.base import nbche
+from exatomic.algorithms.overlap import (_iter_atom_shells, overlap_integrals,
+                                        shell_pair_integrals)
+from exatomic.algorithms.car2sph import solid_harmonic_table
+from exatomic.algorithms.numerical import (fac, _tri_indices, _enum_spherical,
+                                           norm_contract)
 
 
 _x, _y, _z = var("_x _y _z")
@@ -247,10 +252,273 @@ def evaluate_expr(expr, xs, ys, zs, arr=None, alpha=None):
     return evaluate(str(expr.subs(subs)))
 
 
+def _harmonic_table(sh):
+    """Numerical coefficients of (symbolic) angular functions in terms of
+    cartesian monomials (ordered as in enum_cartesian).
+
+    Args:
+        sh (OrderedDict): symbolic solid harmonics, sh[L][ml]
+
+    Returns:
+        table (np.ndarray): table[L, k, ml + L] is the coefficient of monomial k
+    """
+    lmax = max(sh.keys())
+    table = np.zeros((lmax + 1, cart_lml_count[lmax], 2 * lmax + 1))
+    for L, mls in sh.items():
+        if not L:
+            table[0, 0, 0] = float(mls[0])
+            continue
+        cdxs = [reduce(mul, xyz) for xyz in cwr((_x, _y, _z), L)]
+        for ml, sym in mls.items():
+            coefs = sym.expand().as_coefficients_dict()
+            for crt, coef in coefs.items():
+                if isinstance(crt, (Integer, Float)): continue
+                table[L, cdxs.index(crt), ml + L] = float(coef)
+    return table
+
+
+def _cartesian_powers(lmax):
+    """Cartesian powers of the monomials of each L (as in enum_cartesian)."""
+    powers = np.zeros((lmax + 1, cart_lml_count[lmax], 3), dtype=np.int64)
+    for L in range(lmax + 1):
+        powers[L, :cart_lml_count[L]] = enum_cartesian[L]
+    return powers
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _evaluate_terms(xs, ys, zs, gaussian, shl_L, prim_ptr, alphas, rs,
+                    coef_ptr, coefs, ncont, blk_shl, blk_xyz, term_ptr,
+                    term_row, term_sph, term_col, term_cont, term_fac,
+                    table, powers, blk_cut2, chk_ptr, chk_box, out):
+    """Accumulate basis function values on a numerical grid.
+
+    Basis functions are sums of terms, each the product of an angular
+    function (a cartesian monomial or a combination of monomials given by
+    table), a contracted radial function of a shell, and a factor. Terms
+    are grouped in blocks sharing a shell and a center so that the radial
+    functions and monomials are computed once per block and point.
+
+    Args:
+        xs, ys, zs (np.ndarray): 1D-arrays of grid points
+        gaussian (bool): exponential dependence on r2 (else on r)
+        shl_L (np.ndarray): angular momentum of each shell
+        prim_ptr (np.ndarray): offsets of the primitives of each shell
+        alphas (np.ndarray): primitive exponents
+        rs (np.ndarray): primitive radial powers (Slater type functions)
+        coef_ptr (np.ndarray): offsets of the (nprim, ncont) normalized coefficients
+        coefs (np.ndarray): normalized contraction coefficients
+        ncont (np.ndarray): number of contracted functions of each shell
+        blk_shl (np.ndarray): shell of each block
+        blk_xyz (np.ndarray): center of each block
+        term_ptr (np.ndarray): offsets of the terms of each block
+        term_row (np.ndarray): basis function (row of out) of each term
+        term_sph (np.ndarray): angular function given by table (else a monomial)
+        term_col (np.ndarray): column of table (or monomial) of each term
+        term_cont (np.ndarray): contracted function of each term
+        term_fac (np.ndarray): factor of each term
+        table (np.ndarray): see :func:`~exatomic.algorithms.basis._harmonic_table`
+        powers (np.ndarray): see :func:`~exatomic.algorithms.basis._cartesian_powers`
+        blk_cut2 (np.ndarray): squared cutoff radius of each block (np.inf if unscreened)
+        chk_ptr (np.ndarray): offsets of the chunks of points
+        chk_box (np.ndarray): bounding boxes of the chunks (xmin, ymin, zmin, xmax, ymax, zmax)
+        out (np.ndarray): (nbf, npts) array in which values are accumulated
+    """
+    for b in range(len(blk_shl)):
+        s = blk_shl[b]
+        L = shl_L[s]
+        nc = (L + 1) * (L + 2) // 2
+        p0 = prim_ptr[s]
+        p1 = prim_ptr[s + 1]
+        c0 = coef_ptr[s]
+        nct = ncont[s]
+        radial = np.empty(nct)
+        mono = np.empty(nc)
+        px = np.empty(L + 1)
+        py = np.empty(L + 1)
+        pz = np.empty(L + 1)
+        px[0] = 1.
+        py[0] = 1.
+        pz[0] = 1.
+        cut2 = blk_cut2[b]
+        for h in range(len(chk_ptr) - 1):
+            d2 = 0.
+            for j in range(3):
+                d = max(chk_box[h, j] - blk_xyz[b, j], blk_xyz[b, j] - chk_box[h, j + 3], 0.)
+                d2 += d * d
+            if d2 > cut2:
+                continue
+            for i in range(chk_ptr[h], chk_ptr[h + 1]):
+                dx = xs[i] - blk_xyz[b, 0]
+                dy = ys[i] - blk_xyz[b, 1]
+                dz = zs[i] - blk_xyz[b, 2]
+                r2 = dx * dx + dy * dy + dz * dz
+                if r2 > cut2:
+                    continue
+                r = np.sqrt(r2)
+                for c in range(nct):
+                    radial[c] = 0.
+                for p in range(p0, p1):
+                    if gaussian:
+                        e = np.exp(-alphas[p] * r2)
+                    else:
+                        e = r ** rs[p] * np.exp(-alphas[p] * r)
+                    for c in range(nct):
+                        radial[c] += coefs[c0 + (p - p0) * nct + c] * e
+                for l in range(1, L + 1):
+                    px[l] = px[l - 1] * dx
+                    py[l] = py[l - 1] * dy
+                    pz[l] = pz[l - 1] * dz
+                for k in range(nc):
+                    mono[k] = (px[powers[L, k, 0]] * py[powers[L, k, 1]] *
+                               pz[powers[L, k, 2]])
+                for t in range(term_ptr[b], term_ptr[b + 1]):
+                    if term_sph[t]:
+                        ang = 0.
+                        for k in range(nc):
+                            ang += table[L, k, term_col[t]] * mono[k]
+                    else:
+                        ang = mono[term_col[t]]
+                    out[term_row[t], i] += term_fac[t] * ang * radial[term_cont[t]]
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _evaluate_terms_diff(xs, ys, zs, gaussian, shl_L, prim_ptr, alphas, rs,
+                         coef_ptr, coefs, ncont, blk_shl, blk_xyz, term_ptr,
+                         term_row, term_sph, term_col, term_cont, term_fac,
+                         table, powers, out):
+    """Accumulate basis function values, gradients and Laplacians on a
+    numerical grid in one pass (see :func:`~exatomic.algorithms.basis._evaluate_terms`).
+
+    Each term is the product of an angular polynomial A and a radial function
+    R so :math:`\\nabla(AR) = R\\nabla A + A\\nabla R` and
+    :math:`\\nabla^{2}(AR) = R\\nabla^{2}A + 2\\nabla A\\cdot\\nabla R + A\\nabla^{2}R`,
+    where :math:`\\nabla R = \\mathbf{r}R'/r` and
+    :math:`\\nabla^{2}R = R'' + 2R'/r`.
+
+    Args:
+        out (np.ndarray): (5, nbf, npts) array in which values, x, y and z
+                          derivatives and Laplacians are accumulated, or
+                          (4, nbf, npts) to skip the Laplacians
+    """
+    nder = out.shape[0]
+    for b in range(len(blk_shl)):
+        s = blk_shl[b]
+        L = shl_L[s]
+        nc = (L + 1) * (L + 2) // 2
+        p0 = prim_ptr[s]
+        p1 = prim_ptr[s + 1]
+        c0 = coef_ptr[s]
+        nct = ncont[s]
+        rad = np.empty((3, nct))
+        mono = np.empty((5, nc))
+        ang = np.empty(5)
+        px = np.empty(L + 1)
+        py = np.empty(L + 1)
+        pz = np.empty(L + 1)
+        px[0] = 1.
+        py[0] = 1.
+        pz[0] = 1.
+        for i in range(len(xs)):
+            dx = xs[i] - blk_xyz[b, 0]
+            dy = ys[i] - blk_xyz[b, 1]
+            dz = zs[i] - blk_xyz[b, 2]
+            r2 = dx * dx + dy * dy + dz * dz
+            r = np.sqrt(r2)
+            for c in range(nct):
+                rad[0, c] = 0.
+                rad[1, c] = 0.
+                rad[2, c] = 0.
+            for p in range(p0, p1):
+                a = alphas[p]
+                if gaussian:
+                    e = np.exp(-a * r2)
+                    # R'/r and R'' + 2R'/r
+                    d1 = -2. * a * e
+                    d2 = (4. * a * a * r2 - 6. * a) * e
+                elif r > 0.:
+                    n = rs[p]
+                    e = r ** n * np.exp(-a * r)
+                    f1 = (n / r - a) * e
+                    f2 = ((n / r - a) ** 2 - n / r2) * e
+                    d1 = f1 / r
+                    d2 = f2 + 2. * d1
+                else:
+                    e = 1. if rs[p] == 0 else 0.
+                    d1 = 0.
+                    d2 = 0.
+                for c in range(nct):
+                    cf = coefs[c0 + (p - p0) * nct + c]
+                    rad[0, c] += cf * e
+                    rad[1, c] += cf * d1
+                    rad[2, c] += cf * d2
+            for l in range(1, L + 1):
+                px[l] = px[l - 1] * dx
+                py[l] = py[l - 1] * dy
+                pz[l] = pz[l - 1] * dz
+            for k in range(nc):
+                lx = powers[L, k, 0]
+                ly = powers[L, k, 1]
+                lz = powers[L, k, 2]
+                vx = px[lx]
+                vy = py[ly]
+                vz = pz[lz]
+                gx = lx * px[lx - 1] if lx > 0 else 0.
+                gy = ly * py[ly - 1] if ly > 0 else 0.
+                gz = lz * pz[lz - 1] if lz > 0 else 0.
+                mono[0, k] = vx * vy * vz
+                mono[1, k] = gx * vy * vz
+                mono[2, k] = vx * gy * vz
+                mono[3, k] = vx * vy * gz
+                if nder > 4:
+                    hx = lx * (lx - 1) * px[lx - 2] if lx > 1 else 0.
+                    hy = ly * (ly - 1) * py[ly - 2] if ly > 1 else 0.
+                    hz = lz * (lz - 1) * pz[lz - 2] if lz > 1 else 0.
+                    mono[4, k] = hx * vy * vz + vx * hy * vz + vx * vy * hz
+            for t in range(term_ptr[b], term_ptr[b + 1]):
+                if term_sph[t]:
+                    for j in range(nder):
+                        ang[j] = 0.
+                        for k in range(nc):
+                            ang[j] += table[L, k, term_col[t]] * mono[j, k]
+                else:
+                    for j in range(nder):
+                        ang[j] = mono[j, term_col[t]]
+                f = term_fac[t]
+                rv = rad[0, term_cont[t]]
+                rg = rad[1, term_cont[t]]
+                rl = rad[2, term_cont[t]]
+                row = term_row[t]
+                out[0, row, i] += f * ang[0] * rv
+                out[1, row, i] += f * (ang[1] * rv + ang[0] * dx * rg)
+                out[2, row, i] += f * (ang[2] * rv + ang[0] * dy * rg)
+                out[3, row, i] += f * (ang[3] * rv + ang[0] * dz * rg)
+                if nder > 4:
+                    out[4, row, i] += f * (ang[4] * rv + ang[0] * rl + 2. * rg *
+                                           (dx * ang[1] + dy * ang[2] + dz * ang[3]))
+
+
+def _chunk_boxes(xs, ys, zs, chunk):
+    """Split points into chunks (in order) and compute their bounding boxes.
+
+    Returns:
+        chk_ptr (np.ndarray): offsets of the chunks
+        chk_box (np.ndarray): (xmin, ymin, zmin, xmax, ymax, zmax) of each chunk
+    """
+    npts = len(xs)
+    chk_ptr = np.append(np.arange(0, npts, chunk), npts).astype(np.int64)
+    chk_box = np.empty((len(chk_ptr) - 1, 6))
+    for j, v in enumerate((xs, ys, zs)):
+        chk_box[:, j] = np.minimum.reduceat(v, chk_ptr[:-1]) if npts else 0.
+        chk_box[:, j + 3] = np.maximum.reduceat(v, chk_ptr[:-1]) if npts else 0.
+    return chk_ptr, chk_box
+
+
 class BasisFunctions(object):
     """Composition wrapper class that leverages symbolic expressions using
     symengine and numexpr, using values extracted from the numerical Shell
-    jitclasses, to evaluate basis functions on a numerical grid.
+    jitclasses, to evaluate basis functions on a numerical grid. Numerical
+    evaluation uses a compiled kernel operating on the flattened shells
+    (see :func:`~exatomic.algorithms.basis._evaluate_terms`).
 
     Args:
         uni (:class:`exatomic.core.universe.Universe`): a universe with basis set
@@ -259,15 +527,70 @@ class BasisFunctions(object):
     """
 
 
-    def integrals(self):
-        """Compute the overlap matrix using primitive cartesian integrals."""
+    def integrals(self, screen=1e-14, workers=1):
+        """Compute the overlap matrix using primitive cartesian integrals.
+
+        Args:
+            screen (float): skip shell pairs whose overlap is bounded by screen
+            workers (int): number of threads over blocks of shell pairs
+        """
         from exatomic.core.basis import Overlap
-        ovl = _cartesian_shell_pairs(len(self), self._ptrs.astype(np.int64),
-                                     self._xyzs, *self._shells)
-        ovl = _triangle(ovl)
+        ovl = overlap_integrals(self._ptrs, self._xyzs, self._shls,
+                                screen=screen, workers=workers)
         chi0, chi1 = _tri_indices(ovl)
         return Overlap.from_dict({'chi0': chi0, 'chi1': chi1,
-                                  'frame': 0, 'coef': ovl})
+                                  'frame': self._frame, 'coef': ovl})
+
+
+    def kinetic(self, screen=1e-14, workers=1):
+        """Compute the kinetic energy matrix (in the same layout as
+        :meth:`~exatomic.algorithms.basis.BasisFunctions.integrals`).
+
+        Args:
+            screen (float): skip shell pairs whose integrals are bounded by screen
+            workers (int): number of threads over blocks of shell pairs
+        """
+        from exatomic.core.basis import Overlap
+        kin = shell_pair_integrals(self._ptrs, self._xyzs, self._shls,
+                                   kind='kinetic', screen=screen,
+                                   workers=workers)[0]
+        chi0, chi1 = _tri_indices(kin)
+        return Overlap.from_dict({'chi0': chi0, 'chi1': chi1,
+                                  'frame': self._frame, 'coef': kin})
+
+
+    def multipole(self, order=1, origin=None, screen=1e-14, workers=1):
+        """Compute dipole (columns ix1, ix2, ix3 for x, y, z) and, for
+        order 2, quadrupole (columns ix11, ix12, ix13, ix22, ix23, ix33)
+        integrals of the basis functions, as in a parsed multipole table.
+
+        .. code-block:: python
+
+            uni.multipole = uni.basis_functions.multipole()
+            exc = Excitation.from_universe(uni)
+
+        Args:
+            order (int): highest multipole order (1 or 2)
+            origin (iter): origin of the operators (default 0, 0, 0)
+            screen (float): skip shell pairs whose integrals are bounded by screen
+            workers (int): number of threads over blocks of shell pairs
+        """
+        if order not in (1, 2):
+            raise ValueError("order must be 1 or 2")
+        args = (self._ptrs, self._xyzs, self._shls)
+        kws = {'origin': origin, 'screen': screen, 'workers': workers}
+        ints = [shell_pair_integrals(*args, kind='dipole', **kws)]
+        cols = ['ix1', 'ix2', 'ix3']
+        if order == 2:
+            ints.append(shell_pair_integrals(*args, kind='quadrupole', **kws))
+            cols += ['ix11', 'ix12', 'ix13', 'ix22', 'ix23', 'ix33']
+        ints = np.concatenate(ints)
+        chi0, chi1 = _tri_indices(ints[0])
+        mltpl = pd.DataFrame(ints.T, columns=cols)
+        mltpl['chi0'] = chi0
+        mltpl['chi1'] = chi1
+        mltpl['frame'] = self._frame
+        return mltpl[['chi0', 'chi1'] + cols + ['frame']]
 
 
     def enum_shell(self, shl):
@@ -279,7 +602,8 @@ class BasisFunctions(object):
         return shl.enum_spherical() if shl.spherical else shl.enum_cartesian()
 
 
-    def evaluate(self, xs=None, ys=None, zs=None, irrep=None, verbose=False):
+    def evaluate(self, xs=None, ys=None, zs=None, irrep=None, verbose=False,
+                 symbolic=False, screen=None):
         """Evaluate basis functions on a numerical grid.
 
         Args:
@@ -288,12 +612,21 @@ class BasisFunctions(object):
             zs (np.ndarray): 1D-array of z values
             verbose (bool): print code pathway
             irrep (int,OrderedDict): irrep or {irrep: [vectors] for irrep in irreps}
+            symbolic (bool): evaluate symbolic expressions with numexpr (default False)
+            screen (float): skip (zero) values smaller than screen (default None)
 
         Note:
             Default behavior returns symbolic expressions if xs is None.
+            Otherwise basis functions are evaluated numerically (in compiled
+            code) directly from the shell exponents and coefficients.
+            If screen is given, each shell is only evaluated on the (chunks
+            of) grid points within a cutoff radius beyond which all of its
+            functions are bounded by screen.
             See :meth:`exatomic.algorithms.orbital_util.numerical_grid_from_field_params`
             for grid construction details.
         """
+        if xs is not None and not symbolic:
+            return self._evaluate_numerical(xs, ys, zs, irrep=irrep, screen=screen)
         if self._meta['gaussian']:
             if self._meta.get('symmetrized', False):
                 func = self._evaluate_gau_bso_sym
@@ -306,7 +639,8 @@ class BasisFunctions(object):
         return func(xs=xs, ys=ys, zs=zs, irrep=irrep)
 
 
-    def evaluate_diff(self, xs, ys, zs, cart='x', verbose=False):
+    def evaluate_diff(self, xs, ys, zs, cart='x', verbose=False, irrep=None,
+                      symbolic=False):
         """Evaluate basis function derivatives on a numerical grid.
 
         Args:
@@ -315,11 +649,16 @@ class BasisFunctions(object):
             zs (np.ndarray): 1D-array of z values
             cart (str): derivative with respect to cart (in ['x', 'y', 'z'])
             verbose (bool): print code pathway
+            irrep (int): if symmetrized, the irrep to which the basis functions belong
+            symbolic (bool): differentiate symbolic expressions (default False)
 
         Note:
             See :meth:`~exatomic.algorithms.orbital_util.numerical_grid_from_field_params`
-            for grid construction details.
+            for grid construction details. To evaluate all derivatives
+            at once see :meth:`~exatomic.algorithms.basis.BasisFunctions.evaluate_derivatives`.
         """
+        if not symbolic:
+            return self.evaluate_derivatives(xs, ys, zs, irrep=irrep)[1]['xyz'.index(cart)]
         if self._meta['program'] in ['nwchem']:
             raise NotImplementedError("Code up _evaluate_diff_gau_bso.")
         elif not self._meta['gaussian']:
@@ -331,6 +670,196 @@ class BasisFunctions(object):
         return self._evaluate_diff_gau(xs, ys, zs, cart)
 
 
+    def evaluate_derivatives(self, xs, ys, zs, irrep=None, laplacian=True):
+        """Evaluate basis functions, their gradients and their Laplacians on a
+        numerical grid in one pass of compiled code (see
+        :func:`~exatomic.algorithms.basis._evaluate_terms_diff`).
+
+        .. code-block:: python
+
+            bvs, grad, lapl = uni.basis_functions.evaluate_derivatives(x, y, z)
+            grad[0]                  # d/dx of each basis function
+
+        Args:
+            xs (np.ndarray): 1D-array of x values
+            ys (np.ndarray): 1D-array of y values
+            zs (np.ndarray): 1D-array of z values
+            irrep (int): if symmetrized, the irrep to which the basis functions belong
+            laplacian (bool): if False, skip the Laplacians (lapl is None)
+
+        Returns:
+            bvs (np.ndarray): (nbf, npts) basis function values
+            grad (np.ndarray): (3, nbf, npts) basis function gradients
+            lapl (np.ndarray): (nbf, npts) basis function Laplacians
+        """
+        shls = self._numerical_shells()
+        blks = self._numerical_terms(irrep)
+        flds = np.zeros((5 if laplacian else 4, blks[-1], len(xs)))
+        _evaluate_terms_diff(np.asarray(xs, dtype=np.float64),
+                             np.asarray(ys, dtype=np.float64),
+                             np.asarray(zs, dtype=np.float64),
+                             bool(self._meta['gaussian']),
+                             *(shls + blks[:-1] + (flds, )))
+        return flds[0], flds[1:4], (flds[4] if laplacian else None)
+
+
+    def _evaluate_numerical(self, xs, ys, zs, irrep=None, screen=None, chunk=256):
+        """Evaluates basis functions on a numerical grid in compiled code
+        (see :func:`~exatomic.algorithms.basis._evaluate_terms`)."""
+        shls = self._numerical_shells()
+        blks = self._numerical_terms(irrep)
+        nbf = blks[-1]
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        zs = np.asarray(zs, dtype=np.float64)
+        if screen is None:
+            cut2 = np.full(len(blks[0]), np.inf)
+            chk_ptr = np.array([0, len(xs)], dtype=np.int64)
+            chk_box = np.array([[-np.inf] * 3 + [np.inf] * 3])
+        else:
+            cut2 = self._cutoff_radii(irrep, screen) ** 2
+            chk_ptr, chk_box = _chunk_boxes(xs, ys, zs, chunk)
+        flds = np.zeros((nbf, len(xs)))
+        _evaluate_terms(xs, ys, zs, bool(self._meta['gaussian']),
+                        *(shls + blks[:-1] + (cut2, chk_ptr, chk_box, flds)))
+        return flds
+
+
+    def _cutoff_radii(self, irrep, screen):
+        """Radii of the blocks (shell, center) of terms beyond which all
+        terms are smaller than screen in magnitude.
+
+        Each primitive is bounded by :math:`Cr^{n}e^{-\\alpha r^{2}}` (or
+        :math:`e^{-\\alpha r}` for Slater type functions) where C collects
+        the magnitudes of the contraction coefficients, angular coefficients,
+        term factors and the number of primitives; the radius solves
+        :math:`Cr^{n}e^{-\\alpha r^{2}} = screen` by fixed point iteration."""
+        key = (irrep, screen)
+        if key in self._cutoffs:
+            return self._cutoffs[key]
+        shl_L, prim_ptr, alphas, rs, coef_ptr, coefs, ncont = self._numerical_shells()
+        blk_shl, _, term_ptr, _, term_sph, _, _, term_fac, table = \
+            self._numerical_terms(irrep)[:9]
+        angmax = np.maximum(np.abs(table).sum(axis=1).max(axis=1), 1.)
+        gaussian = self._meta['gaussian']
+        radii = np.empty(len(blk_shl))
+        for b, s in enumerate(blk_shl):
+            L = shl_L[s]
+            p0, p1 = prim_ptr[s], prim_ptr[s + 1]
+            a = alphas[p0:p1]
+            fac = np.abs(term_fac[term_ptr[b]:term_ptr[b + 1]]).max()
+            ang = angmax[L] if term_sph[term_ptr[b]:term_ptr[b + 1]].any() else 1.
+            c = np.abs(coefs[coef_ptr[s]:coef_ptr[s + 1]]).reshape(p1 - p0, -1).sum(axis=1)
+            lnc = np.log(np.maximum(c * ang * fac * (p1 - p0), 1e-300) / screen)
+            n = L + (0 if gaussian else rs[p0:p1])
+            r = (np.sqrt(np.maximum(lnc, 0) / a) + np.sqrt(n / a) + 1 if gaussian
+                 else np.maximum(lnc, 0) / a + n / a + 1)
+            for _ in range(50):
+                arg = np.maximum(lnc + n * np.log(r), 0) / a
+                r = np.sqrt(arg) if gaussian else arg
+                r = np.maximum(r, 1e-8)
+            radii[b] = r.max()
+        self._cutoffs[key] = radii
+        return radii
+
+
+    def _numerical_shells(self):
+        """Shell data (normalized contraction coefficients, exponents) as
+        contiguous arrays for compiled evaluation (see
+        :class:`~exatomic.algorithms.numerical.ShellArrays`)."""
+        if self._flat is not None:
+            return self._flat
+        shls = self._shls
+        lmax = max(shls.L.max(), self._lmax)
+        self._flat = (shls.L, shls.prim_ptr, shls.alphas, shls.rs,
+                      shls.coef_ptr, norm_contract(shls), shls.ncont)
+        table = solid_harmonic_table(lmax)
+        if self._scaled and lmax > 2:
+            table = table.copy()
+            table[2:] = solid_harmonic_table(lmax, scaled=True)[2:]
+        self._tables = (table, _cartesian_powers(lmax))
+        return self._flat
+
+
+    def _numerical_terms(self, irrep=None):
+        """Decompose basis functions into terms (shell, center, angular
+        function, contracted function, factor) grouped by shell and center,
+        in the same order as the symbolic evaluation pathways."""
+        if irrep in self._terms:
+            return self._terms[irrep]
+        if self._meta['gaussian']:
+            if self._meta.get('symmetrized', False):
+                terms = self._terms_bso(irrep, symmetrized=True)
+            elif self._meta['program'] in ['molcas']:
+                terms = self._terms_shells(self._meta['program'])
+            else:
+                terms = self._terms_bso()
+        else:
+            terms = self._terms_shells(self._meta['program'])
+        nbf = max(t[0] for t in terms) + 1 if terms else 0
+        # Group terms by block (shell, center), keeping their order otherwise
+        blocks = OrderedDict()
+        for t in terms:
+            blocks.setdefault((t[1], t[2]), []).append(t)
+        terms = [t for blk in blocks.values() for t in blk]
+        term_ptr = np.zeros(len(blocks) + 1, dtype=np.int64)
+        np.cumsum([len(blk) for blk in blocks.values()], out=term_ptr[1:])
+        blk_shl = np.array([k[0] for k in blocks], dtype=np.int64)
+        blk_xyz = np.array([self._xyzs[k[1]] for k in blocks],
+                           dtype=np.float64).reshape(-1, 3)
+        cols = list(zip(*terms)) if terms else [[]] * 7
+        self._terms[irrep] = (
+            blk_shl, blk_xyz, term_ptr,
+            np.array(cols[0], dtype=np.int64), np.array(cols[3], dtype=np.bool_),
+            np.array(cols[4], dtype=np.int64), np.array(cols[5], dtype=np.int64),
+            np.array(cols[6], dtype=np.float64)) + self._tables + (nbf, )
+        return self._terms[irrep]
+
+
+    def _terms_shells(self, program):
+        """Terms of basis functions enumerated by shell, angular function
+        and contracted function (Molcas Gaussian or Slater type functions)."""
+        terms, cnt = [], 0
+        sphr = self._meta['spherical']
+        shls = self._shls
+        for cen, shldx in self._ptrs:
+            L = shls.L[shldx]
+            sph = shls.spherical[shldx] if self._meta['gaussian'] else sphr
+            ang = [(True, ml + L) for ml in range(-L, L + 1)] if sph else \
+                  [(False, k) for k in range(cart_lml_count[L])]
+            for issph, col in ang:
+                for c in range(shls.ncont[shldx]):
+                    fac = 1. if self._meta['gaussian'] or sphr else self._pre[cnt]
+                    terms.append((cnt, shldx, cen, issph, col, c, fac))
+                    cnt += 1
+        return terms
+
+
+    def _terms_bso(self, irrep=None, symmetrized=False):
+        """Terms of basis functions in the order of the basis set order
+        table (including symmetry equivalent centers if symmetrized)."""
+        bso = self._bso if irrep is None else \
+            self._bso.groupby('irrep').get_group(irrep)
+        cache = defaultdict(int)
+        shldxs = {}
+        for cen, shldx in self._ptrs:
+            shldxs.setdefault((cen, self._shls.L[shldx]), shldx)
+        ocens = [c for col in bso.columns if col.startswith('ocen')
+                 for c in (col, col.replace('ocen', 'sign'))] if symmetrized else []
+        terms = []
+        for i, (cen, L, ml) in enumerate(zip(bso['center'], bso['L'], bso['ml'])):
+            shldx = shldxs[(cen, L)]
+            key = (bso['irrep'].iloc[i], cen, L, ml) if symmetrized else (cen, L, ml)
+            c = cache[key]
+            terms.append((i, shldx, cen, True, ml + L, c, 1.))
+            for oc, si in zip(ocens[::2], ocens[1::2]):
+                ocen = bso[oc].iloc[i]
+                if ocen >= 0:
+                    terms.append((i, shldx, ocen, True, ml + L, c, float(bso[si].iloc[i])))
+            cache[key] += 1
+        return terms
+
+
     def _radial(self, x, y, z, alphas, cs, rs=None, pre=None):
         """Generates the symbolic radial portion of a basis function.
         Substitutes symbolic (_i) -> (_i - iA) for i in [x, y, z]."""
@@ -503,12 +1032,41 @@ class BasisFunctions(object):
         return flds
 
 
+    @property
+    def _sh(self):
+        """Symbolic solid harmonics, only built for symbolic evaluation."""
+        if self._symbolic_sh is None:
+            lmax = self._lmax
+            sh = solid_harmonics(lmax)
+            if self._scaled and lmax > 2:
+                ssh = solid_harmonics(lmax, scaled=True)
+                for L in range(2, lmax + 1):
+                    sh[L] = ssh[L]
+            # Re-order p functions as 'x', 'y', 'z' rather than -1, 0, 1
+            if self._cartp:
+                ptmp = sh[1].copy()
+                sh[1] = OrderedDict((ml, ptmp[ml]) for ml in (1, -1, 0))
+            self._symbolic_sh = sh
+        return self._symbolic_sh
+
+
     def __len__(self):
         return self._ncs if self._meta['spherical'] else self._ncc
 
 
+    @property
+    def _shells(self):
+        """Basis set shells as :class:`~exatomic.algorithms.numerical.Shell`
+        jitclasses, only built for symbolic evaluation and integrals."""
+        if self._jit_shells is None:
+            self._jit_shells = self._basis_set.shells(
+                self._meta['program'], self._meta['spherical'],
+                self._meta['gaussian'])[0].values
+        return self._jit_shells
+
+
     def __repr__(self):
-        chk = (i.spherical for i in self._shells)
+        chk = self._shls.spherical
         _repr = 'BasisFunctions({},{{}})'.format(len(self)).format
         if all(chk): return _repr('spherical')
         if not any(chk): return _repr('cartesian')
@@ -519,25 +1077,25 @@ class BasisFunctions(object):
         # Attach relevant uni attributes
         self._meta = uni.meta
         self._bso = uni.current_basis_set_order
-        ptrs, xyzs, shells = uni.enumerate_shells()
+        self._frame = frame
+        ptrs, xyzs, shls = uni.enumerate_shells(frame, flat=True)
         self._ptrs = ptrs
         self._xyzs = xyzs
-        self._shells = shells
+        self._shls = shls
+        self._basis_set = uni.basis_set
+        self._jit_shells = None
         self._ncc = uni.basis_dims['ncc']
         self._ncs = uni.basis_dims['ncs']
-        # Scaled or unscaled solid harmonics
-        lmax = uni.basis_set.lmax
-        sh = solid_harmonics(lmax)
-        scaled = self._meta['program'] in ['molcas']
-        if scaled and lmax > 2:
-            ssh = solid_harmonics(lmax, scaled=True)
-            for L in range(2, lmax + 1):
-                sh[L] = ssh[L]
-        # Re-order p functions as 'x', 'y', 'z' rather than -1, 0, 1
-        if cartp:
-            ptmp = sh[1].copy()
-            sh[1] = OrderedDict((ml, ptmp[ml]) for ml in (1, -1, 0))
-        self._sh = sh
+        # Flattened shells and terms for numerical evaluation
+        self._flat = None
+        self._terms = {}
+        self._cutoffs = {}
+        # Scaled or unscaled solid harmonics (numerical tables are cached,
+        # symbolic ones are built lazily by _sh)
+        self._lmax = uni.basis_set.lmax
+        self._scaled = self._meta['program'] in ['molcas']
+        self._cartp = cartp
+        self._symbolic_sh = None
         # Exponential dependence
         self._expnt = _r ** 2
         if not self._meta['gaussian']:
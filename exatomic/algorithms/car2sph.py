@@ -24,9 +24,85 @@ Generated using the following code.
         return f
 
 """
+import os
 import numpy as np
 from numba import jit
 
+
+# Bump when the generated tables change
+_sh_version = 1
+_sh_lmax = 9
+_sh_tables = {}
+
+
+def _cache_dir():
+    """On-disk cache location ($EXATOMIC_CACHE, default ~/.exatomic)."""
+    return os.environ.get('EXATOMIC_CACHE',
+                          os.path.join(os.path.expanduser('~'), '.exatomic'))
+
+
+def _generate_sh_tables(lmax):
+    """Numerical tables from the symbolic solid harmonics."""
+    from exatomic.algorithms.basis import solid_harmonics, _harmonic_table
+    return {'unscaled': _harmonic_table(solid_harmonics(lmax)),
+            'scaled': _harmonic_table(solid_harmonics(lmax, scaled=True))}
+
+
+def _load_sh_tables():
+    """Load the solid harmonic tables from the on-disk cache, generating
+    (and trying to store) them if missing or out of date."""
+    path = os.path.join(_cache_dir(), 'solid_harmonics_v{}.npz'.format(_sh_version))
+    try:
+        with np.load(path) as npz:
+            if int(npz['lmax']) >= _sh_lmax:
+                return {key: npz[key] for key in ('unscaled', 'scaled')}
+    except (IOError, OSError, KeyError, ValueError):
+        pass
+    tables = _generate_sh_tables(_sh_lmax)
+    try:
+        if not os.path.isdir(_cache_dir()):
+            os.makedirs(_cache_dir())
+        tmp = '{}.{}.npz'.format(path[:-4], os.getpid())
+        np.savez(tmp, lmax=_sh_lmax, **tables)
+        os.rename(tmp, path)
+    except (IOError, OSError):
+        pass
+    return tables
+
+
+def solid_harmonic_table(lmax, scaled=False):
+    """Numerical coefficients of the real solid harmonics in terms of
+    cartesian monomials (ordered as in :data:`~exatomic.algorithms.basis.enum_cartesian`).
+
+    Tables up to L = 9 are computed once from the symbolic solid harmonics
+    (see :func:`~exatomic.algorithms.basis.solid_harmonics`), stored in a
+    versioned file in the on-disk cache and kept in memory once loaded.
+
+    .. code-block:: python
+
+        table = solid_harmonic_table(3)
+        table[2, :6, :5]               # same as car2sph_scaled(2) if scaled
+
+    Args:
+        lmax (int): highest order angular momentum quantum number
+        scaled (bool): if scaled, includes factor of 1 / (2 * np.pi ** 0.5)
+
+    Returns:
+        table (np.ndarray): (read-only) table[L, k, ml + L] is the coefficient of monomial k
+    """
+    key = 'scaled' if scaled else 'unscaled'
+    if lmax > _sh_lmax:
+        table = _generate_sh_tables(lmax)[key]
+    else:
+        if not _sh_tables:
+            _sh_tables.update(_load_sh_tables())
+            for table in _sh_tables.values():
+                table.setflags(write=False)
+        table = _sh_tables[key]
+    ncart = (lmax + 1) * (lmax + 2) // 2
+    return table[:lmax + 1, :ncart, :2 * lmax + 1]
+
+
 @jit(nopython=True, cache=True)
 def car2sph_scaled(L):
     """Coefficients of symbolic solid harmonics / (2 * pi ** 0.5)."""
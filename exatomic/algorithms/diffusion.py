@@ -6,12 +6,14 @@ Diffusion Coefficients
 ##########################
 Various algorithms for computing diffusion coefficients are coded here.
 """
+import numpy as np
 from exa.util.units import Length, Time
-from exatomic.algorithms.displacement import absolute_squared_displacement
+from exatomic.algorithms.displacement import (absolute_squared_displacement,
+                                              mean_squared_displacement)
 
 
 def einstein_relation(universe, input_time='ps', input_length='au',
-                      length='cm', time='s'):
+                      length='cm', time='s', all_origins=True):
     """
     Compute the (time dependent) diffusion coefficient using Einstein's relation.
 
@@ -28,6 +30,7 @@ def einstein_relation(universe, input_time='ps', input_length='au',
         input_length (str): String unit of xyz coordinates
         length (str): String unit name of output length unit
         time (str): Sting unit name of output time unit
+        all_origins (bool): Average over all time origins (default) or use the first frame only
 
     Returns:
         d (:class:`~exa.core.numerical.DataFrame`): Diffussion coefficient as a function of time
@@ -35,8 +38,22 @@ def einstein_relation(universe, input_time='ps', input_length='au',
     Note:
         The asymptotic value of the returned variable is the diffusion coefficient.
         The default units of the diffusion coefficient are :math:`\\frac{cm^{2}}{s}`.
+
+    Note:
+        When averaging over all time origins (see
+        :func:`~exatomic.algorithms.displacement.mean_squared_displacement`)
+        frames are assumed to be evenly spaced in time and t is the time
+        elapsed since the first frame.
     """
-    msd = absolute_squared_displacement(universe).mean(axis=1)
-    t = universe.frame['time'] * Time[input_time, time]
+    if all_origins:
+        msd = mean_squared_displacement(universe).mean(axis=1)
+        # Rows are lags; lag m spans the time between the first and m-th frame
+        frames = np.sort(universe.atom['frame'].unique())
+        t = universe.frame.loc[frames, 'time'].values
+        t = t - t[0]
+    else:
+        msd = absolute_squared_displacement(universe).mean(axis=1)
+        t = universe.frame['time']
+    t = t * Time[input_time, time]
     msd *= Length[input_length, length]**2
     return msd/(6*t)
@@ -42,3 +42,98 @@ def absolute_squared_displacement(universe, ref_frame=None):
     df.index = universe.frame.index.copy()
     df.columns = universe.atom['label'].unique()
     return df
+
+
+def mean_squared_displacement(universe, unwrap=True, chunk=256):
+    """
+    Compute the mean squared displacement per atom, averaged over all time
+    origins, as a function of the time lag (in frames).
+
+    The time origin average is computed with the fast Fourier transform
+    (Wiener-Khinchin theorem), in :math:`O(T\\log T)` operations per atom
+    for T frames, as
+
+    .. math::
+
+        MSD\\left(m\\right) = \\frac{1}{T - m}\\sum_{k=0}^{T-m-1}
+            \\left|\\mathbf{r}\\left(k + m\\right) - \\mathbf{r}\\left(k\\right)\\right|^{2}
+            = S_{1}\\left(m\\right) - 2S_{2}\\left(m\\right)
+
+    where :math:`S_{2}` is the position autocorrelation function (computed
+    by FFT) and :math:`S_{1}` follows from cumulative sums of the squared
+    positions.
+
+    Args:
+        universe (:class:`~exatomic.Universe`): The universe containing atomic positions
+        unwrap (bool): Unwrap positions of periodic universes (see Note)
+        chunk (int): Number of atoms transformed at a time (bounds memory)
+
+    Returns
+        df (:class:`~pandas.DataFrame`): Displacement (rows time lags in frames, columns atom labels)
+
+    Note:
+        Every frame must contain the same atoms (labels). For periodic
+        universes, positions are unwrapped by assuming that no atom moves
+        more than half of the cell between consecutive frames (minimum image
+        convention), so both in unit cell and already unwrapped coordinates
+        are handled.
+    """
+    if 'label' not in universe.atom.columns:
+        universe.atom['label'] = universe.atom.get_atom_labels()
+    atom = universe.atom[['frame', 'label', 'x', 'y', 'z']].copy()
+    atom['frame'] = atom['frame'].astype(np.int64)
+    atom['label'] = atom['label'].astype(np.int64)
+    atom = atom.sort_values(['frame', 'label'], kind='mergesort')
+    frames = atom['frame'].unique()
+    labels = atom['label'].unique()
+    if len(atom) != len(frames)*len(labels):
+        raise ValueError("Each frame must contain the same atoms (labels)")
+    xyz = atom[['x', 'y', 'z']].values.astype(np.float64).reshape(len(frames), len(labels), 3)
+    if unwrap and universe.periodic:
+        cols = ["xi", "yi", "zi", "xj", "yj", "zj", "xk", "yk", "zk"]
+        cells = universe.frame.loc[frames, cols].values.astype(np.float64).reshape(-1, 3, 3)
+        xyz = unwrap_positions(xyz, cells)
+    msd = np.empty(xyz.shape[:2], dtype=np.float64)
+    for lo in range(0, len(labels), chunk):
+        msd[:, lo:lo + chunk] = _fft_msd(xyz[:, lo:lo + chunk])
+    return pd.DataFrame(msd, index=pd.RangeIndex(len(frames), name='lag'),
+                        columns=labels)
+
+
+def unwrap_positions(xyz, cells):
+    """
+    Unwrap periodic trajectories by removing jumps of whole cell vectors
+    between consecutive frames.
+
+    Args:
+        xyz (array): Positions of shape (nframe, natom, 3)
+        cells (array): Cell vectors (as rows) of each frame, shape (nframe, 3, 3)
+
+    Returns:
+        unwrapped (array): Positions continuous in time
+    """
+    d = np.diff(xyz, axis=0)
+    frac = np.einsum('tni,tij->tnj', d, np.linalg.inv(cells[1:]))
+    d -= np.einsum('tnj,tjk->tnk', np.round(frac), cells[1:])
+    unwrapped = np.empty_like(xyz)
+    unwrapped[0] = xyz[0]
+    np.cumsum(d, axis=0, out=unwrapped[1:])
+    unwrapped[1:] += xyz[0]
+    return unwrapped
+
+
+def _fft_msd(xyz):
+    """
+    All time origin mean squared displacement of positions of shape
+    (nframe, natom, 3); see
+    :func:`~exatomic.algorithms.displacement.mean_squared_displacement`.
+    """
+    n = len(xyz)
+    norm = (n - np.arange(n))[:, np.newaxis]
+    sq = (xyz**2).sum(axis=2)
+    cs = np.zeros((n + 1, sq.shape[1]), dtype=np.float64)
+    np.cumsum(sq, axis=0, out=cs[1:])
+    s1 = (cs[n:0:-1] + cs[n] - cs[:n])/norm
+    f = np.fft.rfft(xyz, n=2*n, axis=0)
+    s2 = np.fft.irfft((f*f.conj()).real.sum(axis=2), n=2*n, axis=0)[:n]/norm
+    return s1 - 2*s2
@@ -4,6 +4,11 @@
 """
 Two Body Properties Computations
 #####################################
+Pair distances are computed by compiled "walkers" (one per boundary condition)
+that either count the pairs within the distance of interest or fill output
+arrays sized by a previous count. The public functions below perform both
+passes for a single set of points; :mod:`~exatomic.core.two` drives the walkers
+over the frames of a universe.
 """
 import numpy as np
 import numba as nb
@@ -33,6 +38,485 @@ def modv(x, y):
     return np.mod(x, y)
 
 
+@nb.jit(nopython=True, nogil=True)
+def _minimum_image(d, a):
+    """
+    Shift a single distance component onto its minimum image.
+
+    The candidate images are tested in the order -1, 0, 1 so that ties are
+    resolved the same way as in :func:`~exatomic.algorithms.distance.pdist_ortho`.
+
+    Args:
+        d (float): Distance component between in unit cell points
+        a (float): Cell dimension along the component
+
+    Returns:
+        d, m (float, int): Shifted component and image (-1, 0, or 1)
+    """
+    best = d - a
+    m = -1
+    if abs(d) < abs(best):
+        best = d
+        m = 0
+    if abs(d + a) < abs(best):
+        best = d + a
+        m = 1
+    return best, m
+
+
+@nb.jit(nopython=True, nogil=True)
+def _bin_fractional(sa, sb, sc, nbin):
+    """
+    Sort points, given in fractional (in unit cell) coordinates, into a grid
+    of bins (linked cell list).
+
+    Args:
+        sa (array): Fractional coordinate along a
+        sb (array): Fractional coordinate along b
+        sc (array): Fractional coordinate along c
+        nbin (array): Number of bins along a, b, and c
+
+    Returns:
+        bins (array): Bin number of each point
+        order (array): Point indices sorted by bin
+        start (array): Offsets of each bin in order (length nbins + 1)
+    """
+    n = len(sa)
+    bins = np.empty((n, ), dtype=np.int64)
+    for i in range(n):
+        ia = min(max(int(sa[i]*nbin[0]), 0), nbin[0] - 1)
+        ib = min(max(int(sb[i]*nbin[1]), 0), nbin[1] - 1)
+        ic = min(max(int(sc[i]*nbin[2]), 0), nbin[2] - 1)
+        bins[i] = (ia*nbin[1] + ib)*nbin[2] + ic
+    nbins = nbin[0]*nbin[1]*nbin[2]
+    start = np.zeros((nbins + 1, ), dtype=np.int64)
+    for i in range(n):
+        start[bins[i] + 1] += 1
+    for i in range(nbins):
+        start[i + 1] += start[i]
+    fill = start[:-1].copy()
+    order = np.empty((n, ), dtype=np.int64)
+    for i in range(n):
+        order[fill[bins[i]]] = i
+        fill[bins[i]] += 1
+    return bins, order, start
+
+
+@nb.jit(nopython=True, nogil=True)
+def _neighbor_bins(bn, nbin):
+    """
+    Unique (periodic) neighbor bins of a given bin, including itself.
+
+    Args:
+        bn (int): Bin number
+        nbin (array): Number of bins along a, b, and c
+
+    Returns:
+        nbrs (array): Unique neighboring bin numbers
+    """
+    ia = bn//(nbin[1]*nbin[2])
+    ib = (bn//nbin[2])%nbin[1]
+    ic = bn%nbin[2]
+    nbrs = np.empty((27, ), dtype=np.int64)
+    k = 0
+    for aa in range(-1, 2):
+        na = (ia + aa)%nbin[0]
+        for bb in range(-1, 2):
+            nb_ = (ib + bb)%nbin[1]
+            for cc in range(-1, 2):
+                nc = (ic + cc)%nbin[2]
+                nbr = (na*nbin[1] + nb_)*nbin[2] + nc
+                new = True
+                for l in range(k):
+                    if nbrs[l] == nbr:
+                        new = False
+                        break
+                if new:
+                    nbrs[k] = nbr
+                    k += 1
+    return nbrs[:k]
+
+
+@nb.jit(nopython=True, nogil=True)
+def _ortho_nbin(a, b, c, dmax):
+    """
+    Number of linked cell list bins along each dimension of an orthorhombic
+    cell such that each bin is at least dmax wide.
+    """
+    nbin = np.empty((3, ), dtype=np.int64)
+    nbin[0] = max(int(a//dmax), 1)
+    nbin[1] = max(int(b//dmax), 1)
+    nbin[2] = max(int(c//dmax), 1)
+    return nbin
+
+
+@nb.jit(nopython=True, nogil=True)
+def _ortho_pairs(ux, uy, uz, a, b, c, index, dmax, nbin, vector, count,
+                 dx, dy, dz, dr, ii, jj, projection):
+    """
+    Walk all pairs within dmax (minimum image convention) in an orthorhombic
+    periodic cell. Pairs are searched among neighboring bins of a linked cell
+    list with nbin bins along each dimension (a single bin corresponds to a
+    search over all pairs, in the same order as
+    :func:`~exatomic.algorithms.distance.pdist_ortho`). When count is True,
+    the pairs are only counted; otherwise the output arrays (sized by a
+    previous counting pass) are filled.
+    """
+    dmax2 = dmax**2
+    bins, order, start = _bin_fractional(ux/a, uy/b, uz/c, nbin)
+    k = 0
+    for i in range(len(ux)):
+        xi = ux[i]
+        yi = uy[i]
+        zi = uz[i]
+        nbrs = _neighbor_bins(bins[i], nbin)
+        for bn in nbrs:
+            for p in range(start[bn], start[bn + 1]):
+                j = order[p]
+                if j <= i:
+                    continue
+                dpx, ma = _minimum_image(xi - ux[j], a)
+                dpy, mb = _minimum_image(yi - uy[j], b)
+                dpz, mc = _minimum_image(zi - uz[j], c)
+                dpr = dpx**2 + dpy**2 + dpz**2
+                if dpr < dmax2:
+                    if not count:
+                        if vector:
+                            dx[k] = dpx
+                            dy[k] = dpy
+                            dz[k] = dpz
+                        dr[k] = np.sqrt(dpr)
+                        ii[k] = index[i]
+                        jj[k] = index[j]
+                        projection[k] = (ma + 1)*9 + (mb + 1)*3 + mc + 1
+                    k += 1
+    return k
+
+
+@nb.jit(nopython=True, nogil=True)
+def _tric_nbin(cell, dmax):
+    """
+    Number of linked cell list bins along each cell vector such that each bin
+    is at least dmax wide (perpendicular to its faces).
+
+    Args:
+        cell (array): Cell vectors as rows (3x3)
+        dmax (float): Maximum distance of interest
+    """
+    bc = np.cross(cell[1], cell[2])
+    ca = np.cross(cell[2], cell[0])
+    ab = np.cross(cell[0], cell[1])
+    vol = abs(np.dot(cell[0], bc))
+    nbin = np.empty((3, ), dtype=np.int64)
+    nbin[0] = max(int(vol/np.sqrt(np.dot(bc, bc))//dmax), 1)
+    nbin[1] = max(int(vol/np.sqrt(np.dot(ca, ca))//dmax), 1)
+    nbin[2] = max(int(vol/np.sqrt(np.dot(ab, ab))//dmax), 1)
+    return nbin
+
+
+@nb.jit(nopython=True, nogil=True)
+def _tric_image(da, db, dc, cell):
+    """
+    Find the nearest of the 27 projections (the same 3x3x3 'supercell' as
+    :func:`~exatomic.algorithms.distance.pdist_ortho`) of a fractional
+    coordinate difference in a general (triclinic) cell.
+
+    Args:
+        da (float): Fractional difference along a
+        db (float): Fractional difference along b
+        dc (float): Fractional difference along c
+        cell (array): Cell vectors as rows (3x3)
+
+    Returns:
+        dx, dy, dz, dr2, prj: Cartesian vector, squared distance, and projection
+    """
+    dpx = 0.0
+    dpy = 0.0
+    dpz = 0.0
+    dpr = np.inf
+    prjk = 0
+    prj = 0
+    for aa in range(-1, 2):
+        for bb in range(-1, 2):
+            for cc in range(-1, 2):
+                fa = da + aa
+                fb = db + bb
+                fc = dc + cc
+                dpx_ = fa*cell[0, 0] + fb*cell[1, 0] + fc*cell[2, 0]
+                dpy_ = fa*cell[0, 1] + fb*cell[1, 1] + fc*cell[2, 1]
+                dpz_ = fa*cell[0, 2] + fb*cell[1, 2] + fc*cell[2, 2]
+                dpr_ = dpx_**2 + dpy_**2 + dpz_**2
+                if dpr_ < dpr:
+                    dpx = dpx_
+                    dpy = dpy_
+                    dpz = dpz_
+                    dpr = dpr_
+                    prjk = prj
+                prj += 1
+    return dpx, dpy, dpz, dpr, prjk
+
+
+@nb.jit(nopython=True, nogil=True)
+def _tric_pairs(sa, sb, sc, cell, index, dmax, nbin, vector, count,
+                dx, dy, dz, dr, ii, jj, projection):
+    """
+    Walk all pairs within dmax (minimum image convention) in a general
+    (triclinic) periodic cell. Pairs are searched among neighboring bins of a
+    linked cell list with nbin bins along each cell vector (a single bin
+    corresponds to a search over all pairs). When count is True, the pairs are
+    only counted; otherwise the output arrays (sized by a previous counting
+    pass) are filled.
+    """
+    dmax2 = dmax**2
+    bins, order, start = _bin_fractional(sa, sb, sc, nbin)
+    k = 0
+    for i in range(len(sa)):
+        nbrs = _neighbor_bins(bins[i], nbin)
+        for bn in nbrs:
+            for p in range(start[bn], start[bn + 1]):
+                j = order[p]
+                if j <= i:
+                    continue
+                dpx, dpy, dpz, dpr, prj = _tric_image(sa[i] - sa[j], sb[i] - sb[j],
+                                                      sc[i] - sc[j], cell)
+                if dpr < dmax2:
+                    if not count:
+                        if vector:
+                            dx[k] = dpx
+                            dy[k] = dpy
+                            dz[k] = dpz
+                        dr[k] = np.sqrt(dpr)
+                        ii[k] = index[i]
+                        jj[k] = index[j]
+                        projection[k] = prj
+                    k += 1
+    return k
+
+
+@nb.jit(nopython=True, nogil=True)
+def _free_pairs(x, y, z, index, dmax, vector, count, dx, dy, dz, dr, ii, jj):
+    """
+    Walk all pairs within dmax for points in cartesian space (free boundary
+    conditions), in the same order as :func:`~exatomic.algorithms.distance.pdist`.
+    When count is True, the pairs are only counted; otherwise the output arrays
+    (sized by a previous counting pass) are filled.
+    """
+    dmax2 = dmax**2
+    k = 0
+    for i in range(len(x)):
+        xi = x[i]
+        yi = y[i]
+        zi = z[i]
+        for j in range(i + 1, len(x)):
+            dx_ = xi - x[j]
+            dy_ = yi - y[j]
+            dz_ = zi - z[j]
+            dr2_ = dx_**2 + dy_**2 + dz_**2
+            if dr2_ < dmax2:
+                if not count:
+                    if vector:
+                        dx[k] = dx_
+                        dy[k] = dy_
+                        dz[k] = dz_
+                    dr[k] = np.sqrt(dr2_)
+                    ii[k] = index[i]
+                    jj[k] = index[j]
+                k += 1
+    return k
+
+
+@nb.jit(nopython=True, nogil=True)
+def _ortho_list_pairs(ux, uy, uz, a, b, c, index, dmax, ci, cj, vector, count,
+                      dx, dy, dz, dr, ii, jj, projection):
+    """
+    Like :func:`~exatomic.algorithms.distance._ortho_pairs` but only the
+    candidate pairs (ci[p], cj[p]) (e.g. from a neighbor list) are checked.
+    """
+    dmax2 = dmax**2
+    k = 0
+    for p in range(len(ci)):
+        i = ci[p]
+        j = cj[p]
+        dpx, ma = _minimum_image(ux[i] - ux[j], a)
+        dpy, mb = _minimum_image(uy[i] - uy[j], b)
+        dpz, mc = _minimum_image(uz[i] - uz[j], c)
+        dpr = dpx**2 + dpy**2 + dpz**2
+        if dpr < dmax2:
+            if not count:
+                if vector:
+                    dx[k] = dpx
+                    dy[k] = dpy
+                    dz[k] = dpz
+                dr[k] = np.sqrt(dpr)
+                ii[k] = index[i]
+                jj[k] = index[j]
+                projection[k] = (ma + 1)*9 + (mb + 1)*3 + mc + 1
+            k += 1
+    return k
+
+
+@nb.jit(nopython=True, nogil=True)
+def _tric_list_pairs(sa, sb, sc, cell, index, dmax, ci, cj, vector, count,
+                     dx, dy, dz, dr, ii, jj, projection):
+    """
+    Like :func:`~exatomic.algorithms.distance._tric_pairs` but only the
+    candidate pairs (ci[p], cj[p]) (e.g. from a neighbor list) are checked.
+    """
+    dmax2 = dmax**2
+    k = 0
+    for p in range(len(ci)):
+        i = ci[p]
+        j = cj[p]
+        dpx, dpy, dpz, dpr, prj = _tric_image(sa[i] - sa[j], sb[i] - sb[j],
+                                              sc[i] - sc[j], cell)
+        if dpr < dmax2:
+            if not count:
+                if vector:
+                    dx[k] = dpx
+                    dy[k] = dpy
+                    dz[k] = dpz
+                dr[k] = np.sqrt(dpr)
+                ii[k] = index[i]
+                jj[k] = index[j]
+                projection[k] = prj
+            k += 1
+    return k
+
+
+@nb.jit(nopython=True, nogil=True)
+def _free_list_pairs(x, y, z, index, dmax, ci, cj, vector, count,
+                     dx, dy, dz, dr, ii, jj):
+    """
+    Like :func:`~exatomic.algorithms.distance._free_pairs` but only the
+    candidate pairs (ci[p], cj[p]) (e.g. from a neighbor list) are checked.
+    """
+    dmax2 = dmax**2
+    k = 0
+    for p in range(len(ci)):
+        i = ci[p]
+        j = cj[p]
+        dx_ = x[i] - x[j]
+        dy_ = y[i] - y[j]
+        dz_ = z[i] - z[j]
+        dr2_ = dx_**2 + dy_**2 + dz_**2
+        if dr2_ < dmax2:
+            if not count:
+                if vector:
+                    dx[k] = dx_
+                    dy[k] = dy_
+                    dz[k] = dz_
+                dr[k] = np.sqrt(dr2_)
+                ii[k] = index[i]
+                jj[k] = index[j]
+            k += 1
+    return k
+
+
+@nb.jit(nopython=True, nogil=True)
+def max_displacement(sa, sb, sc, ra, rb, rc, cell, periodic):
+    """
+    Largest displacement of a set of points with respect to reference
+    positions.
+
+    For periodic systems, positions are fractional (in unit cell) coordinates
+    and displacements follow the minimum image convention; otherwise positions
+    are cartesian and cell should be the identity.
+
+    Args:
+        sa (array): Coordinate along a (or x)
+        sb (array): Coordinate along b (or y)
+        sc (array): Coordinate along c (or z)
+        ra (array): Reference coordinate along a (or x)
+        rb (array): Reference coordinate along b (or y)
+        rc (array): Reference coordinate along c (or z)
+        cell (array): Cell vectors as rows (3x3)
+        periodic (bool): Apply the minimum image convention
+
+    Returns:
+        dmax (float): Largest displacement (cartesian)
+    """
+    dmax2 = 0.0
+    for i in range(len(sa)):
+        da = sa[i] - ra[i]
+        db = sb[i] - rb[i]
+        dc = sc[i] - rc[i]
+        if periodic:
+            da -= np.round(da)
+            db -= np.round(db)
+            dc -= np.round(dc)
+        dx = da*cell[0, 0] + db*cell[1, 0] + dc*cell[2, 0]
+        dy = da*cell[0, 1] + db*cell[1, 1] + dc*cell[2, 1]
+        dz = da*cell[0, 2] + db*cell[1, 2] + dc*cell[2, 2]
+        dmax2 = max(dmax2, dx**2 + dy**2 + dz**2)
+    return np.sqrt(dmax2)
+
+
+@nb.jit(nopython=True, nogil=True)
+def _ortho_alloc(ux, uy, uz, a, b, c, index, dmax, nbin, vector):
+    """
+    Count, then allocate (exactly sized) and fill, the orthorhombic pair
+    arrays (see :func:`~exatomic.algorithms.distance._ortho_pairs`).
+    """
+    fe = np.empty((0, ), dtype=np.float64)
+    ie = np.empty((0, ), dtype=np.int64)
+    k = _ortho_pairs(ux, uy, uz, a, b, c, index, dmax, nbin, vector, True,
+                     fe, fe, fe, fe, ie, ie, ie)
+    nv = k if vector else 0
+    dx = np.empty((nv, ), dtype=np.float64)
+    dy = np.empty((nv, ), dtype=np.float64)
+    dz = np.empty((nv, ), dtype=np.float64)
+    dr = np.empty((k, ), dtype=np.float64)
+    ii = np.empty((k, ), dtype=np.int64)
+    jj = np.empty((k, ), dtype=np.int64)
+    projection = np.empty((k, ), dtype=np.int64)
+    _ortho_pairs(ux, uy, uz, a, b, c, index, dmax, nbin, vector, False,
+                 dx, dy, dz, dr, ii, jj, projection)
+    return dx, dy, dz, dr, ii, jj, projection
+
+
+@nb.jit(nopython=True, nogil=True)
+def _tric_alloc(sa, sb, sc, cell, index, dmax, nbin, vector):
+    """
+    Count, then allocate (exactly sized) and fill, the triclinic pair arrays
+    (see :func:`~exatomic.algorithms.distance._tric_pairs`).
+    """
+    fe = np.empty((0, ), dtype=np.float64)
+    ie = np.empty((0, ), dtype=np.int64)
+    k = _tric_pairs(sa, sb, sc, cell, index, dmax, nbin, vector, True,
+                    fe, fe, fe, fe, ie, ie, ie)
+    nv = k if vector else 0
+    dx = np.empty((nv, ), dtype=np.float64)
+    dy = np.empty((nv, ), dtype=np.float64)
+    dz = np.empty((nv, ), dtype=np.float64)
+    dr = np.empty((k, ), dtype=np.float64)
+    ii = np.empty((k, ), dtype=np.int64)
+    jj = np.empty((k, ), dtype=np.int64)
+    projection = np.empty((k, ), dtype=np.int64)
+    _tric_pairs(sa, sb, sc, cell, index, dmax, nbin, vector, False,
+                dx, dy, dz, dr, ii, jj, projection)
+    return dx, dy, dz, dr, ii, jj, projection
+
+
+@nb.jit(nopython=True, nogil=True)
+def _free_alloc(x, y, z, index, dmax, vector):
+    """
+    Count, then allocate (exactly sized) and fill, the free boundary pair
+    arrays (see :func:`~exatomic.algorithms.distance._free_pairs`).
+    """
+    fe = np.empty((0, ), dtype=np.float64)
+    ie = np.empty((0, ), dtype=np.int64)
+    k = _free_pairs(x, y, z, index, dmax, vector, True, fe, fe, fe, fe, ie, ie)
+    nv = k if vector else 0
+    dx = np.empty((nv, ), dtype=np.float64)
+    dy = np.empty((nv, ), dtype=np.float64)
+    dz = np.empty((nv, ), dtype=np.float64)
+    dr = np.empty((k, ), dtype=np.float64)
+    atom0 = np.empty((k, ), dtype=np.int64)
+    atom1 = np.empty((k, ), dtype=np.int64)
+    _free_pairs(x, y, z, index, dmax, vector, False, dx, dy, dz, dr, atom0, atom1)
+    return dx, dy, dz, dr, atom0, atom1
+
+
 @nb.jit(nopython=True, nogil=True, parallel=nbpll)
 def pdist_ortho(ux, uy, uz, a, b, c, index, dmax=8.0):
     """
@@ -52,75 +536,16 @@ def pdist_ortho(ux, uy, uz, a, b, c, index, dmax=8.0):
         uz (array): In unit cell z array
         a (float): Unit cell dimension a
         b (float): Unit cell dimension b
-        c (float): Unit cell dimension c index (array): Atom indexes
+        c (float): Unit cell dimension c
+        index (array): Atom indexes
         dmax (float): Maximum distance of interest
+
+    Note:
+        Pairs are counted before the output arrays are allocated, so memory
+        is proportional to the number of pairs within dmax.
     """
-    m = [-1, 0, 1]
-    dmax2 = dmax**2
-    n = len(ux)
-    nn = n*(n - 1)//2
-    dx = np.empty((nn, ), dtype=np.float64)
-    dy = dx.copy()
-    dz = dx.copy()
-    dr = dx.copy()
-    ii = np.empty((nn, ), dtype=np.int64)
-    jj = ii.copy()
-    projection = ii.copy()
-    k = 0
-    # For each atom i
-    for i in range(n):
-        xi = ux[i]
-        yi = uy[i]
-        zi = uz[i]
-        # For each atom j
-        for j in range(i+1, n):
-            xj = ux[j]
-            yj = uy[j]
-            zj = uz[j]
-            dpr = dmax2
-            inck = False
-            prj = 0
-            # Check all projections of atom i
-            # Note that i, j are in the unit cell so we make a 3x3x3 'supercell'
-            # of i around j
-            # The index of the projections of i go from 0 to 26 (27 projections)
-            # The 13th projection is the unit cell itself.
-            for aa in m:
-                for bb in m:
-                    for cc in m:
-                        pxi = xi + aa*a
-                        pyi = yi + bb*b
-                        pzi = zi + cc*c
-                        dpx_ = pxi - xj
-                        dpy_ = pyi - yj
-                        dpz_ = pzi - zj
-                        dpr_ = dpx_**2 + dpy_**2 + dpz_**2
-                        # The second criteria here enforces that prefer the projection
-                        # with the largest value (i.e. 0 = [-1, -1, -1] < 13 = [0, 0, 0]
-                        # < 26 = [1, 1, 1])
-                        # The system sets a fixed preference for the projected positions rather
-                        # than having a random choice.
-                        if dpr_ < dpr:
-                            dx[k] = dpx_
-                            dy[k] = dpy_
-                            dz[k] = dpz_
-                            dr[k] = np.sqrt(dpr_)
-                            ii[k] = index[i]
-                            jj[k] = index[j]
-                            projection[k] = prj
-                            dpr = dpr_
-                            inck = True
-                        prj += 1
-            if inck:
-                k += 1
-    dx = dx[:k]
-    dy = dy[:k]
-    dz = dz[:k]
-    dr = dr[:k]
-    ii = ii[:k]
-    jj = jj[:k]
-    projection = projection[:k]
-    return dx, dy, dz, dr, ii, jj, projection
+    nbin = np.ones((3, ), dtype=np.int64)
+    return _ortho_alloc(ux, uy, uz, a, b, c, index, dmax, nbin, True)
 
 
 @nb.jit(nopython=True, nogil=True, parallel=nbpll)
@@ -142,66 +567,107 @@ def pdist_ortho_nv(ux, uy, uz, a, b, c, index, dmax=8.0):
         uz (array): In unit cell z array
         a (float): Unit cell dimension a
         b (float): Unit cell dimension b
-        c (float): Unit cell dimension c index (array): Atom indexes
+        c (float): Unit cell dimension c
+        index (array): Atom indexes
         dmax (float): Maximum distance of interest
     """
-    m = [-1, 0, 1]
-    dmax2 = dmax**2
-    n = len(ux)
-    nn = n*(n - 1)//2
-    dr = np.empty((nn, ), dtype=np.float64)
-    ii = np.empty((nn, ), dtype=np.int64)
-    jj = ii.copy()
-    projection = ii.copy()
-    k = 0
-    # For each atom i
-    for i in range(n):
-        xi = ux[i]
-        yi = uy[i]
-        zi = uz[i]
-        # For each atom j
-        for j in range(i+1, n):
-            xj = ux[j]
-            yj = uy[j]
-            zj = uz[j]
-            dpr = dmax2
-            inck = False
-            prj = 0
-            # Check all projections of atom i
-            # Note that i, j are in the unit cell so we make a 3x3x3 'supercell'
-            # of i around j
-            # The index of the projections of i go from 0 to 26 (27 projections)
-            # The 13th projection is the unit cell itself.
-            for aa in m:
-                for bb in m:
-                    for cc in m:
-                        pxi = xi + aa*a
-                        pyi = yi + bb*b
-                        pzi = zi + cc*c
-                        dpx_ = pxi - xj
-                        dpy_ = pyi - yj
-                        dpz_ = pzi - zj
-                        dpr_ = dpx_**2 + dpy_**2 + dpz_**2
-                        # The second criteria here enforces that prefer the projection
-                        # with the largest value (i.e. 0 = [-1, -1, -1] < 13 = [0, 0, 0]
-                        # < 26 = [1, 1, 1])
-                        # The system sets a fixed preference for the projected positions rather
-                        # than having a random choice.
-                        if dpr_ < dpr:
-                            dr[k] = np.sqrt(dpr_)
-                            ii[k] = index[i]
-                            jj[k] = index[j]
-                            projection[k] = prj
-                            dpr = dpr_
-                            inck = True
-                        prj += 1
-            if inck:
-                k += 1
-    dr = dr[:k]
-    ii = ii[:k]
-    jj = jj[:k]
-    projection = projection[:k]
-    return dr, ii, jj, projection
+    nbin = np.ones((3, ), dtype=np.int64)
+    v = _ortho_alloc(ux, uy, uz, a, b, c, index, dmax, nbin, False)
+    return v[3], v[4], v[5], v[6]
+
+
+@nb.jit(nopython=True, nogil=True, parallel=nbpll)
+def pdist_ortho_cell(ux, uy, uz, a, b, c, index, dmax=8.0):
+    """
+    Pairwise two body calculation for bodies in an orthorhombic periodic cell
+    using a linked cell list.
+
+    Does return distance vectors.
+
+    Points are binned into cells with sides of at least dmax so that only
+    neighboring cells need be searched; for a fixed dmax the cost is linear in
+    the number of points. Output arrays are sized by an initial counting pass
+    so that memory is proportional to the number of pairs within dmax. Results
+    are identical to :func:`~exatomic.algorithms.distance.pdist_ortho` up to
+    the ordering of the pairs.
+
+    Args:
+        ux (array): In unit cell x array
+        uy (array): In unit cell y array
+        uz (array): In unit cell z array
+        a (float): Unit cell dimension a
+        b (float): Unit cell dimension b
+        c (float): Unit cell dimension c
+        index (array): Atom indexes
+        dmax (float): Maximum distance of interest
+    """
+    nbin = _ortho_nbin(a, b, c, dmax)
+    return _ortho_alloc(ux, uy, uz, a, b, c, index, dmax, nbin, True)
+
+
+@nb.jit(nopython=True, nogil=True, parallel=nbpll)
+def pdist_ortho_cell_nv(ux, uy, uz, a, b, c, index, dmax=8.0):
+    """
+    Pairwise two body calculation for bodies in an orthorhombic periodic cell
+    using a linked cell list.
+
+    Does not return distance vectors.
+
+    See Also:
+        :func:`~exatomic.algorithms.distance.pdist_ortho_cell`
+    """
+    nbin = _ortho_nbin(a, b, c, dmax)
+    v = _ortho_alloc(ux, uy, uz, a, b, c, index, dmax, nbin, False)
+    return v[3], v[4], v[5], v[6]
+
+
+@nb.jit(nopython=True, nogil=True, parallel=nbpll)
+def pdist_tric(sa, sb, sc, cell, index, dmax=8.0, cell_list=False):
+    """
+    Pairwise two body calculation for bodies in a general (triclinic)
+    periodic cell.
+
+    Does return distance vectors.
+
+    Positions are given in fractional coordinates wrapped into the unit cell,
+    [0, 1). The 27 projections of each pair are searched as in
+    :func:`~exatomic.algorithms.distance.pdist_ortho` (the projection index
+    has the same meaning); the cell is assumed to be reasonably reduced so
+    that the minimum image is among them.
+
+    Args:
+        sa (array): Fractional coordinate along a
+        sb (array): Fractional coordinate along b
+        sc (array): Fractional coordinate along c
+        cell (array): Cell vectors a, b, c as rows (3x3)
+        index (array): Atom indexes
+        dmax (float): Maximum distance of interest
+        cell_list (bool): Search pairs using a linked cell list
+    """
+    if cell_list:
+        nbin = _tric_nbin(cell, dmax)
+    else:
+        nbin = np.ones((3, ), dtype=np.int64)
+    return _tric_alloc(sa, sb, sc, cell, index, dmax, nbin, True)
+
+
+@nb.jit(nopython=True, nogil=True, parallel=nbpll)
+def pdist_tric_nv(sa, sb, sc, cell, index, dmax=8.0, cell_list=False):
+    """
+    Pairwise two body calculation for bodies in a general (triclinic)
+    periodic cell.
+
+    Does not return distance vectors.
+
+    See Also:
+        :func:`~exatomic.algorithms.distance.pdist_tric`
+    """
+    if cell_list:
+        nbin = _tric_nbin(cell, dmax)
+    else:
+        nbin = np.ones((3, ), dtype=np.int64)
+    v = _tric_alloc(sa, sb, sc, cell, index, dmax, nbin, False)
+    return v[3], v[4], v[5], v[6]
 
 
 @nb.jit(nopython=True, nogil=True, parallel=nbpll)
@@ -209,42 +675,11 @@ def pdist(x, y, z, index, dmax=8.0):
     """
     Pairwise distance computation for points in cartesian space.
 
-    Does return distance vectors.
+    Does return distance vectors. Pairs are counted before the output arrays
+    are allocated, so memory is proportional to the number of pairs within
+    dmax.
     """
-    dmax2 = dmax**2
-    m = len(x)
-    n = m*(m - 1)//2
-    dx = np.empty((n, ), dtype=np.float64)
-    dy = dx.copy()
-    dz = dx.copy()
-    dr = dx.copy()
-    atom0 = np.empty((n, ), dtype=np.int64)
-    atom1 = atom0.copy()
-    k = 0
-    for i in range(m):
-        xi = x[i]
-        yi = y[i]
-        zi = z[i]
-        for j in range(i + 1, m):
-            dx_ = xi - x[j]
-            dy_ = yi - y[j]
-            dz_ = zi - z[j]
-            dr2_ = dx_**2 + dy_**2 + dz_**2
-            if dr2_ < dmax2:
-                dx[k] = dx_
-                dy[k] = dy_
-                dz[k] = dz_
-                dr[k] = np.sqrt(dr2_)
-                atom0[k] = index[i]
-                atom1[k] = index[j]
-                k += 1
-    dx = dx[:k]
-    dy = dy[:k]
-    dz = dz[:k]
-    dr = dr[:k]
-    atom0 = atom0[:k]
-    atom1 = atom1[:k]
-    return dx, dy, dz, dr, atom0, atom1
+    return _free_alloc(x, y, z, index, dmax, True)
 
 
 @nb.jit(nopython=True, nogil=True, parallel=nbpll)
@@ -254,25 +689,5 @@ def pdist_nv(x, y, z, index, dmax=8.0):
 
     Does not return distance vectors.
     """
-    dmax2 = dmax**2
-    m = len(x)
-    n = m*(m - 1)//2
-    dr = np.empty((n, ), dtype=np.float64)
-    atom0 = np.empty((n, ), dtype=np.int64)
-    atom1 = atom0.copy()
-    k = 0
-    for i in range(m):
-        xi = x[i]
-        yi = y[i]
-        zi = z[i]
-        for j in range(i + 1, m):
-            dr_ = (xi - x[j])**2 + (yi - y[j])**2 + (zi - z[j])**2
-            if dr_ < dmax2:
-                dr[k] = np.sqrt(dr_)
-                atom0[k] = index[i]
-                atom1[k] = index[j]
-                k += 1
-    dr = dr[:k]
-    atom0 = atom0[:k]
-    atom1 = atom1[:k]
-    return dr, atom0, atom1
+    v = _free_alloc(x, y, z, index, dmax, False)
+    return v[3], v[4], v[5]
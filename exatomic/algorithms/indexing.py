@@ -66,3 +66,53 @@ def starts_counts(starts, counts):
             values[h] = value
             h += 1
     return (i_idx, j_idx, values)
+
+
+@jit(nopython=True, nogil=True, cache=nbche)
+def _find(parent, i):
+    """Root of node i (union-find with path halving)."""
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+@jit(nopython=True, nogil=True, cache=nbche)
+def connected_components(n, edge0, edge1):
+    """
+    Label the connected components of an undirected graph using union-find
+    (disjoint sets).
+
+    Components are numbered sequentially in the order of their first node;
+    isolated nodes are components of their own.
+
+    Args:
+        n (int): Number of nodes (nodes are 0, ..., n - 1)
+        edge0 (array): First node of each edge
+        edge1 (array): Second node of each edge
+
+    Returns:
+        labels (array): Component label of each node
+    """
+    parent = np.arange(n)
+    size = np.ones((n, ), dtype=np.int64)
+    for k in range(len(edge0)):
+        a = _find(parent, edge0[k])
+        b = _find(parent, edge1[k])
+        if a == b:
+            continue
+        if size[a] < size[b]:
+            a, b = b, a
+        parent[b] = a
+        size[a] += size[b]
+    labels = np.empty((n, ), dtype=np.int64)
+    rootlabel = np.empty((n, ), dtype=np.int64)
+    rootlabel[:] = -1
+    m = 0
+    for i in range(n):
+        r = _find(parent, i)
+        if rootlabel[r] < 0:
+            rootlabel[r] = m
+            m += 1
+        labels[i] = rootlabel[r]
+    return labels
@@ -8,6 +8,7 @@ Everything in this module is implemented in numba.
 """
 import numpy as np
 import pandas as pd
+from collections import namedtuple
 from numba import (jit, jitclass, deferred_type,
                    optional, int64, float64, boolean)
 from exatomic.base import nbche
@@ -118,21 +119,49 @@ def _square_indices(n):
 
 
 @jit(nopython=True, nogil=True, cache=nbche)
-def density_from_momatrix(cmat, occvec):
-    nbas = len(occvec)
-    arlen = nbas * (nbas + 1) // 2
-    dens = np.empty(arlen, dtype=np.float64)
-    chi0 = np.empty(arlen, dtype=np.int64)
-    chi1 = np.empty(arlen, dtype=np.int64)
-    frame = np.zeros(arlen, dtype=np.int64)
+def _pack_triangle(sq, out):
+    """Pack the lower triangle of a square matrix (i * (i + 1) / 2 + j)."""
     cnt = 0
-    for i in range(nbas):
+    for i in range(sq.shape[0]):
         for j in range(i + 1):
-            dens[cnt] = (cmat[i,:] * cmat[j,:] * occvec).sum()
-            chi0[cnt] = i
-            chi1[cnt] = j
+            out[cnt] = sq[i, j]
             cnt += 1
-    return chi0, chi1, dens, frame
+
+
+def density_from_momatrix(cmat, occvec):
+    """Compute the (lower triangular) density matrix :math:`(C n)C^{T}`
+    by matrix multiplication.
+
+    Args:
+        cmat (np.ndarray): (nchi, norb) square C matrix or (nden, nchi, norb)
+                           with one C matrix per density (e.g. spin)
+        occvec (np.ndarray): (norb,) occupations or (norb, nden) for multiple
+                             occupation vectors
+
+    Returns:
+        chi0, chi1, dens, frame: dens is (ntri,) or (ntri, nden) if occvec
+            is two dimensional or cmat three dimensional
+    """
+    cmat = np.asarray(cmat, dtype=np.float64)
+    occvec = np.asarray(occvec, dtype=np.float64)
+    multi = occvec.ndim == 2 or cmat.ndim == 3
+    occs = occvec.reshape(occvec.shape[0], -1)
+    cmats = cmat.reshape((-1,) + cmat.shape[-2:])
+    if cmats.shape[0] > 1 and occs.shape[1] not in (1, cmats.shape[0]):
+        raise ValueError("one occupation vector per C matrix is required")
+    nden = max(occs.shape[1], cmats.shape[0])
+    nbas = cmats.shape[1]
+    dens = np.empty((nden, nbas * (nbas + 1) // 2), dtype=np.float64)
+    for k in range(nden):
+        cm = cmats[k % cmats.shape[0]]
+        occ = occs[:, k % occs.shape[1]]
+        # Unoccupied orbitals do not contribute
+        idx = np.flatnonzero(occ)
+        cm = cm[:, idx]
+        _pack_triangle(np.dot(cm * occ[idx], cm.T), dens[k])
+    chi0, chi1 = _tri_indices(dens[0])
+    frame = np.zeros(dens.shape[1], dtype=np.int64)
+    return chi0, chi1, (dens.T if multi else dens[0]), frame
 
 
 @jit(nopython=True, nogil=True, cache=nbche)
@@ -164,7 +193,6 @@ def momatrix_as_square(movec):
 # Reordering matrix elements can be useful #
 ############################################
 
-@jit(nopython=True, nogil=True, cache=nbche)
 def _index_map(old, new):
     """
     Basis functions are uniquely defined by 4 indices;
@@ -172,7 +200,8 @@ def _index_map(old, new):
     shell is defined here as corresponding to a column index in an instance
     of a :class:`~exatomic.algorithms.numerical.Shell`. This function
     simply finds the mapping between the `old` basis set ordering scheme
-    and the new one.
+    and the new one, by packing the indices into a single integer key
+    and searching the sorted `old` keys.
 
     Args:
         old (np.ndarray): order [center, L, ml, shell]
@@ -181,15 +210,21 @@ def _index_map(old, new):
     Returns:
         mappr (np.ndarray): old -> new indices
     """
-    mappr = np.empty(len(new), dtype=np.int64)
-    for ni in range(len(new)):
-        for oi in range(len(old)):
-            if (new[ni] == old[oi]).all():
-                mappr[ni] = oi
-                break
+    old = np.asarray(old, dtype=np.int64)
+    new = np.asarray(new, dtype=np.int64)
+    lo = np.minimum(old.min(axis=0), new.min(axis=0))
+    dims = np.maximum(old.max(axis=0), new.max(axis=0)) - lo + 1
+    okey = np.ravel_multi_index((old - lo).T, dims)
+    nkey = np.ravel_multi_index((new - lo).T, dims)
+    srt = np.argsort(okey, kind='mergesort')
+    pos = np.searchsorted(okey[srt], nkey)
+    pos[pos == len(okey)] = 0
+    mappr = srt[pos]
+    if not (okey[mappr] == nkey).all():
+        raise ValueError("basis functions in new are missing from old")
     return mappr
 
-@jit(nopython=True, nogil=True, cache=nbche)
+
 def _reorder_matrix(old, new, values):
     """
     Reorders matrix elements according to an old and new basis set order.
@@ -197,40 +232,57 @@ def _reorder_matrix(old, new, values):
     Args:
         old (np.ndarray): order [center, L, ml, shell]
         new (np.ndarray): order [center, L, ml, shell]
+        values (np.ndarray): (n, n) matrix or (nmat, n, n) matrices
 
     Returns:
         nvals (np.ndarray): reordered matrix
     """
-    nvals = np.empty(values.shape)
     mappr = _index_map(old, new)
-    for ni, oi in enumerate(mappr):
-        for nj, oj in enumerate(mappr):
-            nvals[ni, nj] = values[oi, oj]
-    return nvals
+    return values[..., mappr[:, None], mappr]
 
 
 def reorder_matrix(uni_to_reorder, ordered_uni, attr='momatrix', mocoefs='coef'):
     """
     Reorders matrix elements in a uni_to_reorder by the basis set order
-    defined in ordered_uni.
+    defined in ordered_uni. Several matrices are reordered in one call
+    by passing lists of attr and/or mocoefs.
+
+    .. code-block:: python
+
+        cmat = reorder_matrix(uni, ordered)
+        cmat, cmat1, ovl = reorder_matrix(uni, ordered,
+                                          attr=['momatrix', 'momatrix', 'overlap'],
+                                          mocoefs=['coef', 'coef1', 'coef'])
 
     Args:
         uni_to_reorder (:class:`~exatomic.core.universe.Universe`): uni to reorder
         ordered_uni (:class:`~exatomic.core.universe.Universe`): ordered uni
-        attr (str): specify if non-standard matrices (default "momatrix")
-        mocoefs (str): column name in gettattr(uni_to_reorder, attr)
+        attr (str, list): specify if non-standard matrices (default "momatrix")
+        mocoefs (str, list): column name in gettattr(uni_to_reorder, attr)
 
     Returns:
-        reordered (pd.DataFrame): reordered matrix with labeled columns and indices
+        reordered (pd.DataFrame): reordered matrix with labeled columns and
+            indices (a list of them if attr or mocoefs is a list)
     """
+    batch = not (isinstance(attr, str) and isinstance(mocoefs, str))
+    attrs = [attr] if isinstance(attr, str) else list(attr)
+    coefs = [mocoefs] if isinstance(mocoefs, str) else list(mocoefs)
+    if len(attrs) == 1: attrs *= len(coefs)
+    if len(coefs) == 1: coefs *= len(attrs)
+    if len(attrs) != len(coefs):
+        raise ValueError("attr and mocoefs must have the same length")
     cols = ['center', 'L', 'ml', 'shell']
     old = uni_to_reorder.current_basis_set_order[cols].values.astype(np.int64)
     new = ordered_uni.current_basis_set_order[cols].values.astype(np.int64)
-    val = getattr(uni_to_reorder, attr).square(column=mocoefs).values
-    cmat = _reorder_matrix(old, new, val)
-    idxs = pd.Index(range(val.shape[0]), name='chi')
-    cols = pd.Index(range(val.shape[0]), name='orbital')
-    return pd.DataFrame(cmat, columns=cols, index=idxs)
+    mappr = _index_map(old, new)
+    reordered = []
+    for att, col in zip(attrs, coefs):
+        sq = getattr(uni_to_reorder, att).square(column=col)
+        val = sq.values[mappr[:, None], mappr]
+        idxs = pd.Index(range(val.shape[0]), name=sq.index.name or 'chi')
+        cols = pd.Index(range(val.shape[1]), name=sq.columns.name or 'orbital')
+        reordered.append(pd.DataFrame(val, columns=cols, index=idxs))
+    return reordered if batch else reordered[0]
 
 #######################
 # Basis set expansion #
@@ -266,6 +318,79 @@ def _enum_spherical(L, increasing=True):
 # Basis set classes #
 #####################
 
+ShellArrays = namedtuple('ShellArrays', ['L', 'nprim', 'ncont', 'prim_ptr',
+                                         'coef_ptr', 'alphas', 'coefs', 'rs',
+                                         'ns', 'spherical', 'gaussian', 'set'])
+ShellArrays.__doc__ = """Struct-of-arrays representation of the shells of a
+basis set, an alternative to a collection of :class:`~exatomic.algorithms.numerical.Shell`
+jitclasses that can be passed directly to compiled functions cached to disk
+(``cache=True``).
+
+Shell s has primitives prim_ptr[s]:prim_ptr[s + 1] of alphas (and rs, ns
+for Slater type functions) and (nprim, ncont) contraction coefficients
+coefs[coef_ptr[s]:coef_ptr[s + 1]] in row major order.
+
+See :meth:`~exatomic.core.basis.BasisSet.shell_arrays` and
+:func:`~exatomic.algorithms.numerical.norm_contract`.
+"""
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _norm_contract(L, spherical, gaussian, prim_ptr, coef_ptr, alphas, coefs, ns,
+                   facs, dfacs):
+    """Normalized contraction coefficients of all shells (see
+    :meth:`~exatomic.algorithms.numerical.Shell.norm_contract`); facs and
+    dfacs tabulate fac(i) and dfac21(l), as the recursive helpers cannot be
+    cached."""
+    out = coefs.copy()
+    for s in range(len(L)):
+        p0 = prim_ptr[s]
+        nprim = prim_ptr[s + 1] - p0
+        c0 = coef_ptr[s]
+        ncont = (coef_ptr[s + 1] - c0) // max(nprim, 1)
+        if not gaussian:
+            for p in range(nprim):
+                a2 = 2 * alphas[p0 + p]
+                n = ns[p0 + p]
+                nrm = a2 ** n * (a2 / facs[2 * n]) ** 0.5
+                for c in range(ncont):
+                    out[c0 + p * ncont + c] *= nrm
+            continue
+        if spherical[s]:
+            # float is (2 / np.pi) ** 0.25
+            pre = 0.893243841738002 / np.sqrt(dfacs[L[s]])
+        else:
+            # float is (2 * np.pi) ** -0.75
+            pre = 0.251979435538381
+        ltot = L[s] + 1.5
+        lhaf = ltot / 2.
+        for c in range(ncont):
+            norm = 0.
+            for pi in range(nprim):
+                ai = alphas[p0 + pi]
+                for pj in range(nprim):
+                    aj = alphas[p0 + pj]
+                    ovl = (2. * (np.sqrt(ai * aj) / (ai + aj))) ** ltot
+                    norm += (coefs[c0 + pi * ncont + c] *
+                             coefs[c0 + pj * ncont + c] * ovl)
+            norm = pre / np.sqrt(norm)
+            for p in range(nprim):
+                out[c0 + p * ncont + c] *= norm * (4.0 * alphas[p0 + p]) ** lhaf
+    return out
+
+
+def norm_contract(shls):
+    """Normalized contraction coefficients of a
+    :class:`~exatomic.algorithms.numerical.ShellArrays`, laid out as its coefs."""
+    facs = np.array([fac(i) for i in range(2 * shls.ns.max(initial=0) + 1)],
+                    dtype=np.float64)
+    dfacs = np.array([dfac21(l) for l in range(shls.L.max(initial=0) + 1)],
+                     dtype=np.float64)
+    return _norm_contract(shls.L, shls.spherical, shls.gaussian, shls.prim_ptr,
+                          shls.coef_ptr, shls.alphas, shls.coefs, shls.ns,
+                          facs, dfacs)
+
+
 shell_type = deferred_type()
 
 @jitclass([('L', int64), ('nprim', int64), ('ncont', int64),
@@ -8,31 +8,89 @@ Building discrete molecular orbitals (for visualization) requires a complex
 set of operations that are provided by this module and wrapped into a clean API.
 """
 import numpy as np
-from numba import TypingError
 from datetime import datetime
 from exatomic import func_log
 from exatomic.base import sym2z
 from .orbital_util import (
     numerical_grid_from_field_params, _determine_fps,
-    _determine_vector, _compute_orb_ang_mom, _compute_current_density,
-    _compute_density, _check_column, _make_field,
-    _compute_orbitals_numba, _compute_orbitals_numpy)
+    _determine_vector, _compute_orb_ang_mom, _current_density_matrix,
+    _contract_current_density,
+    _compute_density, _check_column, _make_field, _compute_orbitals,
+    _compute_density_matrix,
+    BasisCache, _basis_fingerprint, _grid_key)
 
 
-def _setup_orbital(uni, verbose, vector, fps, icoefs, log=None, jcoefs=None, irrep=None):
-    """Boilerplate for starting the functions in this module."""
+def _basis_cache(uni):
+    """Return the basis function value cache of a universe, invalidating it
+    (and the universe's basis functions) if the atoms or basis set changed."""
+    cache = getattr(uni, '_basis_cache', None)
+    if cache is None:
+        cache = uni._basis_cache = BasisCache()
+    frame = getattr(getattr(uni, '_basis_functions', None), '_frame', 0)
+    stale = cache.fingerprint is not None
+    if not cache.validate(_basis_fingerprint(uni, frame)) and stale:
+        del uni['_basis_functions']
+    return cache
+
+
+def _basis_values(uni, x, y, z, grid=None, irrep=None, screen=None,
+                  bounds=None, verbose=False, derivatives=False):
+    """Evaluate basis functions on (a block of) a grid, reusing values
+    cached for the same grid parameters, irrep and screening threshold.
+
+    Args:
+        grid (tuple): grid parameters (see :func:`~exatomic.algorithms.orbital_util._grid_key`);
+                      values are not cached if None
+        bounds (tuple): (start, stop) of the block of grid points (default all)
+        derivatives (bool): return a (4, nbf, npts) array of values and x, y
+                            and z derivatives (screen does not apply)
+    """
+    i, j = (0, len(x)) if bounds is None else bounds
+    if derivatives:
+        def _evaluate():
+            bvs, grs, _ = uni.basis_functions.evaluate_derivatives(
+                x[i:j], y[i:j], z[i:j], irrep=irrep, laplacian=False)
+            return np.concatenate((bvs[None], grs))
+    else:
+        def _evaluate():
+            return uni.basis_functions.evaluate(x[i:j], y[i:j], z[i:j], irrep=irrep,
+                                                verbose=verbose, screen=screen)
+    if grid is None:
+        return _evaluate()
+    cache = _basis_cache(uni)
+    key = (uni.basis_functions._frame, grid, irrep, screen, i, j)
+    if derivatives:
+        key = key[:3] + (None, i, j, 'gradient')
+    bvs = cache.get(key)
+    if bvs is None:
+        bvs = _evaluate()
+        cache.put(key, bvs)
+    return bvs
+
+
+def _setup_orbital(uni, verbose, vector, fps, icoefs, log=None, jcoefs=None,
+                   irrep=None, screen=None, blocked=False):
+    """Boilerplate for starting the functions in this module.
+
+    If blocked, basis functions are not evaluated here (bvs is None) but
+    on blocks of grid points (see :func:`~exatomic.algorithms.orbital._compute_orbital_blocks`).
+    """
     log = log or func_log(_setup_orbital)
     t1 = datetime.now()
+    _basis_cache(uni)
     nbf = len(uni.basis_functions)
     if irrep is not None:
         nbf = len(uni.basis_set_order.groupby('irrep').get_group(irrep).index)
-    if verbose:
+    if verbose and not blocked:
         p1 = 'Evaluating {} basis functions once.'
         log.debug(p1.format(nbf))
     vector = _determine_vector(uni, vector, irrep)
     fps = _determine_fps(uni, fps, len(vector))
     x, y, z = numerical_grid_from_field_params(fps)
-    bvs = uni.basis_functions.evaluate(x, y, z, irrep=irrep, verbose=verbose)
+    bvs = None
+    if not blocked:
+        bvs = _basis_values(uni, x, y, z, grid=_grid_key(fps), irrep=irrep,
+                            screen=screen, verbose=verbose)
     icoefs = _check_column(uni, 'current_momatrix', icoefs)
     icoefs = uni.current_momatrix.square(column=icoefs, irrep=irrep).values
     if jcoefs is not None:
@@ -41,14 +99,93 @@ def _setup_orbital(uni, verbose, vector, fps, icoefs, log=None, jcoefs=None, irr
         return t1, vector, fps, x, y, z, bvs, icoefs, jcoefs
     return t1, vector, fps, x, y, z, bvs, icoefs
 
-def _compute_orbital(verbose, npts, bvs, vector, cmat, log=None):
-    log = log or func_log(_compute_orbital)
-    try: ovs = _compute_orbitals_numba(npts, bvs, vector, cmat)
-    except (ValueError, IndexError, AssertionError, TypingError) as e:
-        if verbose: log.error('numba eval failed, falling back to numpy')
-        ovs = _compute_orbitals_numpy(npts, bvs, vector, cmat)
+def _block_size(nbf, block=None):
+    """Number of grid points per block such that the basis function
+    values of a block take at most about 256 MB."""
+    if block is None:
+        block = max(1024, (1 << 25) // max(nbf, 1))
+    return int(block)
+
+
+def _compute_orbital_blocks(uni, verbose, x, y, z, vector, cmat, irrep=None,
+                            screen=None, block=None, occvec=None, dtype=np.float64,
+                            grid=None, log=None):
+    """Evaluate basis functions on blocks of grid points and contract
+    each block with the MO coefficients right away, so that at most
+    (nbf, block) basis function values are held in memory at once.
+    Each block is contracted for all orbitals in a single matrix product
+    (see :func:`~exatomic.algorithms.orbital_util._compute_orbitals`)
+    into one reused buffer.
+
+    Args:
+        uni (:class:`~exatomic.core.universe.Universe`): a universe
+        x (np.ndarray): grid x coordinates
+        y (np.ndarray): grid y coordinates
+        z (np.ndarray): grid z coordinates
+        vector (np.ndarray): MO vectors to evaluate
+        cmat (np.ndarray): square MO coefficient matrix
+        irrep (int): if symmetrized, the irrep to which the orbitals belong
+        screen (float): basis function screening threshold
+        block (int): grid points per block (default about 256 MB of basis functions)
+        occvec (np.ndarray): if given, return the density from these occupations
+        dtype (np.dtype): precision of the orbital values (default np.float64)
+        grid (tuple): grid parameters to cache basis function values under
+
+    Returns:
+        ovs (np.ndarray): (nvec, npts) orbital values or (npts, ) density
+    """
+    log = log or func_log(_compute_orbital_blocks)
+    npts = len(x)
+    block = _block_size(cmat.shape[0], block)
+    if verbose:
+        p1 = 'Evaluating {} basis functions on {} block(s) of {} points.'
+        log.debug(p1.format(cmat.shape[0], (npts + block - 1) // block, block))
+    if occvec is None:
+        ovs = np.empty((len(vector), npts), dtype=dtype)
+    else:
+        dtype = np.float64
+        ovs = np.empty(npts, dtype=dtype)
+        occvec = np.asarray(occvec, dtype=dtype)
+    nvec = len(vector)
+    cvs = np.ascontiguousarray(cmat[:, vector].T, dtype=dtype)
+    buf = np.empty(nvec * min(block, npts), dtype=dtype)
+    for i in range(0, npts, block):
+        j = min(i + block, npts)
+        bvs = _basis_values(uni, x, y, z, grid=grid, irrep=irrep,
+                            screen=screen, bounds=(i, j))
+        blk = _compute_orbitals(cvs, bvs, out=buf[:nvec * (j - i)].reshape(nvec, j - i))
+        if occvec is None:
+            ovs[:, i:j] = blk
+        else:
+            ovs[i:j] = _compute_density(blk, occvec)
     return ovs
 
+
+def _compute_density_blocks(uni, verbose, x, y, z, dmat, screen=None,
+                            block=None, grid=None, log=None):
+    """Evaluate the density from a square density matrix on blocks of grid
+    points (see :func:`~exatomic.algorithms.orbital_util._compute_density_matrix`).
+
+    Args:
+        dmat (np.ndarray): (nbf, nbf) square density matrix
+        screen (float): basis function and pair screening threshold
+        block (int): grid points per block (default about 256 MB of basis functions)
+        grid (tuple): grid parameters to cache basis function values under
+    """
+    log = log or func_log(_compute_density_blocks)
+    npts = len(x)
+    block = _block_size(dmat.shape[0], block)
+    if verbose:
+        p1 = 'Evaluating the density matrix on {} block(s) of {} points.'
+        log.debug(p1.format((npts + block - 1) // block, block))
+    dens = np.empty(npts, dtype=np.float64)
+    for i in range(0, npts, block):
+        j = min(i + block, npts)
+        bvs = _basis_values(uni, x, y, z, grid=grid, screen=screen, bounds=(i, j))
+        dens[i:j] = _compute_density_matrix(dmat, bvs, screen=screen)
+    return dens
+
+
 def _teardown_orbital(uni, verbose, field, t1, inplace, name='orbitals', log=None):
     """Boilerplate for finishing the functions in this module."""
     log = log or func_log(_teardown_orbital)
@@ -63,7 +200,8 @@ def _teardown_orbital(uni, verbose, field, t1, inplace, name='orbitals', log=Non
 
 def add_molecular_orbitals(uni, field_params=None, mocoefs=None,
                            vector=None, frame=0, inplace=True,
-                           replace=False, verbose=True, irrep=None):
+                           replace=False, verbose=True, irrep=None, screen=None,
+                           block=None, dtype=np.float64):
     """A universe must contain basis_set, [basis_set_order], and
     momatrix attributes to use this function.  Evaluate molecular
     orbitals on a numerical grid.  Attempts to generate reasonable
@@ -80,48 +218,81 @@ def add_molecular_orbitals(uni, field_params=None, mocoefs=None,
         inplace (bool): if False, return the field obj instead of modifying uni
         replace (bool): if False, do not delete any previous fields
         irrep (int): if symmetrized, the irrep to which the orbitals belong
+        screen (float): basis function screening threshold (default None)
+        block (int): grid points per block of basis function evaluation
+        dtype (np.dtype): precision of the orbital fields (e.g. np.float32)
 
     Warning:
         If replace is True, removes any fields previously attached to the universe
     """
     log = func_log(add_molecular_orbitals)
     if replace and hasattr(uni, '_field'): del uni.__dict__['_field']
-    t1, vector, fps, x, y, z, bvs, mocoefs = \
-        _setup_orbital(uni, verbose, vector, field_params, mocoefs, irrep=irrep, log=log)
-    ovs = _compute_orbital(verbose, len(x), bvs, vector, mocoefs, log=log)
+    t1, vector, fps, x, y, z, _, mocoefs = \
+        _setup_orbital(uni, verbose, vector, field_params, mocoefs,
+                       irrep=irrep, log=log, blocked=True)
+    ovs = _compute_orbital_blocks(uni, verbose, x, y, z, vector, mocoefs,
+                                  irrep=irrep, screen=screen, block=block,
+                                  dtype=dtype, grid=_grid_key(fps), log=log)
     field = _make_field(ovs, fps)
     return _teardown_orbital(uni, verbose, field, t1, inplace, log=log)
 
 
 def add_density(uni, field_params=None, mocoefs=None, orbocc=None,
-                inplace=True, frame=0, norm='Nd', verbose=True):
+                inplace=True, frame=0, norm='Nd', verbose=True, screen=None,
+                block=None, density_matrix=None):
     """A universe must contain basis_set, [basis_set_order], and
     momatrix attributes to use this function.  Compute a density
     with C matrix mocoefs and occupation vector orbocc.
 
+    By default every occupied orbital is evaluated on the grid. With
+    density_matrix the density is evaluated directly from a density matrix,
+
+    .. math::
+
+        \\rho(r) = \\sum_{\\mu\\nu}D_{\\mu\\nu}\\phi_{\\mu}(r)\\phi_{\\nu}(r)
+
+    whose cost does not depend on the number of occupied orbitals (e.g.
+    natural orbitals with many fractional occupations).
+
     Args:
         uni (:class:`~exatomic.container.Universe`): a universe
         field_params (dict): See :func:`~exatomic.algorithms.orbital_util.make_fps`
         mocoefs (str): column in uni.current_momatrix (default 'coef')
         orbocc (str): column in uni.orbital (default 'occupation')
         inplace (bool): if False, return the field obj instead of modifying uni
+        screen (float): basis function screening threshold (default None)
+        block (int): grid points per block of basis function evaluation
+        density_matrix (bool, :class:`~exatomic.core.orbital.DensityMatrix`): if True,
+            build the density matrix from mocoefs and orbocc, else use the given one
     """
     log = func_log(add_density)
     mocol = mocoefs
-    t1, vector, fps, x, y, z, bvs, mocoefs = \
-        _setup_orbital(uni, verbose, None, field_params, mocoefs, log=log)
+    t1, vector, fps, x, y, z, _, mocoefs = \
+        _setup_orbital(uni, verbose, None, field_params, mocoefs, log=log,
+                       blocked=True)
     orbocc = mocol if orbocc is None and mocol != 'coef' else orbocc
     orbocc = _check_column(uni, 'orbital', orbocc)
     vector = uni.orbital[~np.isclose(uni.orbital[orbocc], 0)].index.values
     orbocc = uni.orbital.loc[vector][orbocc].values
-    ovs = _compute_orbital(verbose, len(x), bvs, vector, mocoefs, log=log)
-    field = _make_field(_compute_density(ovs, orbocc), fps.loc[0])
+    if density_matrix is None or density_matrix is False:
+        dens = _compute_orbital_blocks(uni, verbose, x, y, z, vector, mocoefs,
+                                       screen=screen, block=block, occvec=orbocc,
+                                       grid=_grid_key(fps), log=log)
+    else:
+        if density_matrix is True:
+            cocc = mocoefs[:, vector]
+            dmat = np.dot(cocc * orbocc, cocc.T)
+        else:
+            dmat = density_matrix.square(frame=frame).values
+        dens = _compute_density_blocks(uni, verbose, x, y, z, dmat, screen=screen,
+                                       block=block, grid=_grid_key(fps), log=log)
+    field = _make_field(dens, fps.loc[0])
     return _teardown_orbital(uni, verbose, field, t1, inplace, name='density', log=log)
 
 
 def add_orb_ang_mom(uni, field_params=None, rcoefs=None, icoefs=None,
                     frame=0, orbocc=None, maxes=None, inplace=True,
-                    norm='Nd', verbose=True):
+                    norm='Nd', verbose=True, block=None):
     """A universe must contain basis_set, [basis_set_order], and
     momatrix attributes to use this function.  Compute the orbital
     angular momentum.  Requires C matrices from SODIZLDENS.X.X.R,I
@@ -135,32 +306,42 @@ def add_orb_ang_mom(uni, field_params=None, rcoefs=None, icoefs=None,
         maxes (np.ndarray): 3x3 array of magnetic axes (default np.eye(3))
         orbocc (str): column in uni.orbital (default 'lreal')
         inplace (bool): if False, return the field obj instead of modifying uni
+        block (int): grid points per block of basis function evaluation
     """
     log = func_log(add_orb_ang_mom)
     if rcoefs is None or icoefs is None:
         raise Exception("Must specify rcoefs and icoefs")
     rcol = rcoefs
-    t1, vector, fps, x, y, z, bvs, rcoefs, icoefs = \
-        _setup_orbital(uni, verbose, None, field_params, rcoefs, jcoefs=icoefs)
+    t1, vector, fps, x, y, z, _, rcoefs, icoefs = \
+        _setup_orbital(uni, verbose, None, field_params, rcoefs, jcoefs=icoefs,
+                       blocked=True)
     orbocc = rcol if orbocc is None else orbocc
     if maxes is None:
         maxes = np.eye(3)
         if verbose:
             log.debug("If magnetic axes are not an identity matrix, specify maxes.")
     occvec = uni.orbital[orbocc].values
-    grx = uni.basis_functions.evaluate_diff(x, y, z, cart='x', verbose=verbose)
-    gry = uni.basis_functions.evaluate_diff(x, y, z, cart='y', verbose=verbose)
-    grz = uni.basis_functions.evaluate_diff(x, y, z, cart='z', verbose=verbose)
-    t2 = datetime.now()
+    mmat = _current_density_matrix(rcoefs, icoefs, occvec)
+    npts = len(x)
+    block = _block_size(4 * mmat.shape[0], block)
+    grid = _grid_key(fps)
+    ang_mom = np.empty((4, npts), dtype=np.float64)
+    tgrid = tcurr = 0
+    for i in range(0, npts, block):
+        j = min(i + block, npts)
+        t2 = datetime.now()
+        bvs = _basis_values(uni, x, y, z, grid=grid, bounds=(i, j),
+                            derivatives=True)
+        t3 = datetime.now()
+        curx, cury, curz = _contract_current_density(mmat, *bvs)
+        ang_mom[:, i:j] = _compute_orb_ang_mom(x[i:j], y[i:j], z[i:j],
+                                               curx, cury, curz, maxes)
+        tgrid += (t3 - t2).total_seconds()
+        tcurr += (datetime.now() - t3).total_seconds()
     if verbose:
         p1 = 'Timing: grid evaluation  - {:>8.2f}s.'
-        log.info(p1.format((t2-t1).total_seconds()))
-    curx, cury, curz = _compute_current_density(
-        bvs, grx, gry, grz, rcoefs, icoefs, occvec, verbose=verbose)
-    t3 = datetime.now()
-    if verbose:
+        log.info(p1.format(tgrid))
         p2 = 'Timing: current density  - {:>8.2f}s.'
-        log.info(p2.format((t3-t2).total_seconds()))
-    field = _make_field(_compute_orb_ang_mom(
-        x, y, z, curx, cury, curz, maxes), fps)
+        log.info(p2.format(tcurr))
+    field = _make_field(ang_mom, fps)
     return _teardown_orbital(uni, verbose, field, t1, inplace, name='angmom')
@@ -11,11 +11,9 @@ These are their stories.
 from __future__ import division
 import six
 import numpy as np
+from collections import OrderedDict
 import pandas as pd
 from numba import jit
-from numexpr import evaluate
-from IPython.display import display
-from ipywidgets import FloatProgress
 from exatomic.core.field import AtomicField
 from exatomic.base import nbpll
 
@@ -50,6 +48,87 @@ def compare_fields(uni0, uni1, rtol=5e-5, atol=1e-12, signed=True, verbose=True)
     return fracs
 
 
+class BasisCache(object):
+    """A memory bounded, least recently used cache of basis function
+    values evaluated on numerical grids. Entries are (read-only) arrays
+    keyed on (frame, grid, irrep, screen, block) and are dropped when the
+    fingerprint of the atoms and basis set they were computed from changes.
+
+    Args:
+        maxbytes (int): upper bound on the size of cached arrays (default 1 GB)
+    """
+    def get(self, key):
+        """Return cached values (or None), marking them most recently used."""
+        arr = self._data.pop(key, None)
+        if arr is not None:
+            self._data[key] = arr
+        return arr
+
+    def put(self, key, arr):
+        """Cache values, evicting least recently used entries as needed."""
+        if arr.nbytes > self.maxbytes:
+            return
+        if key in self._data:
+            self.nbytes -= self._data.pop(key).nbytes
+        while self._data and self.nbytes + arr.nbytes > self.maxbytes:
+            self.nbytes -= self._data.popitem(last=False)[1].nbytes
+        arr.setflags(write=False)
+        self._data[key] = arr
+        self.nbytes += arr.nbytes
+
+    def validate(self, fingerprint):
+        """Clear the cache if fingerprint differs from the cached one.
+
+        Returns:
+            valid (bool): False if the cache was invalidated
+        """
+        valid = fingerprint == self.fingerprint
+        if not valid:
+            self.clear()
+            self.fingerprint = fingerprint
+        return valid
+
+    def clear(self):
+        """Remove all cached values."""
+        self._data.clear()
+        self.nbytes = 0
+        self.fingerprint = None
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __init__(self, maxbytes=1 << 30):
+        self.maxbytes = maxbytes
+        self._data = OrderedDict()
+        self.nbytes = 0
+        self.fingerprint = None
+
+
+def _basis_fingerprint(uni, frame=0):
+    """Hash the atomic positions (of a frame), basis set, basis set order
+    and basis set metadata (spherical, program, gaussian) of a universe."""
+    atom = uni.atom[uni.atom['frame'] == frame][['x', 'y', 'z', 'set']]
+    atom = atom.astype({'set': np.int64})
+    bso = uni.current_basis_set_order
+    hsh = pd.util.hash_pandas_object
+    return (len(atom), hsh(atom).sum(), len(uni.basis_set),
+            hsh(uni.basis_set.astype({'set': np.int64})).sum(),
+            len(bso), hsh(bso).sum(),
+            tuple(uni.meta.get(key) for key in ('spherical', 'program', 'gaussian')))
+
+
+def _grid_key(fps):
+    """Hashable grid parameters of field parameters."""
+    if isinstance(fps, pd.DataFrame):
+        fps = fps.loc[0]
+    return tuple(float(fps[col]) for col in ('ox', 'oy', 'oz', 'nx', 'ny', 'nz',
+                                             'dxi', 'dxj', 'dxk', 'dyi', 'dyj',
+                                             'dyk', 'dzi', 'dzj', 'dzk'))
+
+
 def numerical_grid_from_field_params(fps):
     """Construct numerical grid arrays from field parameters.
 
@@ -168,40 +247,27 @@ def _make_field(flds, fps):
             field_values=[flds])
 
 
+def _current_density_matrix(cmatr, cmati, occvec):
+    """The (antisymmetric) matrix contracting basis functions and gradients
+    into the current density,
+    :math:`M = -\\frac{1}{2}(C_{r}nC_{i}^{T} - C_{i}nC_{r}^{T})`."""
+    xmat = np.dot(cmatr * occvec, cmati.T)
+    return -0.5 * (xmat - xmat.T)
+
+
+def _contract_current_density(mmat, bvs, gvx, gvy, gvz):
+    """Contract basis functions and gradients with the current density
+    matrix; as M is antisymmetric,
+    :math:`j_{x} = \\sum_{\\mu\\nu}M_{\\mu\\nu}(\\phi_{\\mu}\\partial_{x}\\phi_{\\nu} - \\partial_{x}\\phi_{\\mu}\\phi_{\\nu})
+    = 2\\sum_{\\nu}\\partial_{x}\\phi_{\\nu}(M^{T}\\phi)_{\\nu}`."""
+    mbvs = np.dot(mmat.T, bvs)
+    return tuple(2 * np.einsum('ij,ij->j', gv, mbvs) for gv in (gvx, gvy, gvz))
+
+
 def _compute_current_density(bvs, gvx, gvy, gvz, cmatr, cmati, occvec, verbose=True):
     """Compute the current density in each cartesian direction."""
-    nbas, npts = bvs.shape
-    curx = np.zeros(npts, dtype=np.float64)
-    cury = np.zeros(npts, dtype=np.float64)
-    curz = np.zeros(npts, dtype=np.float64)
-    cval = np.zeros(nbas, dtype=np.float64)
-    if verbose:
-        fp = FloatProgress(description='Computing:')
-        display(fp)
-    for mu in range(nbas):
-        if verbose:
-            fp.value = mu / nbas * 100
-        crmu = cmatr[mu]
-        cimu = cmati[mu]
-        bvmu = bvs[mu]
-        gvxmu = gvx[mu]
-        gvymu = gvy[mu]
-        gvzmu = gvz[mu]
-        for nu in range(nbas):
-            crnu = cmatr[nu]
-            cinu = cmati[nu]
-            bvnu = bvs[nu]
-            gvxnu = gvx[nu]
-            gvynu = gvy[nu]
-            gvznu = gvz[nu]
-            cval = evaluate('-0.5 * (occvec * (crmu * cinu - cimu * crnu))', out=cval)
-            csum = cval.sum()
-            evaluate('curx + csum * (bvmu * gvxnu - gvxmu * bvnu)', out=curx)
-            evaluate('cury + csum * (bvmu * gvynu - gvymu * bvnu)', out=cury)
-            evaluate('curz + csum * (bvmu * gvznu - gvzmu * bvnu)', out=curz)
-    if verbose:
-        fp.close()
-    return curx, cury, curz
+    mmat = _current_density_matrix(cmatr, cmati, occvec)
+    return _contract_current_density(mmat, bvs, gvx, gvy, gvz)
 
 
 def _determine_vector(uni, vector, irrep=None):
@@ -290,20 +356,46 @@ def _check_column(uni, df, key):
     return key
 
 
-@jit(nopython=True, nogil=True, parallel=nbpll)
-def _compute_orbitals_numba(npts, bvs, vecs, cmat):
-    """Compute orbitals from numerical basis functions."""
-    ovs = np.empty((len(vecs), npts), dtype=np.float64)
-    for i, vec in enumerate(vecs):
-        ovs[i] = np.dot(cmat[:, vec], bvs)
-    return ovs
-
-def _compute_orbitals_numpy(npts, bvs, vecs, cmat):
-    """Compute orbitals from numerical basis functions."""
-    ovs = np.empty((len(vecs), npts), dtype=np.float64)
-    for i, vec in enumerate(vecs):
-        ovs[i] = np.dot(cmat[:, vec], bvs)
-    return ovs
+def _compute_orbitals(cvs, bvs, out=None):
+    """Compute orbitals from numerical basis functions as a single
+    matrix product (one BLAS call for all orbitals).
+
+    Args:
+        cvs (np.ndarray): (nvec, nbf) MO coefficients, i.e. cmat[:, vecs].T
+        bvs (np.ndarray): (nbf, npts) basis function values
+        out (np.ndarray): C-contiguous (nvec, npts) result buffer whose
+                          dtype sets the precision of the product (optional)
+
+    Returns:
+        ovs (np.ndarray): (nvec, npts) orbital values
+    """
+    if out is None:
+        return np.dot(cvs, bvs)
+    return np.dot(cvs, bvs.astype(out.dtype, copy=False), out=out)
+
+def _compute_density_matrix(dmat, bvs, screen=None):
+    """Compute the density from the density matrix and numerical basis
+    functions, :math:`\\rho = \\sum_{\\mu\\nu}D_{\\mu\\nu}\\phi_{\\mu}\\phi_{\\nu}`,
+    as a matrix product. Basis functions whose pair contributions are bounded
+    by screen on all points (:math:`|\\phi_{\\mu}||D_{\\mu\\nu}||\\phi_{\\nu}|`,
+    using the maximum magnitudes of the basis functions) are dropped first.
+
+    Args:
+        dmat (np.ndarray): (nbf, nbf) square density matrix
+        bvs (np.ndarray): (nbf, npts) basis function values
+        screen (float): pair screening threshold (default drop vanishing functions only)
+
+    Returns:
+        dens (np.ndarray): (npts, ) density
+    """
+    bmax = np.abs(bvs).max(axis=1)
+    bound = bmax * np.abs(dmat).dot(bmax)
+    keep = np.flatnonzero(bound > (0 if screen is None else screen))
+    if len(keep) < len(bmax):
+        dmat = dmat[np.ix_(keep, keep)]
+        bvs = bvs[keep]
+    return np.einsum('ij,ij->j', np.dot(dmat, bvs), bvs)
+
 
 @jit(nopython=True, nogil=True, parallel=nbpll)
 def _compute_density(ovs, occvec):
@@ -8,8 +8,10 @@ Utilities for computing the overlap between gaussian type functions.
 """
 
 import numpy as np
+from multiprocessing.pool import ThreadPool
 from numba import jit, prange
-from .numerical import fac, fac2, dfac21, sdist, choose
+from .numerical import (fac, fac2, dfac21, sdist, choose, norm_contract,
+                        _enum_cartesian)
 from .car2sph import car2sph_scaled
 from exatomic.base import nbche
 
@@ -77,25 +79,20 @@ def _primitive_overlap(a1, a2, ax, ay, az, bx, by, bz, l1, m1, n1, l2, m2, n2):
 
 @jit(nopython=True, nogil=True, cache=nbche)
 def _primitive_kinetic(a1, a2, ax, ay, az, bx, by, bz, l1, m1, n1, l2, m2, n2):
-    """Compute the kinetic energy as a linear combination of overlap terms."""
-    #N, p, mu, ab2, pax, pay, paz, pbx, pby, pbz = \
-    p = _gaussian_product(a1, a2, ax, ay, az, bx, by, bz)
-    t =  4 * a1 * a2 * _primitive_overlap_product(l1 - 1, m1, n1, l2 - 1, m2, n2, *p)
-    t += 4 * a1 * a2 * _primitive_overlap_product(l1, m1 - 1, n1, l2, m2 - 2, n2, *p)
-    t += 4 * a1 * a2 * _primitive_overlap_product(l1, m1, n1 - 1, l2, m2, n2 - 1, *p)
-    if l1 and l2:
-        t += l1 * l2 * _primitive_overlap_product(l1 - 1, m1, n1, l2 - 1, m2, n2, *p)
-    if m1 and m2:
-        t += l1 * l2 * _primitive_overlap_product(l1, m1 - 1, n1, l2, m2 - 1, n2, *p)
-    if n1 and n2:
-        t += l1 * l2 * _primitive_overlap_product(l1, m1, n1 - 1, l2, m2, n2 - 1, *p)
-    if l1: t -=  2 * a2 * l1 * _primitive_overlap_product(l1 - 1, m1, n1, l2 + 1, m2, n2, *p)
-    if l2: t -=  2 * a1 * l2 * _primitive_overlap_product(l1 + 1, m1, n1, l2 - 1, m2, n2, *p)
-    if m1: t -=  2 * a2 * m1 * _primitive_overlap_product(l1, m1 - 1, n1, l2, m2 + 1, n2, *p)
-    if m2: t -=  2 * a1 * m2 * _primitive_overlap_product(l1, m1 + 1, n1, l2, m2 - 1, n2, *p)
-    if n1: t -=  2 * a2 * n1 * _primitive_overlap_product(l1, m1, n1 - 1, l2, m2, n2 + 1, *p)
-    if n2: t -=  2 * a1 * n2 * _primitive_overlap_product(l1, m1, n1 + 1, l2, m2, n2 - 1, *p)
-    return t / 2
+    """Compute a primitive cartesian kinetic energy integral as a linear
+    combination of overlap terms."""
+    N, p, mu, ab2, pax, pay, paz, pbx, pby, pbz = \
+        _gaussian_product(a1, a2, ax, ay, az, bx, by, bz)
+    sx = np.empty((l1 + 1, l2 + 3))
+    sy = np.empty((m1 + 1, m2 + 3))
+    sz = np.empty((n1 + 1, n2 + 3))
+    _obara_saika_1d(l1, l2 + 2, pax, pbx, p, N, sx)
+    _obara_saika_1d(m1, m2 + 2, pay, pby, p, N, sy)
+    _obara_saika_1d(n1, n2 + 2, paz, pbz, p, N, sz)
+    return np.exp(-mu * ab2) * (
+        _kinetic_1d(l1, l2, a2, sx) * sy[m1, m2] * sz[n1, n2] +
+        sx[l1, l2] * _kinetic_1d(m1, m2, a2, sy) * sz[n1, n2] +
+        sx[l1, l2] * sy[m1, m2] * _kinetic_1d(n1, n2, a2, sz))
 
 ######################################
 # Generators over shells/shell-pairs #
@@ -190,24 +187,323 @@ def _cartesian_shell_pairs(ndim, ptrs, xyzs, *shls):
 ##################################
 
 @jit(nopython=True, nogil=True, cache=nbche)
-def _obara_s_recurr(p, l, m, pa, pb, s):
-    """There is a bug in this function. Do not use."""
-    if not l + m: return s
+def _obara_saika_1d(la, lb, pa, pb, p, s, out):
+    """Fill out[i, j] (i <= la, j <= lb) with one dimensional cartesian
+    overlaps of a primitive pair by the Obara-Saika recurrence relations
+
+    .. math::
+
+        S_{i+1,j} = P_{A}S_{ij} + \\frac{1}{2p}\\left(iS_{i-1,j} + jS_{i,j-1}\\right)
+
+    starting from :math:`S_{00} = s`; see equations 9.3.8 and 9.3.9 of
+    Molecular Electronic-Structure Theory by Trygve Helgaker et al.
+    """
     p2 = 1 / (2 * p)
-    s0 = np.zeros((l + 1, m + 1))
-    s0[0, 0] = s
-    if l: s0[1, 0] = pa * s
-    if m: s0[0, 1] = pb * s
-    if l and m: s0[1, 1] = pb * s0[1, 0] + p2 * s
-    for i in range(1, l):
-        for j in range(1, m):
-            mul = p2 * (i * s0[i - 1, j] + j * s0[i, j - 1])
-            s0[i + 1, j] = pa * s0[i, j] + mul
-            s0[i, j + 1] = pb * s0[i, j] + mul
-            s0[i + 1, j + 1] = pa * s0[i, j + 1] + p2 * ((i + 1) * s0[i, j] + j * s0[i + 1, j])
+    for i in range(la + 1):
+        for j in range(lb + 1):
+            if i:
+                val = pa * out[i - 1, j]
+                if i > 1: val += (i - 1) * p2 * out[i - 2, j]
+                if j: val += j * p2 * out[i - 1, j - 1]
+            elif j:
+                val = pb * out[0, j - 1]
+                if j > 1: val += (j - 1) * p2 * out[0, j - 2]
+            else:
+                val = s
+            out[i, j] = val
+
+
+@jit(nopython=True, nogil=True, cache=nbche)
+def _obara_s_recurr(p, l, m, pa, pb, s):
+    """One dimensional overlap S_{lm} by the Obara-Saika recurrence."""
+    s0 = np.empty((l + 1, m + 1))
+    _obara_saika_1d(l, m, pa, pb, p, s, s0)
     return s0[l, m]
 
 
+@jit(nopython=True, nogil=True, cache=nbche)
+def _kinetic_1d(i, j, b, s):
+    """One dimensional kinetic energy integral from a table of overlaps
+    (with at least j + 2 columns)."""
+    t = b * (2 * j + 1) * s[i, j] - 2 * b * b * s[i, j + 2]
+    if j > 1: t -= 0.5 * j * (j - 1) * s[i, j - 2]
+    return t
+
+
+@jit(nopython=True, nogil=True, cache=nbche)
+def _multipole_1d(i, j, e, bc, s):
+    """One dimensional multipole integral of order e (<= 2) about C from a
+    table of overlaps (with at least j + e columns), bc = B - C."""
+    if e == 1: return s[i, j + 1] + bc * s[i, j]
+    if e == 2: return s[i, j + 2] + 2 * bc * s[i, j + 1] + bc * bc * s[i, j]
+    return s[i, j]
+
+
+####################################################
+# Screened integrals over flat (ShellArrays) shells #
+####################################################
+
+# Operator kinds and number of components of shell_pair_integrals
+_integral_kinds = {'overlap': (0, 1), 'kinetic': (1, 1),
+                   'dipole': (2, 3), 'quadrupole': (3, 6)}
+# Cartesian exponents of the quadrupole components xx, xy, xz, yy, yz, zz
+_quadrupole_powers = np.array([[2, 0, 0], [1, 1, 0], [1, 0, 1],
+                               [0, 2, 0], [0, 1, 1], [0, 0, 2]], dtype=np.int64)
+
+
+def _car2sph_blocks(lmax):
+    """Padded cartesian to spherical transforms, c2s[L, :ncart, :nsph]
+    (see :func:`~exatomic.algorithms.car2sph.car2sph_scaled`)."""
+    c2s = np.zeros((lmax + 1, (lmax + 1) * (lmax + 2) // 2, 2 * lmax + 1))
+    c2s[0, 0, 0] = 1.
+    for L in range(1, lmax + 1):
+        blk = car2sph_scaled(L)
+        c2s[L, :blk.shape[0], :blk.shape[1]] = blk
+    return c2s
+
+
+def _cartesian_powers(lmax):
+    """Cartesian powers of each L in the order of Shell.enum_cartesian."""
+    powers = np.zeros((lmax + 1, (lmax + 1) * (lmax + 2) // 2, 3), dtype=np.int64)
+    for L in range(lmax + 1):
+        for k, pw in enumerate(_enum_cartesian(L)):
+            powers[L, k] = pw
+    return powers
+
+
+def _shell_pairs(ptrs, shls):
+    """Function offsets of the atom-centered shells and the lower
+    triangular shell pairs (i >= j).
+
+    Args:
+        ptrs (np.ndarray): (center, shell) of each atom-centered shell
+        shls (:class:`~exatomic.algorithms.numerical.ShellArrays`): flat shells
+    """
+    L = shls.L[ptrs[:, 1]]
+    ndeg = np.where(shls.spherical[ptrs[:, 1]] & (L > 0), 2 * L + 1,
+                    (L + 1) * (L + 2) // 2)
+    fn_ptr = np.zeros(len(ptrs) + 1, dtype=np.int64)
+    np.cumsum(ndeg * shls.ncont[ptrs[:, 1]], out=fn_ptr[1:])
+    i, j = np.tril_indices(len(ptrs))
+    return fn_ptr, np.ascontiguousarray(np.stack((i, j), axis=1), dtype=np.int64)
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _shell_pair_integrals(pairs, ptrs, xyzs, L, spherical, prim_ptr, coef_ptr,
+                          ncont, alphas, coefs, c2s, powers, fn_ptr, kind,
+                          origin, screen, out):
+    """Contracted (and spherically transformed) one-electron integrals of
+    shell pairs written into the lower triangle of each component of out.
+    All cartesian components of a primitive pair are obtained from the
+    one dimensional Obara-Saika tables.
+
+    Shell pairs whose integrals are bounded by screen are skipped; the
+    bound uses the center distance and exponents of each primitive pair,
+    :math:`|c_{p}||c_{q}|(\\pi/\\gamma)^{3/2}e^{-\\mu R^{2}}(1 + R + \\gamma^{-1/2})^{L_{i}+L_{j}}`,
+    scaled for the kinetic and multipole operators.
+
+    Args:
+        pairs (np.ndarray): (i, j) atom-centered shell pairs (i >= j)
+        ptrs (np.ndarray): (center, shell) of each atom-centered shell
+        fn_ptr (np.ndarray): offset of the functions of each atom-centered shell
+        c2s (np.ndarray): see :func:`~exatomic.algorithms.overlap._car2sph_blocks`
+        powers (np.ndarray): see :func:`~exatomic.algorithms.overlap._cartesian_powers`
+        kind (int): 0 overlap, 1 kinetic, 2 dipole, 3 quadrupole
+        origin (np.ndarray): origin of the multipole operators
+        screen (float): shell pair screening threshold
+        out (np.ndarray): (ncomp, triangular matrix (i * (i + 1) / 2 + j))
+    """
+    ncomp = out.shape[0]
+    cx, cy, cz = origin[0], origin[1], origin[2]
+    for k in range(len(pairs)):
+        ia = pairs[k, 0]
+        ib = pairs[k, 1]
+        sa = ptrs[ia, 1]
+        sb = ptrs[ib, 1]
+        ax, ay, az = xyzs[ptrs[ia, 0], 0], xyzs[ptrs[ia, 0], 1], xyzs[ptrs[ia, 0], 2]
+        bx, by, bz = xyzs[ptrs[ib, 0], 0], xyzs[ptrs[ib, 0], 1], xyzs[ptrs[ib, 0], 2]
+        la = L[sa]
+        lb = L[sb]
+        nca = (la + 1) * (la + 2) // 2
+        ncb = (lb + 1) * (lb + 2) // 2
+        pa0 = prim_ptr[sa]
+        pb0 = prim_ptr[sb]
+        npa = prim_ptr[sa + 1] - pa0
+        npb = prim_ptr[sb + 1] - pb0
+        nta = ncont[sa]
+        ntb = ncont[sb]
+        ab2 = sdist(ax, ay, az, bx, by, bz)
+        rab = np.sqrt(ab2)
+        rbc = np.sqrt(sdist(bx, by, bz, cx, cy, cz))
+        # Screening bound over primitive pairs
+        bound = 0.
+        for p in range(npa):
+            cp = 0.
+            for c in range(nta):
+                cp = max(cp, abs(coefs[coef_ptr[sa] + p * nta + c]))
+            for q in range(npb):
+                cq = 0.
+                for c in range(ntb):
+                    cq = max(cq, abs(coefs[coef_ptr[sb] + q * ntb + c]))
+                a = alphas[pa0 + p]
+                b = alphas[pb0 + q]
+                g = a + b
+                ext = 1. + rab + 1. / np.sqrt(g)
+                bnd = (cp * cq * (np.pi / g) ** 1.5 * np.exp(-a * b / g * ab2) *
+                       ext ** (la + lb))
+                if kind == 1:
+                    bnd *= b * (2 * lb + 3) + 2 * b * b * ext * ext + lb * lb
+                elif kind > 1:
+                    bnd *= (ext + rbc) ** (kind - 1)
+                bound = max(bound, bnd)
+        if bound < screen:
+            continue
+        # Contracted cartesian blocks, (cart, cont) x (cart, cont)
+        cart = np.zeros((ncomp, nca * nta, ncb * ntb))
+        sx = np.empty((la + 1, lb + 3))
+        sy = np.empty((la + 1, lb + 3))
+        sz = np.empty((la + 1, lb + 3))
+        vals = np.empty(ncomp)
+        for p in range(npa):
+            for q in range(npb):
+                a = alphas[pa0 + p]
+                b = alphas[pb0 + q]
+                (N, g, mu, _, pax, pay, paz,
+                 pbx, pby, pbz) = _gaussian_product(a, b, ax, ay, az, bx, by, bz)
+                ex = np.exp(-mu * ab2)
+                _obara_saika_1d(la, lb + 2, pax, pbx, g, N, sx)
+                _obara_saika_1d(la, lb + 2, pay, pby, g, N, sy)
+                _obara_saika_1d(la, lb + 2, paz, pbz, g, N, sz)
+                for mi in range(nca):
+                    xi, yi, zi = powers[la, mi, 0], powers[la, mi, 1], powers[la, mi, 2]
+                    for mj in range(ncb):
+                        xj, yj, zj = powers[lb, mj, 0], powers[lb, mj, 1], powers[lb, mj, 2]
+                        ovx = sx[xi, xj]
+                        ovy = sy[yi, yj]
+                        ovz = sz[zi, zj]
+                        if kind == 0:
+                            vals[0] = ovx * ovy * ovz
+                        elif kind == 1:
+                            vals[0] = (_kinetic_1d(xi, xj, b, sx) * ovy * ovz +
+                                       ovx * _kinetic_1d(yi, yj, b, sy) * ovz +
+                                       ovx * ovy * _kinetic_1d(zi, zj, b, sz))
+                        elif kind == 2:
+                            vals[0] = _multipole_1d(xi, xj, 1, bx - cx, sx) * ovy * ovz
+                            vals[1] = ovx * _multipole_1d(yi, yj, 1, by - cy, sy) * ovz
+                            vals[2] = ovx * ovy * _multipole_1d(zi, zj, 1, bz - cz, sz)
+                        else:
+                            for e in range(ncomp):
+                                vals[e] = (
+                                    _multipole_1d(xi, xj, _quadrupole_powers[e, 0], bx - cx, sx) *
+                                    _multipole_1d(yi, yj, _quadrupole_powers[e, 1], by - cy, sy) *
+                                    _multipole_1d(zi, zj, _quadrupole_powers[e, 2], bz - cz, sz))
+                        for c in range(nta):
+                            ca = coefs[coef_ptr[sa] + p * nta + c] * ex
+                            for d in range(ntb):
+                                cab = ca * coefs[coef_ptr[sb] + q * ntb + d]
+                                for e in range(ncomp):
+                                    cart[e, mi * nta + c, mj * ntb + d] += cab * vals[e]
+        # Spherical transforms
+        if spherical[sa] and la:
+            nsa = 2 * la + 1
+            blk = np.zeros((ncomp, nsa * nta, cart.shape[2]))
+            for mi in range(nca):
+                for si in range(nsa):
+                    t = c2s[la, mi, si]
+                    if t == 0.: continue
+                    for c in range(nta):
+                        for col in range(cart.shape[2]):
+                            for e in range(ncomp):
+                                blk[e, si * nta + c, col] += t * cart[e, mi * nta + c, col]
+            cart = blk
+        if spherical[sb] and lb:
+            nsb = 2 * lb + 1
+            blk = np.zeros((ncomp, cart.shape[1], nsb * ntb))
+            for mj in range(ncb):
+                for sj in range(nsb):
+                    t = c2s[lb, mj, sj]
+                    if t == 0.: continue
+                    for d in range(ntb):
+                        for row in range(cart.shape[1]):
+                            for e in range(ncomp):
+                                blk[e, row, sj * ntb + d] += t * cart[e, row, mj * ntb + d]
+            cart = blk
+        f0 = fn_ptr[ia]
+        g0 = fn_ptr[ib]
+        for r in range(cart.shape[1]):
+            fa = f0 + r
+            base = fa * (fa + 1) // 2
+            for c in range(cart.shape[2]):
+                fb = g0 + c
+                if fb <= fa:
+                    for e in range(ncomp):
+                        out[e, base + fb] = cart[e, r, c]
+
+
+def shell_pair_integrals(ptrs, xyzs, shls, kind='overlap', origin=None,
+                         screen=1e-14, workers=1):
+    """Compute (lower triangular) one-electron integral matrices of a basis
+    set of gaussian type functions, screening negligible shell pairs.
+
+    .. code-block:: python
+
+        ptrs, xyzs, shls = uni.enumerate_shells(flat=True)
+        ovl = shell_pair_integrals(ptrs, xyzs, shls)[0]
+        dx, dy, dz = shell_pair_integrals(ptrs, xyzs, shls, kind='dipole')
+
+    Args:
+        ptrs (np.ndarray): (center, shell) of each atom-centered shell
+        xyzs (np.ndarray): atomic coordinates
+        shls (:class:`~exatomic.algorithms.numerical.ShellArrays`): flat shells
+        kind (str): 'overlap', 'kinetic', 'dipole' or 'quadrupole'
+        origin (iter): origin of the multipole operators (default 0, 0, 0)
+        screen (float): skip shell pairs whose integrals are bounded by screen
+        workers (int): number of threads over blocks of shell pairs
+
+    Returns:
+        ints (np.ndarray): (ncomp, i * (i + 1) / 2 + j for i >= j); the
+            quadrupole components are ordered xx, xy, xz, yy, yz, zz
+    """
+    if kind not in _integral_kinds:
+        raise ValueError("kind must be one of {}".format(list(_integral_kinds)))
+    kdx, ncomp = _integral_kinds[kind]
+    ptrs = np.asarray(ptrs, dtype=np.int64)
+    xyzs = np.ascontiguousarray(xyzs, dtype=np.float64)
+    origin = np.zeros(3) if origin is None else np.asarray(origin, dtype=np.float64)
+    ncoef = norm_contract(shls)
+    lmax = int(shls.L.max()) if len(shls.L) else 0
+    fn_ptr, pairs = _shell_pairs(ptrs, shls)
+    nbf = fn_ptr[-1]
+    out = np.zeros((ncomp, nbf * (nbf + 1) // 2))
+    args = (ptrs, xyzs, shls.L, shls.spherical.astype(np.bool_), shls.prim_ptr,
+            shls.coef_ptr, shls.ncont, shls.alphas, ncoef, _car2sph_blocks(lmax),
+            _cartesian_powers(lmax), fn_ptr, kdx, origin, float(screen or 0.), out)
+    if workers > 1 and len(pairs) > workers:
+        # Interleave pairs so threads get similar amounts of work
+        chunks = [np.ascontiguousarray(pairs[w::workers]) for w in range(workers)]
+        pool = ThreadPool(workers)
+        try:
+            pool.map(lambda chunk: _shell_pair_integrals(chunk, *args), chunks)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        _shell_pair_integrals(pairs, *args)
+    return out
+
+
+def overlap_integrals(ptrs, xyzs, shls, screen=1e-14, workers=1):
+    """Compute the (lower triangular) overlap matrix of a basis set of
+    gaussian type functions; see
+    :func:`~exatomic.algorithms.overlap.shell_pair_integrals`.
+
+    Returns:
+        tri (np.ndarray): overlap matrix elements (i * (i + 1) / 2 + j for i >= j)
+    """
+    return shell_pair_integrals(ptrs, xyzs, shls, screen=screen,
+                                workers=workers)[0]
+
+
 @jit(nopython=True, nogil=True, cache=nbche)
 def _nin(o1, o2, po1, po2, gamma, pg12):
     """Helper function for gaussian overlap between 2 centers."""
@@ -7,14 +7,22 @@ Pair Correlation Functions
 """
 import numpy as np
 import pandas as pd
+import numba as nb
+from multiprocessing.pool import ThreadPool
 from IPython.display import display
 from ipywidgets import FloatProgress
 from exa.util.units import Length
 from exatomic.core.universe import Universe
+from exatomic.core.error import PeriodicUniverseError
+from exatomic.core.two import _ortho_frames, _tric_frames
+from exatomic.algorithms.distance import (_minimum_image, _bin_fractional,
+                                          _neighbor_bins, _ortho_nbin,
+                                          _tric_nbin, _tric_image)
 
 
 def radial_pair_correlation(universe, a, b, dr=0.05, start=1.0, stop=13.0,
-                            length="Angstrom", window=1):
+                            length="Angstrom", window=1, stream=False,
+                            cell_list=True, workers=1):
     """
     Compute the angularly independent pair correlation function.
 
@@ -31,6 +39,8 @@ def radial_pair_correlation(universe, a, b, dr=0.05, start=1.0, stop=13.0,
 
         pcf = radial_pair_correlation(universe, "O", "O")
         pcf.plot(secondary_y="Pair Count")
+        # Periodic trajectories: histogram distances on the fly (no atom_two)
+        pcf = radial_pair_correlation(universe, "O", "O", stream=True, workers=4)
 
     .. math::
 
@@ -52,6 +62,9 @@ def radial_pair_correlation(universe, a, b, dr=0.05, start=1.0, stop=13.0,
         stop (float): Stopping radial point
         length (str): Output unit of length
         window (int): Smoothen data (useful when only a single a or b exist, default no smoothing)
+        stream (bool): Compute distances frame by frame rather than using atom_two (periodic only)
+        cell_list (bool): Use a linked cell list when streaming (default True)
+        workers (int): Number of threads over which frames are distributed when streaming
 
     Returns:
         pcf (:class:`~pandas.DataFrame`): Pair correlation distribution and count
@@ -73,33 +86,128 @@ def radial_pair_correlation(universe, a, b, dr=0.05, start=1.0, stop=13.0,
         Using a start and stop length different from 0 and simple cubic cell dimension
         will cause the y axis magnitudes to be inaccurate. This can be remedied by
         rescaling values appropriately.
+
+    Note:
+        With ``stream=True`` the atomic two body table is neither needed nor
+        created: distances up to the last bin edge are computed frame by frame
+        and histogrammed directly in compiled code, so memory does not grow
+        with the number of pairs (or frames).
     """
     bins = np.arange(start, stop, dr)                     # Discrete values of r for histogram
+    a_idx = _select_atoms(universe, a)
+    b_idx = _select_atoms(universe, b)
+    if stream:
+        isa = universe.atom.index.isin(a_idx)
+        isb = universe.atom.index.isin(b_idx)
+        codes = np.full((len(isa), ), -1, dtype=np.int64)
+        codes[isa] = 0
+        codes[isb] = 1
+        codes[isa & isb] = 2
+        typed = stream_pair_histogram(universe, codes, 3, bins,
+                                      cell_list=cell_list, workers=workers)
+        # Pairs of two "a only" or two "b only" atoms are not a-b pairs
+        hist = typed.sum(axis=(0, 1)) - typed[0, 0] - typed[1, 1]
+    else:
+        if "distance" in universe.atom_two.columns:
+            c = "distance"
+        else:
+            c = "dr"
+        distances = universe.atom_two.loc[(universe.atom_two['atom0'].isin(a_idx) &
+                                           universe.atom_two['atom1'].isin(b_idx)) |
+                                          (universe.atom_two['atom0'].isin(b_idx) &
+                                           universe.atom_two['atom1'].isin(a_idx)), c]
+        hist, bins = np.histogram(distances, bins)        # Compute histogram
+    return _pcf_dataframe(universe, hist, bins, len(a_idx), len(b_idx), length,
+                          window)
+
+
+def radial_pair_correlations(universe, dr=0.05, start=1.0, stop=13.0,
+                             length="Angstrom", window=1, stream=False,
+                             cell_list=True, workers=1):
+    """
+    Compute the partial pair correlation functions of all pairs of atomic
+    symbols at once.
+
+    Distances (from atom_two, or computed on the fly when **stream** is True)
+    are histogrammed by pair of symbols in a single (compiled) pass, instead
+    of filtering the pair data once per pair of symbols as repeated calls to
+    :func:`~exatomic.algorithms.pcf.radial_pair_correlation` would.
+
+    .. code-block:: Python
+
+        pcfs = radial_pair_correlations(universe)
+        pcfs.loc[("H", "O")]                  # Same as radial_pair_correlation(universe, "H", "O")
+
+    Args:
+        universe (:class:`~exatomic.Universe`): The universe (with two body data unless streaming)
+        dr (float): Radial step size
+        start (float): Starting radial point
+        stop (float): Stopping radial point
+        length (str): Output unit of length
+        window (int): Smoothen data (default no smoothing)
+        stream (bool): Compute distances frame by frame rather than using atom_two (periodic only)
+        cell_list (bool): Use a linked cell list when streaming (default True)
+        workers (int): Number of threads over which frames are distributed when streaming
+
+    Returns:
+        pcfs (:class:`~pandas.DataFrame`): Pair correlation and count indexed by (a, b, r), a <= b
+    """
+    bins = np.arange(start, stop, dr)
+    symbols = universe.atom['symbol'].astype(str).values
+    types, codes = np.unique(symbols, return_inverse=True)
+    codes = codes.astype(np.int64)
+    if stream:
+        hist = stream_pair_histogram(universe, codes, len(types), bins,
+                                     cell_list=cell_list, workers=workers)
+    else:
+        if "distance" in universe.atom_two.columns:
+            c = "distance"
+        else:
+            c = "dr"
+        idx = universe.atom.index
+        i0 = idx.get_indexer(universe.atom_two['atom0'].values)
+        i1 = idx.get_indexer(universe.atom_two['atom1'].values)
+        missing = (i0 < 0) | (i1 < 0)
+        if missing.any():
+            raise KeyError('Pairs reference atoms not in the atom table: {}.'.format(
+                           universe.atom_two.index[missing][:10].tolist()))
+        t0 = codes[i0]
+        t1 = codes[i1]
+        hist = _typed_histogram(t0, t1, universe.atom_two[c].values.astype(np.float64),
+                                bins.astype(np.float64), len(types))
+    counts = np.bincount(codes, minlength=len(types))
+    pcfs = {}
+    for i, a in enumerate(types):
+        for j in range(i, len(types)):
+            pcfs[(a, types[j])] = _pcf_dataframe(universe, hist[i, j], bins,
+                                                 counts[i], counts[j], length,
+                                                 window)
+    return pd.concat(pcfs, names=["a", "b"]).sort_index()
+
+
+def _select_atoms(universe, a):
+    """
+    Atom index values given a symbol (str), label(s) (int, list, tuple), or
+    index values directly (array); see
+    :func:`~exatomic.algorithms.pcf.radial_pair_correlation`.
+    """
     if isinstance(a, str):
-        a_idx = universe.atom[universe.atom['symbol'] == a].index.values
+        return universe.atom[universe.atom['symbol'] == a].index.values
     elif isinstance(a, (int, list, tuple, np.int64, np.int32)):
         a = [a] if not isinstance(a, (list, tuple)) else a
-        a_idx = universe.atom[universe.atom['label'].isin(a)].index.values
-    else:
-        a_idx = a
-    if isinstance(b, str):
-        b_idx = universe.atom[universe.atom['symbol'] == b].index.values
-    elif isinstance(a, (int, list, tuple, np.int64, np.int32)):
-        b = [b] if not isinstance(b, (list, tuple)) else b
-        b_idx = universe.atom[universe.atom['label'].isin(b)].index.values
-    else:
-        b_idx = b
-    if "distance" in universe.atom_two.columns:
-        c = "distance"
-    else:
-        c = "dr"
-    distances = universe.atom_two.loc[(universe.atom_two['atom0'].isin(a_idx) &
-                                       universe.atom_two['atom1'].isin(b_idx)) |
-                                      (universe.atom_two['atom0'].isin(b_idx) &
-                                       universe.atom_two['atom1'].isin(a_idx)), c]
-    hist, bins = np.histogram(distances, bins)            # Compute histogram
+        return universe.atom[universe.atom['label'].isin(a)].index.values
+    return a
+
+
+def _pcf_dataframe(universe, hist, bins, acount, bcount, length, window):
+    """
+    Normalize a pair distance histogram into the pair correlation function
+    and pair count; see :func:`~exatomic.algorithms.pcf.radial_pair_correlation`.
+    """
     nn = hist.sum()                                       # Number of observations
     bmax = bins.max()                                     # Note that bins is unchanged by np.hist..
+    if "rx" not in universe.frame.columns:
+        universe.frame.compute_cell_magnitudes()
     rx, ry, rz = universe.frame[["rx", "ry", "rz"]].mean().values
     ratio = (((bmax/rx + bmax/ry + bmax/rz)/3)**3).mean() # Variable actual vol and bin vol
     v_shell = bins[1:]**3 - bins[:-1]**3                  # Volume of each bin shell
@@ -113,8 +221,8 @@ def radial_pair_correlation(universe, a, b, dr=0.05, start=1.0, stop=13.0,
     else:
         v_cell = universe.frame["rx"].max()**3
     g = hist*v_cell*ratio/(v_shell*nn)                    # Compute pair correlation
-    numa = len(a_idx)/len(universe)
-    numb = len(b_idx)/len(universe)
+    numa = acount/len(universe)
+    numb = bcount/len(universe)
     n = hist.cumsum()/nn*numa*numb*4/3*np.pi*bmax**3/v_cell
     r = (bins[1:] + bins[:-1])/2*Length["au", length]
     unit = "au"
@@ -131,6 +239,178 @@ def radial_pair_correlation(universe, a, b, dr=0.05, start=1.0, stop=13.0,
     return df
 
 
+def stream_pair_histogram(universe, codes, ntype, bins, cell_list=True, workers=1):
+    """
+    Histogram interatomic distances (minimum image convention) by pair type
+    without computing the atomic two body table.
+
+    Each atom is given an integer type code (atoms with a negative code are
+    ignored); pairs of types t0 <= t1 are counted in ``hist[t0, t1]``. Frames
+    are split into (at most) ``workers`` contiguous chunks that are processed
+    by separate threads, each accumulating into its own histogram, so memory
+    does not depend on the number of pairs or frames.
+
+    .. code-block:: python
+
+        codes = (uni.atom['symbol'] == "O").values.astype(np.int64) - 1
+        hist = stream_pair_histogram(uni, codes, 1, np.arange(1.0, 13.0, 0.05))[0, 0]
+
+    Args:
+        universe (:class:`~exatomic.core.universe.Universe`): Periodic universe
+        codes (array): Type code of each atom (aligned with the atom table)
+        ntype (int): Number of (non-negative) type codes
+        bins (array): Uniformly spaced bin edges
+        cell_list (bool): Search pairs using a linked cell list (default True)
+        workers (int): Number of threads over which frames are distributed
+
+    Returns:
+        hist (array): Pair counts of shape (ntype, ntype, len(bins) - 1)
+    """
+    if not universe.periodic:
+        raise PeriodicUniverseError()
+    codes = pd.Series(np.asarray(codes, dtype=np.int64), index=universe.atom.index)
+    bins = np.asarray(bins, dtype=np.float64)
+    if universe.orthorhombic:
+        xyz, cells, index, frames, bounds = _ortho_frames(universe)
+        walker = _ortho_histogram
+    else:
+        xyz, cells, index, frames, bounds = _tric_frames(universe)
+        walker = _tric_histogram
+    codes = codes.loc[index].values
+    keep = codes >= 0
+    counts = np.add.reduceat(keep.astype(np.int64), bounds[:-1])
+    bounds = np.concatenate(([0], np.cumsum(counts)))
+    x, y, z = (np.ascontiguousarray(v[keep]) for v in xyz)
+    codes = codes[keep]
+    chunks = np.array_split(np.arange(len(frames)), max(min(workers, len(frames)), 1))
+
+    def run(chunk):
+        hist = np.zeros((ntype, ntype, len(bins) - 1), dtype=np.int64)
+        if len(chunk) > 0:
+            walker(x, y, z, cells, bounds, codes, bins, chunk[0], chunk[-1] + 1,
+                   cell_list, hist)
+        return hist
+
+    if workers > 1:
+        pool = ThreadPool(workers)
+        try:
+            hists = pool.map(run, chunks)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        hists = [run(chunk) for chunk in chunks]
+    return np.sum(hists, axis=0)
+
+
+@nb.jit(nopython=True, nogil=True)
+def _histogram_index(r, bins, norm):
+    """
+    Bin of a value within uniformly spaced bin edges (with the same edge
+    handling as :func:`~numpy.histogram`), or -1 if it is out of range.
+    """
+    n = len(bins) - 1
+    if r < bins[0] or r > bins[n]:
+        return -1
+    k = min(int((r - bins[0])*norm), n - 1)
+    if r < bins[k]:
+        k -= 1
+    elif k < n - 1 and r >= bins[k + 1]:
+        k += 1
+    return k
+
+
+@nb.jit(nopython=True, nogil=True)
+def _typed_histogram(t0, t1, distances, bins, ntype):
+    """
+    Histogram pair distances by pair type (see
+    :func:`~exatomic.algorithms.pcf.stream_pair_histogram` for the layout).
+    """
+    hist = np.zeros((ntype, ntype, len(bins) - 1), dtype=np.int64)
+    norm = (len(bins) - 1)/(bins[-1] - bins[0])
+    for p in range(len(distances)):
+        k = _histogram_index(distances[p], bins, norm)
+        if k >= 0:
+            hist[min(t0[p], t1[p]), max(t0[p], t1[p]), k] += 1
+    return hist
+
+
+@nb.jit(nopython=True, nogil=True)
+def _ortho_histogram(ux, uy, uz, abc, bounds, codes, bins, f0, f1, cell_list, hist):
+    """
+    Accumulate the typed pair distance histogram (see
+    :func:`~exatomic.algorithms.pcf.stream_pair_histogram`) of frames f0 to
+    f1 in orthorhombic periodic cells.
+    """
+    rmax2 = bins[-1]**2
+    norm = (len(bins) - 1)/(bins[-1] - bins[0])
+    for f in range(f0, f1):
+        lo = bounds[f]
+        a = abc[f, 0]
+        b = abc[f, 1]
+        c = abc[f, 2]
+        x = ux[lo:bounds[f + 1]]
+        y = uy[lo:bounds[f + 1]]
+        z = uz[lo:bounds[f + 1]]
+        if cell_list:
+            nbin = _ortho_nbin(a, b, c, bins[-1])
+        else:
+            nbin = np.ones((3, ), dtype=np.int64)
+        binned, order, start = _bin_fractional(x/a, y/b, z/c, nbin)
+        for i in range(len(x)):
+            ti = codes[lo + i]
+            for bn in _neighbor_bins(binned[i], nbin):
+                for p in range(start[bn], start[bn + 1]):
+                    j = order[p]
+                    if j <= i:
+                        continue
+                    dpx, ma = _minimum_image(x[i] - x[j], a)
+                    dpy, mb = _minimum_image(y[i] - y[j], b)
+                    dpz, mc = _minimum_image(z[i] - z[j], c)
+                    dpr = dpx**2 + dpy**2 + dpz**2
+                    if dpr <= rmax2:
+                        k = _histogram_index(np.sqrt(dpr), bins, norm)
+                        if k >= 0:
+                            tj = codes[lo + j]
+                            hist[min(ti, tj), max(ti, tj), k] += 1
+
+
+@nb.jit(nopython=True, nogil=True)
+def _tric_histogram(sa, sb, sc, cells, bounds, codes, bins, f0, f1, cell_list, hist):
+    """
+    Accumulate the typed pair distance histogram (see
+    :func:`~exatomic.algorithms.pcf.stream_pair_histogram`) of frames f0 to
+    f1 in general (triclinic) periodic cells.
+    """
+    rmax2 = bins[-1]**2
+    norm = (len(bins) - 1)/(bins[-1] - bins[0])
+    for f in range(f0, f1):
+        lo = bounds[f]
+        cell = cells[f]
+        a = sa[lo:bounds[f + 1]]
+        b = sb[lo:bounds[f + 1]]
+        c = sc[lo:bounds[f + 1]]
+        if cell_list:
+            nbin = _tric_nbin(cell, bins[-1])
+        else:
+            nbin = np.ones((3, ), dtype=np.int64)
+        binned, order, start = _bin_fractional(a, b, c, nbin)
+        for i in range(len(a)):
+            ti = codes[lo + i]
+            for bn in _neighbor_bins(binned[i], nbin):
+                for p in range(start[bn], start[bn + 1]):
+                    j = order[p]
+                    if j <= i:
+                        continue
+                    dpx, dpy, dpz, dpr, prj = _tric_image(a[i] - a[j], b[i] - b[j],
+                                                          c[i] - c[j], cell)
+                    if dpr <= rmax2:
+                        k = _histogram_index(np.sqrt(dpr), bins, norm)
+                        if k >= 0:
+                            tj = codes[lo + j]
+                            hist[min(ti, tj), max(ti, tj), k] += 1
+
+
 def radial_pcf_out_of_core(hdftwo, hdfout, u, pairs, **kwargs):
     """
     Out of core radial pair correlation calculation.
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2018, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+import numpy as np
+from unittest import TestCase
+from exatomic.tests.helpers import random_universe
+
+
+class TestAngles(TestCase):
+    def setUp(self):
+        self.uni = random_universe([[9.0, 0.0, 0.0], [1.0, 9.0, 0.0],
+                                     [0.0, 1.0, 9.0]], nat=120, nframe=2)
+        self.uni.compute_atom_two(dmax=6.0, vector=True, bond_extra=1.0)
+
+    def _reference(self):
+        two = self.uni.atom_two[self.uni.atom_two['bond'] == True]
+        vecs = {}
+        for a0, a1, dx, dy, dz in two[['atom0', 'atom1', 'dx', 'dy', 'dz']].values:
+            vecs.setdefault(int(a0), {})[int(a1)] = -np.array([dx, dy, dz])
+            vecs.setdefault(int(a1), {})[int(a0)] = np.array([dx, dy, dz])
+        ref = {}
+        for c, nbrs in vecs.items():
+            keys = sorted(nbrs)
+            for i, j in enumerate(keys):
+                for k in keys[i + 1:]:
+                    u, v = nbrs[j], nbrs[k]
+                    cos = u.dot(v)/np.sqrt(u.dot(u)*v.dot(v))
+                    ref[(c, j, k)] = np.arccos(np.clip(cos, -1, 1))
+        return ref
+
+    def _check(self, adf, ref):
+        self.assertEqual(len(adf), len(ref))
+        for c, j, k, rad in adf[['atom0', 'atom1', 'atom2', 'angle']].values:
+            key = (int(c), ) + tuple(sorted((int(j), int(k))))
+            self.assertTrue(np.isclose(ref[key], rad))
+
+    def test_angles(self):
+        ref = self._reference()
+        self.assertTrue(len(ref) > 0)
+        self.uni.compute_angles()
+        self._check(self.uni.atom_angle, ref)
+        self.uni.compute_angles(workers=3)
+        self._check(self.uni.atom_angle, ref)
+        self.assertTrue(np.all(self.uni.atom_angle['frame'].values ==
+                               self.uni.atom.loc[self.uni.atom_angle['atom0'], 'frame'].values))
+        del self.uni.atom_two['dx']
+        self.uni.compute_angles()
+        self._check(self.uni.atom_angle, ref)
+
+    def test_missing_atom(self):
+        """Pairs with atoms not in the atom table are an error."""
+        two = self.uni.atom_two
+        bond = two.index[two['bond'] == True][0]
+        two['atom1'] = two['atom1'].astype(np.int64)
+        two.loc[bond, 'atom1'] = len(self.uni.atom) + 10
+        with self.assertRaises(KeyError):
+            self.uni.compute_angles()
+        del two['dx']
+        with self.assertRaises(KeyError):
+            self.uni.compute_angles()
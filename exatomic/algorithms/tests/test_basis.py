@@ -9,12 +9,15 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import division
 
+import os
 import numpy as np
+from shutil import rmtree
+from tempfile import mkdtemp
 from unittest import TestCase
 from exatomic.base import resource
 from exatomic import nwchem, molcas
 from ..basis import (cart_lml_count, spher_lml_count, solid_harmonics,
-                     enum_cartesian, car2sph, BasisFunctions)
+                     enum_cartesian, car2sph, BasisFunctions, _harmonic_table)
 
 
 class TestCartesianToSpherical(TestCase):
@@ -35,6 +38,26 @@ class TestCartesianToSpherical(TestCase):
             s = spher_lml_count[L] if L else 3
             self.assertEqual(c2s[L].shape, (c, s))
 
+    def test_solid_harmonic_table(self):
+        from .. import car2sph as c2s
+        tmp = mkdtemp()
+        env, c2s._sh_tables = os.environ.get('EXATOMIC_CACHE'), {}
+        os.environ['EXATOMIC_CACHE'] = tmp
+        try:
+            table = c2s.solid_harmonic_table(self.L)
+            self.assertTrue(os.listdir(tmp))
+            self.assertTrue(np.allclose(table, _harmonic_table(self.sh)))
+            c2s._sh_tables.clear()
+            scaled = c2s.solid_harmonic_table(self.L, scaled=True)
+            for L in range(2, self.L + 1):
+                self.assertTrue(np.allclose(scaled[L, :cart_lml_count[L], :2 * L + 1],
+                                            c2s.car2sph_scaled(L)))
+        finally:
+            if env is None: del os.environ['EXATOMIC_CACHE']
+            else: os.environ['EXATOMIC_CACHE'] = env
+            c2s._sh_tables.clear()
+            rmtree(tmp)
+
 
 class TestBasisFunctions(TestCase):
 
@@ -53,3 +76,38 @@ class TestBasisFunctions(TestCase):
             self.assertTrue(np.isclose(np.float64(a), np.float64(b)))
         self.assertFalse(len(nwfns[11].expand().as_coefficients_dict()) ==
                          len(mofns[11].expand().as_coefficients_dict()))
+
+    def test_numerical(self):
+        x, y, z = np.meshgrid(*[np.linspace(-3, 3, 9)] * 3)
+        x, y, z = x.ravel(), y.ravel(), z.ravel()
+        for uni in (self.nw, self.mo):
+            sym = uni.basis_functions.evaluate(x, y, z, symbolic=True)
+            num = uni.basis_functions.evaluate(x, y, z)
+            self.assertEqual(sym.shape, num.shape)
+            self.assertTrue(np.allclose(sym, num, rtol=1e-10, atol=1e-12))
+
+    def test_derivatives(self):
+        x, y, z = np.random.RandomState(0).uniform(-3, 3, (3, 50))
+        h = 1e-4
+        for uni in (self.nw, self.mo):
+            bfns = uni.basis_functions
+            bvs, grad, lapl = bfns.evaluate_derivatives(x, y, z)
+            self.assertTrue(np.allclose(bvs, bfns.evaluate(x, y, z)))
+            fdl = -6 * bvs
+            for i, d in enumerate(np.eye(3) * h):
+                pls = bfns.evaluate(x + d[0], y + d[1], z + d[2])
+                mns = bfns.evaluate(x - d[0], y - d[1], z - d[2])
+                self.assertTrue(np.allclose(grad[i], (pls - mns) / (2 * h), atol=1e-6))
+                self.assertTrue(np.allclose(grad[i], bfns.evaluate_diff(x, y, z, cart='xyz'[i])))
+                fdl += pls + mns
+            self.assertTrue(np.allclose(lapl, fdl / h ** 2, atol=1e-3))
+
+    def test_screen(self):
+        x, y, z = np.meshgrid(*[np.linspace(-8, 8, 15)] * 3)
+        x, y, z = x.ravel(), y.ravel(), z.ravel()
+        for uni in (self.nw, self.mo):
+            ref = uni.basis_functions.evaluate(x, y, z)
+            for screen in (1e-6, 1e-10):
+                scr = uni.basis_functions.evaluate(x, y, z, screen=screen)
+                self.assertTrue(np.abs(ref - scr).max() < screen)
+                self.assertTrue((scr == 0).any())
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2018, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+import numpy as np
+from unittest import TestCase
+from exatomic.tests.helpers import random_universe
+from exatomic.algorithms.displacement import mean_squared_displacement
+from exatomic.algorithms.diffusion import einstein_relation
+
+
+class TestMSD(TestCase):
+    def setUp(self):
+        self.cell = np.array([[12.0, 0.0, 0.0], [2.0, 13.0, 0.0], [-1.0, 1.0, 14.0]])
+        self.uni = random_universe(self.cell, nat=20, nframe=50, step=0.02)
+
+    def test_fft_msd(self):
+        """Compare against the direct average over time origins."""
+        xyz = self.uni.atom[['x', 'y', 'z']].values.reshape(50, 20, 3)
+        ref = np.array([((xyz[m:] - xyz[:50 - m])**2).sum(axis=2).mean(axis=0)
+                        for m in range(50)])
+        msd = mean_squared_displacement(self.uni, unwrap=False)
+        self.assertTrue(np.allclose(msd.values, ref))
+        msd = mean_squared_displacement(self.uni, chunk=7)
+        self.assertTrue(np.allclose(msd.values, ref))
+
+    def test_unwrap(self):
+        """In unit cell positions give the same result as unwrapped ones."""
+        ref = mean_squared_displacement(self.uni, unwrap=False)
+        xyz = self.uni.atom[['x', 'y', 'z']].values
+        frac = xyz.dot(np.linalg.inv(self.cell))
+        self.uni.atom[['x', 'y', 'z']] = (frac - np.floor(frac)).dot(self.cell)
+        msd = mean_squared_displacement(self.uni)
+        self.assertTrue(np.allclose(msd.values, ref.values))
+
+    def test_einstein_relation(self):
+        """Rows are lags divided by their elapsed time, whatever the frame ids."""
+        self.uni.atom['frame'] = self.uni.atom['frame'].astype(np.int64) + 3
+        self.uni.frame.index += 3
+        self.uni.frame['time'] = 0.5*np.arange(50) + 1.0
+        msd = mean_squared_displacement(self.uni)
+        self.assertTrue((msd.index == np.arange(50)).all())
+        self.assertEqual(msd.index.name, 'lag')
+        d = einstein_relation(self.uni, length='au', time='ps')
+        ref = msd.mean(axis=1).values[1:]/(6*0.5*np.arange(1, 50))
+        self.assertTrue(np.allclose(d.values[1:], ref))
@@ -7,7 +7,9 @@ Two Body Properties Computations
 """
 import numpy as np
 from unittest import TestCase
-from exatomic.algorithms.distance import cartmag
+from exatomic.algorithms.distance import (cartmag, pdist_ortho, pdist_ortho_cell,
+                                          pdist_ortho_cell_nv, pdist_tric,
+                                          pdist_tric_nv)
 
 
 class Test3DOperations(TestCase):
@@ -22,3 +24,62 @@ class Test3DOperations(TestCase):
         check = (x**2 + y**2 + z**2)**0.5
         result = cartmag(x, y, z)
         self.assertTrue(np.allclose(check, result))
+
+
+class TestPeriodicPdist(TestCase):
+    def setUp(self):
+        np.random.seed(0)
+        n = 200
+        self.a, self.b, self.c = 12.0, 13.0, 14.0
+        self.x = np.random.rand(n)*self.a
+        self.y = np.random.rand(n)*self.b
+        self.z = np.random.rand(n)*self.c
+        self.index = np.arange(n, dtype=np.int64)
+
+    def _sorted(self, values, atom0, atom1):
+        order = np.lexsort((values[atom1], values[atom0]))
+        return [v[order] for v in values]
+
+    def test_ortho_cell(self):
+        """Linked cell list returns the same pairs as the brute force kernel."""
+        for dmax in (3.0, 6.0, 8.0):
+            brute = pdist_ortho(self.x, self.y, self.z, self.a, self.b,
+                                self.c, self.index, dmax)
+            cell = pdist_ortho_cell(self.x, self.y, self.z, self.a, self.b,
+                                    self.c, self.index, dmax)
+            brute = self._sorted(brute, 4, 5)
+            cell = self._sorted(cell, 4, 5)
+            for check, result in zip(brute, cell):
+                self.assertTrue(np.allclose(check, result))
+            nv = pdist_ortho_cell_nv(self.x, self.y, self.z, self.a, self.b,
+                                     self.c, self.index, dmax)
+            nv = self._sorted(nv, 1, 2)
+            self.assertTrue(np.allclose(nv[0], cell[3]))
+            self.assertTrue(np.all(nv[3] == cell[6]))
+
+    def test_tric(self):
+        """Triclinic kernel agrees with the orthorhombic and explicit images."""
+        cell = np.diag([self.a, self.b, self.c])
+        sa, sb, sc = self.x/self.a, self.y/self.b, self.z/self.c
+        brute = pdist_ortho(self.x, self.y, self.z, self.a, self.b,
+                            self.c, self.index, 5.0)
+        brute = self._sorted(brute, 4, 5)
+        for cell_list in (False, True):
+            tric = pdist_tric(sa, sb, sc, cell, self.index, 5.0, cell_list)
+            tric = self._sorted(tric, 4, 5)
+            for check, result in zip(brute, tric):
+                self.assertTrue(np.allclose(check, result))
+        cell = np.array([[self.a, 0.0, 0.0], [2.0, self.b, 0.0],
+                         [-1.5, 1.0, self.c]])
+        dr, atom0, atom1, _ = pdist_tric_nv(sa, sb, sc, cell, self.index, 5.0)
+        xyz = np.dot(np.column_stack((sa, sb, sc)), cell)
+        shifts = np.dot(np.array([[i, j, k] for i in (-1, 0, 1)
+                                  for j in (-1, 0, 1) for k in (-1, 0, 1)]), cell)
+        d = xyz[:, None, None] - xyz[None, :, None] + shifts[None, None]
+        d = np.sqrt((d**2).sum(axis=-1)).min(axis=-1)
+        i, j = np.triu_indices(len(xyz), 1)
+        keep = d[i, j] < 5.0
+        self.assertEqual(keep.sum(), len(dr))
+        self.assertTrue(np.allclose(np.sort(d[i, j][keep]), np.sort(dr)))
+        cdr = pdist_tric_nv(sa, sb, sc, cell, self.index, 5.0, True)[0]
+        self.assertTrue(np.allclose(np.sort(cdr), np.sort(dr)))
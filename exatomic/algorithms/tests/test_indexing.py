@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2018, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+import numpy as np
+from unittest import TestCase
+from exatomic.algorithms.indexing import connected_components
+
+
+class TestConnectedComponents(TestCase):
+    def test_labels(self):
+        """Components are numbered in the order of their first node."""
+        edge0 = np.array([5, 1, 6], dtype=np.int64)
+        edge1 = np.array([3, 5, 2], dtype=np.int64)
+        labels = connected_components(8, edge0, edge1)
+        self.assertTrue(np.all(labels == [0, 1, 2, 1, 3, 1, 2, 4]))
+
+    def test_isolated(self):
+        """Isolated nodes are components of their own."""
+        edge = np.empty((0, ), dtype=np.int64)
+        labels = connected_components(4, edge, edge)
+        self.assertTrue(np.all(labels == np.arange(4)))
+        labels = connected_components(3, np.array([2, 2]), np.array([2, 0]))
+        self.assertTrue(np.all(labels == [0, 1, 0]))
@@ -65,3 +65,58 @@
 #         f = _SFunction(*self.sargs)
 #         N = _prim_sphr_norm(f.alphas, f.L)
 #         self.assertTrue(np.allclose(f.Ns, N))
+
+
+import numpy as np
+import pandas as pd
+from unittest import TestCase
+from exatomic.core.orbital import MOMatrix
+from exatomic.core.basis import Overlap
+from exatomic.algorithms.numerical import _index_map, reorder_matrix
+
+
+class _Uni(object):
+    def __init__(self, bso, **kws):
+        self.current_basis_set_order = bso
+        for key, val in kws.items():
+            setattr(self, key, val)
+
+
+class TestReorder(TestCase):
+
+    def setUp(self):
+        bso = pd.DataFrame([(c, L, ml, s) for c in range(2) for L in range(3)
+                            for ml in range(-L, L + 1) for s in range(2)],
+                           columns=['center', 'L', 'ml', 'shell'])
+        nbas = len(bso)
+        self.perm = np.random.permutation(nbas)
+        self.cmat = np.random.rand(nbas, nbas)
+        ovl = np.random.rand(nbas, nbas)
+        self.ovl = ovl + ovl.T
+        mo = MOMatrix({'chi': np.tile(range(nbas), nbas),
+                       'orbital': np.repeat(range(nbas), nbas),
+                       'coef': self.cmat.T.flatten(),
+                       'coef1': 2 * self.cmat.T.flatten(), 'frame': 0})
+        i, j = np.tril_indices(nbas)
+        overlap = Overlap.from_dict({'chi0': i, 'chi1': j, 'frame': 0,
+                                     'coef': self.ovl[i, j]})
+        self.uni = _Uni(bso, momatrix=mo, overlap=overlap)
+        self.ordered = _Uni(bso.iloc[self.perm].reset_index(drop=True))
+
+    def test_index_map(self):
+        old = self.uni.current_basis_set_order.values
+        new = self.ordered.current_basis_set_order.values
+        self.assertTrue(np.array_equal(_index_map(old, new), self.perm))
+        with self.assertRaises(ValueError):
+            _index_map(old[1:], new)
+
+    def test_reorder_matrix(self):
+        idx = np.ix_(self.perm, self.perm)
+        cmat = reorder_matrix(self.uni, self.ordered)
+        self.assertTrue(np.allclose(cmat.values, self.cmat[idx]))
+        cmat, cmat1, ovl = reorder_matrix(self.uni, self.ordered,
+                                          attr=['momatrix', 'momatrix', 'overlap'],
+                                          mocoefs=['coef', 'coef1', 'coef'])
+        self.assertTrue(np.allclose(cmat.values, self.cmat[idx]))
+        self.assertTrue(np.allclose(cmat1.values, 2 * self.cmat[idx]))
+        self.assertTrue(np.allclose(ovl.values, self.ovl[idx]))
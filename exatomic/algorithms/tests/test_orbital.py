@@ -6,7 +6,9 @@ import numpy as np
 from unittest import TestCase
 from exatomic import Universe, nwchem, molcas
 from exatomic.base import resource
-from exatomic.algorithms.orbital_util import compare_fields
+from exatomic.core.orbital import DensityMatrix
+from exatomic.algorithms.orbital_util import (compare_fields, BasisCache,
+                                              _compute_current_density)
 from exatomic.algorithms.orbital import (add_molecular_orbitals,
                                          add_orb_ang_mom,
                                          add_density)
@@ -55,3 +57,111 @@ class TestNWChemOrbital(TestCase):
         mo.add_molecular_orbitals(vector=range(3, 10), verbose=False)
         res = compare_fields(nw, mo, signed=False, rtol=5e-3)
         self.assertTrue(np.isclose(sum(res), len(res), rtol=5e-3))
+
+
+class TestBlockedOrbital(TestCase):
+
+    def test_blocks(self):
+        uni = nwchem.Output(resource('nw-ch3nh2-631g.out')).to_universe()
+        kws = {'field_params': {'rmin': -4, 'rmax': 4, 'nr': 11},
+               'inplace': False, 'verbose': False}
+        ref = add_molecular_orbitals(uni, vector=range(3, 10), block=1 << 20, **kws)
+        blk = add_molecular_orbitals(uni, vector=range(3, 10), block=97, **kws)
+        for f0, f1 in zip(ref.field_values, blk.field_values):
+            self.assertTrue(np.allclose(f0, f1))
+        f32 = add_molecular_orbitals(uni, vector=range(3, 10), block=97,
+                                     dtype=np.float32, **kws)
+        for f0, f1 in zip(ref.field_values, f32.field_values):
+            self.assertEqual(f1.dtype, np.float32)
+            self.assertTrue(np.allclose(f0, f1, atol=1e-6))
+        ref = add_density(uni, block=1 << 20, **kws)
+        blk = add_density(uni, block=97, **kws)
+        self.assertTrue(np.allclose(ref.field_values[0], blk.field_values[0]))
+
+    def test_density_matrix(self):
+        uni = Universe.load(resource('mol-carbon-dz.hdf5'))
+        kws = {'field_params': {'rmin': -4, 'rmax': 4, 'nr': 11},
+               'mocoefs': 'sx', 'inplace': False, 'verbose': False}
+        ref = add_density(uni, **kws).field_values[0]
+        dmat = DensityMatrix.from_momatrix(uni.current_momatrix,
+                                           uni.orbital['sx'].values, mocoefs='sx')
+        for density_matrix in (True, dmat):
+            for screen in (None, 1e-12):
+                res = add_density(uni, density_matrix=density_matrix,
+                                  screen=screen, **kws).field_values[0]
+                self.assertTrue(np.allclose(ref, res, atol=1e-10))
+
+
+class TestBasisCache(TestCase):
+
+    def test_lru(self):
+        cache = BasisCache(maxbytes=3 * 800)
+        for i in range(3):
+            cache.put(i, np.zeros(100))
+        cache.get(0)
+        cache.put(3, np.zeros(100))
+        self.assertEqual(sorted(cache._data), [0, 2, 3])
+        cache.put(4, np.zeros(1000))
+        self.assertNotIn(4, cache)
+        self.assertFalse(cache.get(0).flags.writeable)
+        self.assertEqual(cache.nbytes, 2400)
+
+    def test_invalidate(self):
+        uni = nwchem.Output(resource('nw-ch3nh2-631g.out')).to_universe()
+        kws = {'field_params': {'rmin': -4, 'rmax': 4, 'nr': 11},
+               'vector': range(3, 10), 'inplace': False, 'verbose': False}
+        ref = uni.add_molecular_orbitals(**kws)
+        self.assertEqual(len(uni._basis_cache), 1)
+        uni.atom['x'] += 0.5
+        mov = uni.add_molecular_orbitals(**kws)
+        self.assertFalse(np.allclose(ref.field_values[0], mov.field_values[0]))
+        uni.atom['x'] -= 0.5
+        res = uni.add_molecular_orbitals(**kws)
+        self.assertTrue(np.allclose(ref.field_values[0], res.field_values[0]))
+        p = uni.basis_set_order['L'].astype(np.int64) == 1
+        uni.basis_set_order.loc[p, 'ml'] *= -1
+        mov = uni.add_molecular_orbitals(**kws)
+        self.assertFalse(np.allclose(ref.field_values[0], mov.field_values[0]))
+        uni.basis_set_order.loc[p, 'ml'] *= -1
+        res = uni.add_molecular_orbitals(**kws)
+        self.assertTrue(np.allclose(ref.field_values[0], res.field_values[0]))
+        uni.clear_basis_cache()
+        self.assertEqual(len(uni._basis_cache), 0)
+
+    def test_orb_ang_mom(self):
+        uni = Universe.load(resource('mol-carbon-dz.hdf5'))
+        kws = {'field_params': {'rmin': -4, 'rmax': 4, 'nr': 11},
+               'rcoefs': 'lreal', 'icoefs': 'limag',
+               'inplace': False, 'verbose': False}
+        ref = add_orb_ang_mom(uni, **kws)
+        bfns = uni.basis_functions
+        calls = []
+        evaluate = bfns.evaluate_derivatives
+        def counted(*args, **kwargs):
+            calls.append(kwargs.get('laplacian', True))
+            return evaluate(*args, **kwargs)
+        bfns.evaluate_derivatives = counted
+        res = add_orb_ang_mom(uni, **kws)
+        self.assertEqual(calls, [])
+        self.assertTrue(np.allclose(ref.field_values[0], res.field_values[0]))
+        uni.clear_basis_cache()
+        add_orb_ang_mom(uni, **kws)
+        self.assertEqual(calls, [False])
+
+
+class TestCurrentDensity(TestCase):
+
+    def test_contraction(self):
+        rng = np.random.RandomState(0)
+        nbas, npts = 6, 50
+        bvs, gvx, gvy, gvz = rng.rand(4, nbas, npts)
+        cmatr, cmati = rng.rand(2, nbas, nbas)
+        occvec = rng.rand(nbas)
+        cur = _compute_current_density(bvs, gvx, gvy, gvz, cmatr, cmati, occvec)
+        for c, gv in zip(cur, (gvx, gvy, gvz)):
+            ref = np.zeros(npts)
+            for mu in range(nbas):
+                for nu in range(nbas):
+                    csum = (-0.5 * occvec * (cmatr[mu] * cmati[nu] - cmati[mu] * cmatr[nu])).sum()
+                    ref += csum * (bvs[mu] * gv[nu] - gv[mu] * bvs[nu])
+            self.assertTrue(np.allclose(c, ref))
@@ -4,9 +4,12 @@
 """Tests for computing the overlap."""
 import numpy as np
 from unittest import TestCase
-from exatomic.base import resource
+from exatomic.base import resource, sym2z
 from exatomic.core.basis import Overlap
-from exatomic.molcas import Output as MolOutput
+from exatomic.molcas import Output as MolOutput, Orb
+from exatomic.algorithms.numerical import _square
+from exatomic.algorithms.overlap import (_obara_s_recurr, _nin,
+                                         _gaussian_product)
 
 
 class TestMolcasOverlap(TestCase):
@@ -35,3 +38,52 @@ class TestMolcasOverlap(TestCase):
                            rtol=5e-5, atol=1e-12).sum() \
                 / (ovls.shape[0] * ovls.shape[1])
             self.assertTrue(n > 0.999)
+
+    def test_screen(self):
+        for uni in self.unis:
+            bfns = uni.basis_functions
+            full = bfns.integrals(screen=0).coef.values
+            scrn = bfns.integrals(screen=1e-10, workers=2).coef.values
+            self.assertTrue(np.allclose(full, scrn, rtol=0, atol=1e-10))
+            self.assertTrue(np.allclose(full, uni.overlap.coef.values,
+                                        rtol=5e-5, atol=1e-8))
+
+
+class TestObaraSaika(TestCase):
+    def setUp(self):
+        uni = MolOutput(resource('mol-ch3nh2-631g.out')).to_universe()
+        orb = Orb(resource('mol-ch3nh2-631g.scforb'))
+        uni.momatrix = orb.momatrix
+        uni.orbital = orb.orbital
+        cmat = uni.momatrix.square().values
+        self.dmat = np.dot(cmat * uni.orbital['occupation'].values, cmat.T)
+        self.uni = uni
+
+    def test_recurrence(self):
+        p = _gaussian_product(0.7, 1.3, 0.1, -0.2, 0.3, -0.5, 0.4, 0.9)
+        for l in range(5):
+            for m in range(5):
+                self.assertTrue(np.isclose(_obara_s_recurr(p[1], l, m, p[4], p[7], p[0]),
+                                           _nin(l, m, p[4], p[7], p[1], p[0])))
+
+    def test_kinetic(self):
+        kin = self.uni.basis_functions.kinetic()
+        self.assertTrue(isinstance(kin, Overlap))
+        ke = (self.dmat * kin.square().values).sum()
+        self.assertTrue(np.isclose(ke, 95.2447677467, atol=1e-3))
+
+    def test_multipole(self):
+        mltpl = self.uni.basis_functions.multipole(order=2)
+        atom = self.uni.atom
+        zs = atom['symbol'].astype(str).map(sym2z).values.astype(np.float64)
+        xyz = atom[['x', 'y', 'z']].values.astype(np.float64)
+        # Debye, Debye * Angstrom from the Molcas output
+        refs = {'ix1': 0.5792, 'ix2': 1.7939, 'ix3': 0.,
+                'ix11': -14.3195, 'ix12': -2.4623, 'ix22': -15.2539,
+                'ix33': -12.4104}
+        for col, ref in refs.items():
+            axes = [int(i) - 1 for i in col[2:]]
+            nuc = (zs * np.prod(xyz[:, axes], axis=1)).sum()
+            val = nuc - (self.dmat * _square(mltpl[col].values)).sum()
+            val *= 2.541746 * 0.52917721 ** (len(axes) - 1)
+            self.assertTrue(np.isclose(val, ref, atol=1e-3))
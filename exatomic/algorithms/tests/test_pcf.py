@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2018, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+import numpy as np
+from unittest import TestCase
+from exatomic.tests.helpers import random_universe
+from exatomic.algorithms.pcf import radial_pair_correlation, radial_pair_correlations
+
+
+class TestStreamPCF(TestCase):
+    def setUp(self):
+        self.ortho = random_universe(np.diag([12.0, 13.0, 14.0]))
+        self.tric = random_universe([[12.0, 0.0, 0.0], [2.0, 13.0, 0.0],
+                                      [-1.0, 1.0, 14.0]])
+
+    def _check(self, uni, a, b):
+        uni.compute_atom_two(dmax=7.0, bonds=False)
+        ref = radial_pair_correlation(uni, a, b, dr=0.1, stop=6.0)
+        for kwargs in ({}, {'cell_list': False}, {'workers': 2}):
+            result = radial_pair_correlation(uni, a, b, dr=0.1, stop=6.0,
+                                             stream=True, **kwargs)
+            self.assertTrue(np.allclose(ref.index.values, result.index.values))
+            self.assertTrue(np.allclose(ref.values, result.values))
+
+    def test_ortho(self):
+        self._check(self.ortho, "O", "O")
+        self._check(self.ortho, "O", "H")
+
+    def test_tric(self):
+        self._check(self.tric, "H", "H")
+        self._check(self.tric, "H", "O")
+
+    def test_all_pairs(self):
+        self.ortho.compute_atom_two(dmax=7.0, bonds=False)
+        pcfs = radial_pair_correlations(self.ortho, dr=0.1, stop=6.0)
+        streamed = radial_pair_correlations(self.ortho, dr=0.1, stop=6.0, stream=True)
+        self.assertTrue(np.allclose(pcfs.values, streamed.values))
+        for a, b in (("H", "H"), ("H", "O"), ("O", "O")):
+            ref = radial_pair_correlation(self.ortho, a, b, dr=0.1, stop=6.0)
+            self.assertTrue(np.allclose(ref.values, pcfs.loc[(a, b)].values))
+
+    def test_missing_atom(self):
+        """Pairs with atoms no longer in the atom table are an error."""
+        self.ortho.compute_atom_two(dmax=7.0, bonds=False)
+        self.ortho.atom = self.ortho.atom[self.ortho.atom['frame'] != 2]
+        with self.assertRaises(KeyError):
+            radial_pair_correlations(self.ortho, dr=0.1, stop=6.0)
@@ -20,7 +20,7 @@ from io import StringIO
 
 from exa import DataFrame
 from exatomic.algorithms.basis import cart_lml_count, spher_lml_count
-from exatomic.algorithms.numerical import _tri_indices, _square, Shell
+from exatomic.algorithms.numerical import _tri_indices, _square, Shell, ShellArrays
 
 
 class BasisSet(DataFrame):
@@ -109,6 +109,67 @@ class BasisSet(DataFrame):
             return self.groupby(['set', 'L']).apply(_shell_gau).reset_index()
         return self.groupby(['set', 'L']).apply(_shell_sto).reset_index()
 
+    def shell_arrays(self, program='', spherical=True, gaussian=True):
+        """
+        Generate a :class:`~exatomic.algorithms.numerical.ShellArrays` of the
+        basis set, with shells in the same order as :meth:`~exatomic.core.basis.BasisSet.shells`
+        (sorted by set and L), without building any jitclasses.
+
+        Args:
+            program (str): which code the basis set comes from
+            spherical (bool): expand in ml or cartesian powers
+            gaussian (bool): exponential dependence of basis functions
+
+        Returns:
+            shls (:class:`~exatomic.algorithms.numerical.ShellArrays`): flat shells
+        """
+        df = pd.DataFrame({'set': self['set'].astype(np.int64).values,
+                           'L': self['L'].astype(np.int64).values,
+                           'alpha': self['alpha'].values,
+                           'shell': self['shell'].values,
+                           'd': self['d'].values})
+        if not gaussian:
+            df['r'] = self['r'].values
+            df['n'] = self['n'].values
+        df['sid'] = df.groupby(['set', 'L']).ngroup()
+        # Primitives in order of appearance of alpha in each shell
+        prims = df.drop_duplicates(['sid', 'alpha']).copy()
+        prims['prim'] = prims.groupby('sid').cumcount()
+        prims.sort_values(['sid', 'prim'], inplace=True)
+        df = df.merge(prims[['sid', 'alpha', 'prim']], on=['sid', 'alpha'])
+        # Contracted functions in sorted order of shell in each shell
+        df.sort_values(['sid', 'shell'], kind='mergesort', inplace=True)
+        new = ((df['sid'].values[1:] != df['sid'].values[:-1]) |
+               (df['shell'].values[1:] != df['shell'].values[:-1]))
+        cont = np.concatenate([[0], np.cumsum(new)])
+        first = df.groupby('sid').cumcount().values == 0
+        df['cont'] = cont - np.maximum.accumulate(np.where(first, cont, 0))
+        nshl = df['sid'].max() + 1 if len(df) else 0
+        nprim = np.bincount(prims['sid'].values, minlength=nshl).astype(np.int64)
+        ncont = (df.groupby('sid')['cont'].max().values + 1).astype(np.int64)
+        prim_ptr = np.zeros(nshl + 1, dtype=np.int64)
+        coef_ptr = np.zeros(nshl + 1, dtype=np.int64)
+        np.cumsum(nprim, out=prim_ptr[1:])
+        np.cumsum(nprim * ncont, out=coef_ptr[1:])
+        sid = df['sid'].values
+        coefs = np.zeros(coef_ptr[-1])
+        coefs[coef_ptr[sid] + df['prim'].values * ncont[sid] + df['cont'].values] = df['d'].values
+        shls = prims.drop_duplicates('sid')
+        L = shls['L'].values.astype(np.int64)
+        if program in ['molcas', 'nwchem']:
+            sphr = L > 1
+        else:
+            sphr = np.full(nshl, bool(spherical))
+        if gaussian:
+            rs = ns = np.zeros(len(prims), dtype=np.int64)
+        else:
+            rs = prims['r'].values.astype(np.int64)
+            ns = prims['n'].values.astype(np.int64)
+        return ShellArrays(L, nprim, ncont, prim_ptr, coef_ptr,
+                           prims['alpha'].values.astype(np.float64), coefs,
+                           rs, ns, sphr, bool(gaussian),
+                           shls['set'].values.astype(np.int64))
+
     def spherical_by_shell(self, program, spherical=True):
         """Allows for some flexibility in treating shells either as
         cartesian functions or spherical functions (different normalizations).
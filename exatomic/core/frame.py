@@ -12,6 +12,7 @@ frames by unique atomic coordinates, a different level of theory, etc.
 import numpy as np
 from exa import DataFrame
 from exatomic.algorithms.distance import cartmag
+from exatomic.core.error import PeriodicUniverseError
 
 
 class Frame(DataFrame):
@@ -65,13 +66,9 @@ class Frame(DataFrame):
         Check if the simulation cell (applicable to periodic simulations) varies
         (e.g. variable cell molecular dynamics).
         """
-        if self.is_periodic:
-            if 'rx' not in self.columns:
-                self.compute_cell_magnitudes()
-            rx = self['rx'].min()
-            ry = self['ry'].min()
-            rz = self['rz'].min()
-            if np.allclose(self['rx'], rx) and np.allclose(self['ry'], ry) and np.allclose(self['rz'], rz):
+        if self.is_periodic():
+            cell = self[["xi", "yi", "zi", "xj", "yj", "zj", "xk", "yk", "zk"]].values
+            if np.allclose(cell, cell[0]):
                 return False
             else:
                 return True
@@ -86,7 +83,12 @@ class Frame(DataFrame):
         self['rz'] = cartmag(self['xk'].values, self['yk'].values, self['zk'].values)
 
     def orthorhombic(self):
-        if "xi" in self.columns and np.allclose(self["xj"], 0.0):
+        """
+        Check if the cell vectors (of all frames) are aligned with the
+        cartesian axes.
+        """
+        if "xi" in self.columns and np.allclose(self[["yi", "zi", "xj", "zj",
+                                                      "xk", "yk"]], 0.0):
             return True
         return False
 
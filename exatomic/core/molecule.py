@@ -7,11 +7,10 @@ Molecule Table
 """
 import numpy as np
 import pandas as pd
-import networkx as nx
 import warnings
-from networkx.algorithms.components import connected_components
 from exa import DataFrame
 from exatomic.base import sym2mass
+from exatomic.algorithms.indexing import connected_components
 from exatomic.formula import string_to_dict, dict_to_string
 
 
@@ -108,35 +107,35 @@ def compute_molecule(universe):
     Returns:
         molecule: Molecule table
 
+    Note:
+        Molecules are the connected components of the bond graph (found with
+        a compiled union-find); they are numbered in the order of their first
+        atom.
+
     Warning:
         This function modifies the universe's atom (:class:`~exatomic.atom.Atom`)
         table in place!
     """
-    nodes = universe.atom.index.values
     bonded = universe.atom_two.loc[universe.atom_two['bond'] == True, ['atom0', 'atom1']]
-    edges = zip(bonded['atom0'].astype(np.int64), bonded['atom1'].astype(np.int64))
-    g = nx.Graph()
-    g.add_nodes_from(nodes)
-    g.add_edges_from(edges)
-    # generate molecule indices for the atom table
-    mapper = {}
-    i = 0
-    for k, v in g.degree():    # First handle single atom "molecules"
-        if v == 0:
-            mapper[k] = i
-            i += 1
-    for seht in connected_components(g):    # Second handle multi atom molecules
-        for adx in seht:
-            mapper[adx] = i
-        i += 1
-    universe.atom['molecule'] = universe.atom.index.map(lambda x: mapper[x])
-    universe.atom['mass'] = universe.atom['symbol'].map(sym2mass).astype(float)
-    grps = universe.atom.groupby('molecule')
-    molecule = grps['symbol'].value_counts().unstack().fillna(0).astype(np.int64)
-    molecule.columns.name = None
-    molecule['mass'] = grps['mass'].sum()
+    index = pd.Index(universe.atom.index.values)
+    edge0 = index.get_indexer(bonded['atom0'].astype(np.int64).values)
+    edge1 = index.get_indexer(bonded['atom1'].astype(np.int64).values)
+    missing = (edge0 < 0) | (edge1 < 0)
+    if missing.any():
+        raise KeyError('Bonds reference atoms not in the atom table: {}.'.format(
+                       bonded.loc[missing].index.tolist()[:10]))
+    labels = connected_components(len(index), edge0, edge1)
+    nmol = labels.max() + 1 if len(labels) > 0 else 0
+    symbols = universe.atom['symbol'].astype(str).values
+    uniq, codes = np.unique(symbols, return_inverse=True)
+    counts = np.bincount(labels*len(uniq) + codes, minlength=nmol*len(uniq))
+    molecule = pd.DataFrame(counts.reshape(nmol, len(uniq)).astype(np.int64),
+                            columns=uniq)
+    masses = np.array([sym2mass.get(sym, np.nan) for sym in uniq], dtype=np.float64)
+    molecule['mass'] = np.bincount(labels, weights=masses[codes], minlength=nmol)
+    molecule.index.name = 'molecule'
+    universe.atom['molecule'] = labels
     universe.atom['molecule'] = universe.atom['molecule'].astype('category')
-    del universe.atom['mass']
     return molecule
 
 
@@ -148,7 +147,7 @@ def compute_molecule_count(universe):
     universe.atom._revert_categories()
     mapper = universe.atom.drop_duplicates('molecule').set_index('molecule')['frame']
     universe.atom._set_categories()
-    universe.molecule['frame'] = universe.molecule.index.map(lambda x: mapper[x])
+    universe.molecule['frame'] = universe.molecule.index.map(mapper)
     molecule_count = universe.molecule.groupby('frame').size()
     del universe.molecule['frame']
     return molecule_count
@@ -301,11 +301,14 @@ class Excitation(_Convolve):
         """
         Generate the zeroth order approximation to excitation energies
         via the transition dipole method (provided a universe contains
-        an MOMatrix and dipole moment integrals already).
+        an MOMatrix and dipole moment integrals or a basis set from which
+        they are computed).
         """
         if not hasattr(uni, 'multipole'):
-            print('Universe must have dipole integrals.')
-            return
+            if not hasattr(uni, 'basis_set'):
+                print('Universe must have dipole integrals.')
+                return
+            uni.multipole = uni.basis_functions.multipole()
         dim = len(uni.basis_set_order.index)
         fix = (np.ones((dim, dim)) - np.eye(dim, dim) / 2)
         rx = ((uni.multipole.pivot('chi0', 'chi1', 'ix1').fillna(0.0)
@@ -354,6 +357,8 @@ class MOMatrix(DataFrame):
     _columns = ['chi', 'orbital']
     _cardinal = ('frame', np.int64)
     _index = 'index'
+    _internal_names = pd.DataFrame._internal_names + ['_square_cache']
+    _internal_names_set = set(_internal_names)
 
     #@property
     #def _constructor(self):
@@ -375,25 +380,77 @@ class MOMatrix(DataFrame):
         """
         Returns a square dataframe corresponding to the canonical C matrix
         representation.
+
+        Square matrices are cached per column, frame and irrep until the
+        table is modified (through pandas); the returned values are read-only.
+        If the table is stored in canonical order (orbital-major, chi-minor)
+        the matrix is a view of the column rather than a pivot.
         """
         if mocoefs is None: mocoefs = column
-        if 'irrep' in self.columns:
+        cache = getattr(self, '_square_cache', None)
+        if cache is None:
+            cache = self._square_cache = {}
+        key = (mocoefs, frame, irrep)
+        if key not in cache:
+            cache[key] = self._square(frame, mocoefs, irrep)
+        return cache[key].copy(deep=False)
+
+
+    def _square(self, frame, mocoefs, irrep):
+        """Build the square matrix of a column (see square)."""
+        mo = self
+        if 'frame' in self.columns and self['frame'].nunique() > 1:
+            mo = self[self['frame'] == frame]
+        if 'irrep' in mo.columns:
             if irrep is None:
-                irreps, i, j = self.groupby('irrep'), 0, 0
+                irreps, i, j = mo.groupby('irrep'), 0, 0
                 norb = (irreps.orbital.max() + 1).sum()
                 nchi = (irreps.chi.max() + 1).sum()
                 cmat = np.zeros((nchi, norb))
                 for irrep, grp in irreps:
-                    piv = grp.pivot('chi', 'orbital', mocoefs)
+                    piv = _canonical_square(grp['chi'].values, grp['orbital'].values,
+                                            grp[mocoefs].values)
+                    if piv is None:
+                        piv = grp.pivot('chi', 'orbital', mocoefs).values
                     ii, jj = piv.shape
-                    cmat[i : i + ii, j : j + jj] = piv.values
+                    cmat[i : i + ii, j : j + jj] = piv
                     i += ii
                     j += jj
+                cmat.flags.writeable = False
                 return pd.DataFrame(cmat, index=pd.Index(range(nchi), name='chi'),
                                     columns=pd.Index(range(norb), name='orbital'))
-            return self.groupby('irrep').get_group(irrep
-                        ).pivot('chi', 'orbital', mocoefs)
-        return self.pivot('chi', 'orbital', mocoefs)
+            mo = mo.groupby('irrep').get_group(irrep)
+        cmat = _canonical_square(mo['chi'].values, mo['orbital'].values,
+                                 mo[mocoefs].values)
+        if cmat is None:
+            piv = mo.pivot('chi', 'orbital', mocoefs)
+            cmat = np.ascontiguousarray(piv.values)
+            cmat.flags.writeable = False
+            return pd.DataFrame(cmat, index=piv.index, columns=piv.columns)
+        return pd.DataFrame(cmat, index=pd.Index(range(cmat.shape[0]), name='chi'),
+                            columns=pd.Index(range(cmat.shape[1]), name='orbital'))
+
+
+    def _clear_item_cache(self, *args, **kwargs):
+        # Pandas clears its item cache on every mutation of the table
+        self._square_cache = None
+        super(MOMatrix, self)._clear_item_cache(*args, **kwargs)
+
+
+def _canonical_square(chis, orbs, vals):
+    """Return a read-only (chi, orbital) view of vals if the rows are in
+    canonical (orbital-major, chi-minor) order, otherwise None."""
+    nrow = len(vals)
+    if not nrow: return None
+    nchi = chis.max() + 1
+    if nrow % nchi: return None
+    norb = nrow // nchi
+    if not ((chis.reshape(norb, nchi) == np.arange(nchi)).all() and
+            (orbs.reshape(norb, nchi) == np.arange(norb)[:, None]).all()):
+        return None
+    cmat = vals.reshape(norb, nchi).T
+    cmat.flags.writeable = False
+    return cmat
 
 
 class DensityMatrix(DataFrame):
@@ -422,34 +479,67 @@ class DensityMatrix(DataFrame):
     #def _constructor(self):
     #    return DensityMatrix
 
-    def square(self, frame=0):
+    def square(self, frame=0, column='coef'):
         """Returns a square dataframe of the density matrix."""
-        denvec = self[self['frame'] == frame]['coef'].values
+        denvec = self[self['frame'] == frame][column].values
         square = pd.DataFrame(density_as_square(denvec))
         square.index.name = 'chi0'
         square.columns.name = 'chi1'
         return square
 
     @classmethod
-    def from_momatrix(cls, momatrix, occvec, mocoefs='coef'):
+    def from_momatrix(cls, momatrix, occvec, mocoefs='coef', columns=None):
         """
         A density matrix can be constructed from an MOMatrix by:
         .. math::
 
-            D_{uv} = \sum_{i}^{N} C_{ui} C_{vi} n_{i}
+            D_{uv} = \\sum_{i}^{N} C_{ui} C_{vi} n_{i}
+
+        Several densities (e.g. per spin) are built in one call from a
+        two dimensional occvec and/or a list of mocoefs.
+
+        .. code-block:: python
+
+            dm = DensityMatrix.from_momatrix(mo, occvec)
+            dm = DensityMatrix.from_momatrix(mo, orb[['alpha', 'beta']],
+                                             mocoefs=['coef', 'coef1'])
 
         Args:
             momatrix (:class:`~exatomic.orbital.MOMatrix`): a C matrix
             occvec (:class:`~np.array` or similar): vector of len(C.shape[0])
-                containing the occupations of each molecular orbital.
+                containing the occupations of each molecular orbital, or
+                (norb, nden) occupations (column names are kept for a DataFrame)
+            mocoefs (str, list): column(s) of the C matrix (one per density)
+            columns (list): names of the density columns (if more than one)
 
         Returns:
             ret (:class:`~exatomic.orbital.DensityMatrix`): The density matrix
+
+        Note:
+            With several densities, if 'coef' is not one of the column names
+            it holds their sum (e.g. the total of the spin densities).
         """
-        cmat = momatrix.square(column=mocoefs).values
-        chi0, chi1, dens, frame = density_from_momatrix(cmat, occvec)
-        return cls.from_dict({'chi0': chi0, 'chi1': chi1,
-                              'coef': dens, 'frame': frame})
+        if isinstance(mocoefs, str):
+            cmat = momatrix.square(column=mocoefs).values
+        else:
+            cmat = np.stack([momatrix.square(column=col).values for col in mocoefs])
+        if columns is None and isinstance(occvec, pd.DataFrame):
+            columns = [str(col) for col in occvec.columns]
+        chi0, chi1, dens, frame = density_from_momatrix(cmat, np.asarray(occvec))
+        data = {'chi0': chi0, 'chi1': chi1, 'frame': frame}
+        if dens.ndim == 1:
+            data['coef'] = dens
+            return cls.from_dict(data)
+        if columns is None:
+            columns = ['coef'] + ['coef{}'.format(i) for i in range(1, dens.shape[1])]
+        if len(columns) != dens.shape[1]:
+            raise ValueError("columns must name each of the {} densities"
+                             .format(dens.shape[1]))
+        for i, col in enumerate(columns):
+            data[col] = dens[:, i]
+        if 'coef' not in data:
+            data['coef'] = dens.sum(axis=1)
+        return cls.from_dict(data)
 
     @classmethod
     def from_universe(cls, uni, mocoefs, orbocc):
@@ -457,18 +547,16 @@ class DensityMatrix(DataFrame):
         The density matrix is defined as:
         .. math::
 
-            D_{uv} = \sum_{i}^{N} C_{ui} C_{vi} n_{i}
+            D_{uv} = \\sum_{i}^{N} C_{ui} C_{vi} n_{i}
 
         Args:
             uni (:class:`~exatomic.core.universe.Universe`): a universe containing momatrix and orbital
-            mocoefs (str): column name of C matrix in uni.momatrix
-            orbocc (str): column name of occupation vector in uni.orbital
+            mocoefs (str, list): column name(s) of C matrix in uni.momatrix
+            orbocc (str, list): column name(s) of occupation vector in uni.orbital
 
         Returns:
             ret (:class:`~exatomic.orbital.DensityMatrix`): The density matrix
         """
-        cmat = uni.momatrix.square(mocoefs=mocoefs).values
-        occvec = uni.orbital[orbocc].values
-        chi0, chi1, dens, frame = density_from_momatrix(cmat, occvec)
-        return cls.from_dict({'chi0': chi0, 'chi1': chi1,
-                              'coef': dens, 'frame': frame})
+        occvec = uni.orbital[orbocc]
+        if isinstance(orbocc, str): occvec = occvec.values
+        return cls.from_momatrix(uni.momatrix, occvec, mocoefs=mocoefs)
@@ -5,6 +5,7 @@ import numpy as np
 import pandas as pd
 from unittest import TestCase
 from exatomic.core.basis import BasisSet
+from exatomic.algorithms.numerical import norm_contract
 
 class TestBasisSet(TestCase):
 
@@ -41,6 +42,21 @@ class TestBasisSet(TestCase):
         self.mbs.shells()
         self.lbs.shells()
 
+    def test_shell_arrays(self):
+        for bs in (self.bs, self.mbs, self.lbs):
+            shls = bs.shell_arrays()
+            norm = norm_contract(shls) if bs is not self.bs else shls.coefs
+            for i, shl in enumerate(bs.shells()[0]):
+                self.assertEqual(shls.L[i], shl.L)
+                self.assertEqual(shls.nprim[i], shl.nprim)
+                self.assertEqual(shls.ncont[i], shl.ncont)
+                p0, p1 = shls.prim_ptr[i:i + 2]
+                c0, c1 = shls.coef_ptr[i:i + 2]
+                self.assertTrue(np.allclose(shls.alphas[p0:p1], shl.alphas))
+                self.assertTrue(np.allclose(shls.coefs[c0:c1], shl.contract().ravel()))
+                if bs is not self.bs:
+                    self.assertTrue(np.allclose(norm[c0:c1], shl.norm_contract().ravel()))
+
     def test_functions_by_shell(self):
         n = ['set', 'L']
         mfp = pd.MultiIndex.from_product
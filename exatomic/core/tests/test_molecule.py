@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2018, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+import numpy as np
+from unittest import TestCase
+from exatomic.tests.helpers import random_universe
+
+
+class TestComputeMolecule(TestCase):
+    def setUp(self):
+        self.uni = random_universe(np.diag([12.0, 13.0, 14.0]), nframe=20, step=0.005)
+        self.uni.compute_atom_two(dmax=5.0, O=1.0, H=0.6)
+
+    def test_molecule(self):
+        """Molecules are the connected components of the bond graph."""
+        uni = self.uni
+        uni.compute_molecule()
+        bonded = uni.atom_two[uni.atom_two['bond'] == True]
+        mol = uni.atom['molecule'].astype(np.int64)
+        self.assertTrue(np.all(mol[bonded['atom0'].astype(np.int64)].values ==
+                               mol[bonded['atom1'].astype(np.int64)].values))
+        self.assertEqual(len(uni.molecule), mol.nunique())
+        self.assertEqual(uni.molecule[['H', 'O']].values.sum(), len(uni.atom))
+        sizes = mol.value_counts().sort_index()
+        self.assertTrue(np.all(sizes.values == uni.molecule[['H', 'O']].sum(axis=1).values))
+        self.assertTrue(np.all(uni.frame['molecule_count'].values ==
+                               uni.atom.groupby('frame')['molecule'].nunique().values))
+
+    def test_missing_atom(self):
+        """Bonds to atoms not in the atom table are an error."""
+        uni = self.uni
+        bond = uni.atom_two.index[uni.atom_two['bond'] == True][0]
+        uni.atom_two['atom1'] = uni.atom_two['atom1'].astype(np.int64)
+        uni.atom_two.loc[bond, 'atom1'] = len(uni.atom) + 10
+        with self.assertRaises(KeyError):
+            uni.compute_molecule()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2018, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+import numpy as np
+import pandas as pd
+from unittest import TestCase
+from exatomic.core.orbital import MOMatrix, DensityMatrix
+
+
+class TestMOMatrix(TestCase):
+
+    def setUp(self):
+        nbas = 5
+        self.cmat = np.random.rand(nbas, nbas)
+        self.df = pd.DataFrame({'chi': np.tile(range(nbas), nbas),
+                                'orbital': np.repeat(range(nbas), nbas),
+                                'coef': self.cmat.T.flatten(), 'frame': 0})
+
+    def test_square(self):
+        mo = MOMatrix(self.df.copy())
+        sq = mo.square()
+        self.assertTrue(np.allclose(sq.values, self.cmat))
+        self.assertTrue(np.shares_memory(sq.values, mo['coef'].values))
+        self.assertFalse(sq.values.flags.writeable)
+        shuf = MOMatrix(self.df.sample(frac=1, random_state=0))
+        self.assertTrue(np.allclose(shuf.square().values, self.cmat))
+        self.assertTrue(np.allclose(shuf.square().values, self.cmat))
+
+    def test_irrep(self):
+        df = pd.concat([self.df, self.df])
+        df['irrep'] = np.repeat([0, 1], len(self.df))
+        mo = MOMatrix(df)
+        sq = mo.square().values
+        self.assertTrue(np.allclose(sq[:5, :5], self.cmat))
+        self.assertTrue(np.allclose(sq[5:, 5:], self.cmat))
+        self.assertTrue(np.allclose(sq[:5, 5:], 0))
+        self.assertTrue(np.allclose(mo.square(irrep=1).values, self.cmat))
+
+    def test_invalidate(self):
+        mo = MOMatrix(self.df.copy())
+        mo.square()
+        mo['coef'] *= 2
+        self.assertTrue(np.allclose(mo.square().values, 2 * self.cmat))
+        mo.loc[0, 'coef'] = 0.
+        self.assertEqual(mo.square().values[0, 0], 0.)
+
+
+class TestDensityMatrix(TestCase):
+
+    def setUp(self):
+        nbas = 5
+        self.cmat = np.random.rand(nbas, nbas)
+        self.mo = MOMatrix({'chi': np.tile(range(nbas), nbas),
+                            'orbital': np.repeat(range(nbas), nbas),
+                            'coef': self.cmat.T.flatten(),
+                            'coef1': -self.cmat.T.flatten(), 'frame': 0})
+        self.occ = pd.DataFrame({'alpha': [1., 1., 1., 0., 0.],
+                                 'beta': [1., 1., 0., 0., 0.]})
+
+    def test_from_momatrix(self):
+        dm = DensityMatrix.from_momatrix(self.mo, self.occ['alpha'].values)
+        ref = np.dot(self.cmat[:, :3], self.cmat[:, :3].T)
+        self.assertTrue(np.allclose(dm.square().values, ref))
+        self.assertTrue((dm['chi0'] >= dm['chi1']).all())
+
+    def test_multiple(self):
+        dm = DensityMatrix.from_momatrix(self.mo, self.occ,
+                                         mocoefs=['coef', 'coef1'])
+        alpha = np.dot(self.cmat[:, :3], self.cmat[:, :3].T)
+        beta = np.dot(self.cmat[:, :2], self.cmat[:, :2].T)
+        self.assertTrue(np.allclose(dm.square(column='alpha').values, alpha))
+        self.assertTrue(np.allclose(dm.square(column='beta').values, beta))
+        self.assertTrue(np.allclose(dm.square().values, alpha + beta))
+        dm = DensityMatrix.from_momatrix(self.mo, self.occ.values)
+        self.assertTrue(np.allclose(dm.square(column='coef1').values, beta))
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2018, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+import numpy as np
+from unittest import TestCase
+from exatomic.core.universe import Universe
+from exatomic.tests.helpers import random_universe
+
+
+class TestAtomTwo(TestCase):
+    def setUp(self):
+        self.ortho = random_universe(np.diag([12.0, 13.0, 14.0]))
+        self.tric = random_universe([[[12.0, 0.0, 0.0], [2.0, 13.0, 0.0], [-1.0, 1.0, 14.0]],
+                                      [[12.5, 0.0, 0.0], [1.0, 13.0, 0.5], [0.0, 1.0, 13.5]],
+                                      [[13.0, 0.5, 0.0], [2.0, 12.0, 0.0], [-1.0, 0.0, 14.0]]])
+        self.traj = random_universe(np.diag([12.0, 13.0, 14.0]), nframe=20, step=0.005)
+        self.trajt = random_universe([[12.0, 0.0, 0.0], [2.0, 13.0, 0.0], [-1.0, 1.0, 14.0]],
+                                      nframe=20, step=0.005)
+
+    def _check(self, uni, **kwargs):
+        uni.compute_atom_two(dmax=5.0, vector=True)
+        ref = uni.atom_two.sort_values(['atom0', 'atom1']).reset_index(drop=True)
+        uni.compute_atom_two(dmax=5.0, vector=True, **kwargs)
+        result = uni.atom_two.sort_values(['atom0', 'atom1']).reset_index(drop=True)
+        self.assertEqual(len(ref), len(result))
+        for col in ref.columns:
+            self.assertTrue(np.allclose(ref[col].astype(float), result[col].astype(float)))
+
+    def test_ortho(self):
+        self._check(self.ortho, cell_list=True)
+        self._check(self.ortho, workers=3)
+
+    def test_tric(self):
+        self.assertFalse(self.tric.orthorhombic)
+        self.assertTrue(self.tric.frame.is_variable_cell())
+        self._check(self.tric, cell_list=True)
+        self._check(self.tric, workers=3)
+
+    def test_dtype(self):
+        self.ortho.compute_atom_two(dmax=5.0)
+        ref = self.ortho.atom_two
+        self.ortho.compute_atom_two(dmax=5.0, dtype=np.float32)
+        result = self.ortho.atom_two
+        self.assertEqual(result['dr'].dtype, np.float32)
+        self.assertEqual(result['projection'].dtype, np.int32)
+        self.assertTrue(np.allclose(ref['dr'], result['dr'], atol=1e-5))
+        self.assertTrue(np.all(ref['bond'] == result['bond']))
+
+    def test_skin(self):
+        self._check(self.traj, skin=1.0)
+        self._check(self.traj, skin=0.1, cell_list=True)
+        self._check(self.trajt, skin=1.0)
+        self._check(self.tric, skin=1.0, workers=2)
+        free = Universe(atom=self.traj.atom[['x', 'y', 'z', 'symbol', 'frame']].copy())
+        self._check(free, skin=1.0)
@@ -29,13 +29,19 @@ guide for the types of data found in two body tables provided by this module
 """
 import numpy as np
 import pandas as pd
+from multiprocessing.pool import ThreadPool
 from IPython.display import display
 from ipywidgets import FloatProgress
 from exa import DataFrame
 #from exa.util.units import Length
 from exatomic.base import sym2radius
-from exatomic.algorithms.distance import (pdist_ortho, pdist_ortho_nv, pdist,
-                                          pdist_nv)
+from exatomic.algorithms.distance import (pdist_ortho, modv, max_displacement,
+                                          _free_pairs, _free_list_pairs,
+                                          _free_alloc, _ortho_pairs,
+                                          _ortho_list_pairs, _ortho_alloc,
+                                          _ortho_nbin, _tric_pairs,
+                                          _tric_list_pairs, _tric_alloc,
+                                          _tric_nbin)
 
 
 class AtomTwo(DataFrame):
@@ -60,7 +66,9 @@ class MoleculeTwo(DataFrame):
         return MoleculeTwo
 
 
-def compute_atom_two(universe, dmax=8.0, vector=False, bonds=True, **kwargs):
+def compute_atom_two(universe, dmax=8.0, vector=False, bonds=True,
+                     cell_list=False, workers=1, dtype=np.float64, skin=None,
+                     **kwargs):
     """
     Compute interatomic distances and determine bonds.
 
@@ -69,6 +77,10 @@ def compute_atom_two(universe, dmax=8.0, vector=False, bonds=True, **kwargs):
         atom_two = compute_atom_two(uni, dmax=4.0)    # Max distance of interest as 4 bohr
         atom_two = compute_atom_two(uni, vector=True) # Return distance vector components as well as distance
         atom_two = compute_atom_two(uni, bonds=False) # Don't compute bonds
+        atom_two = compute_atom_two(uni, cell_list=True) # Linked cell list (periodic)
+        atom_two = compute_atom_two(uni, workers=4)   # Distribute frames over 4 threads
+        atom_two = compute_atom_two(uni, dtype=np.float32) # Single precision (int32 atom indices)
+        atom_two = compute_atom_two(uni, skin=1.0)    # Reuse neighbor lists across (MD) frames
         # Compute bonds with custom covalent radii (atomic units)
         atom_two = compute_atom_two(unit, H=10.0, He=20.0, Li=30.0, bond_extra=100.0)
 
@@ -77,174 +89,377 @@ def compute_atom_two(universe, dmax=8.0, vector=False, bonds=True, **kwargs):
         dmax (float): Maximum distance of interest
         vector (bool): Compute distance vector (needed for angles)
         bonds (bool): Compute bonds (default True)
+        cell_list (bool): Use a linked cell list for periodic systems (default False)
+        workers (int): Number of threads over which frames are distributed (default 1)
+        dtype (type): Float type of the distances; atom indices are int32 for float32
+        skin (float): Verlet list skin distance (default None: no lists)
         kwargs: Additional keyword arguments for :func:`~exatomic.core.two._compute_bonds`
+
+    Note:
+        The linked cell list scales linearly with the number of atoms (for
+        a fixed dmax) and is the better choice for large periodic systems.
+        The pairs it returns are the same as the default algorithm's but
+        they are ordered differently.
+
+    Note:
+        For trajectories where atoms move little between frames (e.g. molecular
+        dynamics), a skin enables Verlet lists: candidate pairs within dmax + skin
+        are found once and only rechecked until some atom has moved more than
+        half of the skin, at which point the list is rebuilt. Atoms must appear
+        in the same order in every frame.
     """
     if universe.periodic:
         if universe.orthorhombic and vector:
-            atom_two = compute_pdist_ortho(universe, dmax=dmax)
+            atom_two = compute_pdist_ortho(universe, dmax=dmax, cell_list=cell_list,
+                                           workers=workers, dtype=dtype, skin=skin)
         elif universe.orthorhombic:
-            atom_two = compute_pdist_ortho_nv(universe, dmax=dmax)
+            atom_two = compute_pdist_ortho_nv(universe, dmax=dmax, cell_list=cell_list,
+                                              workers=workers, dtype=dtype,
+                                              skin=skin)
         else:
-            raise NotImplementedError("Only supports orthorhombic cells")
+            atom_two = compute_pdist_tric(universe, dmax=dmax, vector=vector,
+                                          cell_list=cell_list, workers=workers,
+                                          dtype=dtype, skin=skin)
     elif vector:
-        atom_two = compute_pdist(universe, dmax=dmax)
+        atom_two = compute_pdist(universe, dmax=dmax, workers=workers, dtype=dtype,
+                                 skin=skin)
     else:
-        atom_two = compute_pdist_nv(universe, dmax=dmax)
+        atom_two = compute_pdist_nv(universe, dmax=dmax, workers=workers, dtype=dtype,
+                                    skin=skin)
     if bonds:
         _compute_bonds(universe.atom, atom_two, **kwargs)
     return atom_two
 
 
-def compute_pdist(universe, dmax=8.0):
+def _atom_by_frame(universe, columns):
+    """
+    Atom data (stably) sorted by frame.
+
+    Args:
+        universe (:class:`~exatomic.core.universe.Universe`): A universe
+        columns (list): Atom table (float) columns of interest
+
+    Returns:
+        values (list): Arrays of the requested columns in frame order
+        index (array): Atom index in frame order
+        frames (array): Unique frames
+        bounds (array): Offsets of each frame in the arrays (length nframe + 1)
+    """
+    fdxs = universe.atom['frame'].values.astype(np.int64)
+    order = np.argsort(fdxs, kind='mergesort')
+    frames, starts = np.unique(fdxs[order], return_index=True)
+    bounds = np.append(starts, len(order))
+    values = [universe.atom[col].values.astype(np.float64)[order] for col in columns]
+    index = universe.atom.index.values.astype(np.int64)[order]
+    return values, index, frames, bounds
+
+
+def _ortho_frames(universe):
+    """
+    Atom positions (stably sorted by frame) wrapped into the orthorhombic cell
+    of their own frame.
+
+    Returns:
+        uxyz (list): In unit cell x, y, z arrays in frame order
+        abc (array): Cell dimensions of each frame
+        index (array): Atom index in frame order
+        frames (array): Unique frames
+        bounds (array): Offsets of each frame in the arrays (length nframe + 1)
+    """
+    if "rx" not in universe.frame.columns:
+        universe.frame.compute_cell_magnitudes()
+    (x, y, z), index, frames, bounds = _atom_by_frame(universe, ['x', 'y', 'z'])
+    abc = universe.frame.loc[frames, ["rx", "ry", "rz"]].values.astype(np.float64)
+    rep = np.repeat(abc, np.diff(bounds), axis=0)
+    uxyz = [modv(x, rep[:, 0]), modv(y, rep[:, 1]), modv(z, rep[:, 2])]
+    return uxyz, abc, index, frames, bounds
+
+
+def _tric_frames(universe):
+    """
+    Fractional atom positions (stably sorted by frame) wrapped into the
+    (general) cell of their own frame.
+
+    Returns:
+        sabc (array): Fractional coordinates (3 x natom) in frame order
+        cells (array): Cell vectors (as rows) of each frame
+        index (array): Atom index in frame order
+        frames (array): Unique frames
+        bounds (array): Offsets of each frame in the arrays (length nframe + 1)
+    """
+    cols = ["xi", "yi", "zi", "xj", "yj", "zj", "xk", "yk", "zk"]
+    (x, y, z), index, frames, bounds = _atom_by_frame(universe, ['x', 'y', 'z'])
+    cells = np.ascontiguousarray(universe.frame.loc[frames, cols].values,
+                                 dtype=np.float64).reshape(-1, 3, 3)
+    inverse = np.repeat(np.linalg.inv(cells), np.diff(bounds), axis=0)
+    frac = np.einsum('ni,nij->jn', np.column_stack((x, y, z)), inverse)
+    frac -= np.floor(frac)
+    return np.ascontiguousarray(frac), cells, index, frames, bounds
+
+
+def _compute_pairs(walker, args, vector, periodic, workers=1, dtype=np.float64):
+    """
+    Run a pair walker (see :mod:`~exatomic.algorithms.distance`) over frames.
+
+    Pairs are first counted frame by frame, the output arrays are allocated
+    once, and each frame then fills its own slice of them. If workers is
+    greater than one, frames are distributed over a pool of threads (the
+    compiled walkers release the GIL).
+
+    Args:
+        walker (function): Compiled pair walker
+        args (list): Per frame tuples of leading walker arguments
+        vector (bool): Compute distance vector components
+        periodic (bool): True if the walker computes projections
+        workers (int): Number of threads
+        dtype (type): Float type of the output (int32 indices for float32)
+
+    Returns:
+        atom_two (:class:`~exatomic.core.two.AtomTwo`): Two body table
+    """
+    fe = np.empty((0, ), dtype=np.float64)
+    ie = np.empty((0, ), dtype=np.int64)
+    nout = 7 if periodic else 6
+    empty = (fe, fe, fe, fe, ie, ie, ie)[:nout]
+
+    def count(arg):
+        return walker(*(arg + (vector, True) + empty))
+
+    def fill(i):
+        lo, hi = bounds[i], bounds[i + 1]
+        walker(*(args[i] + (vector, False) + tuple(o[lo:hi] for o in out)))
+
+    ftype = np.dtype(dtype)
+    itype = np.int32 if ftype.itemsize == 4 else np.int64
+    pool = ThreadPool(workers) if workers > 1 else None
+    try:
+        mapper = pool.map if pool is not None else lambda f, it: list(map(f, it))
+        bounds = np.cumsum([0] + mapper(count, args))
+        n = bounds[-1]
+        nv = n if vector else 0
+        out = (np.empty((nv, ), dtype=ftype),
+               np.empty((nv, ), dtype=ftype),
+               np.empty((nv, ), dtype=ftype),
+               np.empty((n, ), dtype=ftype),
+               np.empty((n, ), dtype=itype),
+               np.empty((n, ), dtype=itype),
+               np.empty((n, ), dtype=itype))[:nout]
+        mapper(fill, range(len(args)))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    cols = ['dx', 'dy', 'dz', 'dr', 'atom0', 'atom1', 'projection'][:nout]
+    if not vector:
+        cols, out = cols[3:], out[3:]
+    return AtomTwo.from_dict(dict(zip(cols, out)))
+
+
+def _verlet_lists(coords, cells, bounds, periodic, skin, build):
+    """
+    Verlet (neighbor) lists for consecutive frames.
+
+    A list of candidate pairs (those within dmax + skin) is built for a frame
+    and reused for the following frames until an atom has moved more than half
+    of the skin, relative to the frame for which the list was built, or until
+    the number of atoms or the cell changes. Atoms are assumed to appear in
+    the same order in every frame.
+
+    Args:
+        coords (tuple): Fractional (periodic) or cartesian coordinate arrays, in frame order
+        cells (array): Cell vectors of each frame (identity if not periodic)
+        bounds (array): Offsets of each frame in the coordinate arrays
+        periodic (bool): Use minimum image displacements
+        skin (float): Verlet list skin distance
+        build (function): Returns the candidate pairs (local indices) of a given frame number
+
+    Returns:
+        lists (list): Candidate pairs, (ci, cj), of each frame
+    """
+    lists = []
+    ref = None
+    for f, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+        rebuild = (ref is None or hi - lo != rhi - rlo or
+                   not np.allclose(cells[f], cells[ref]))
+        if not rebuild:
+            args = ([c[lo:hi] for c in coords] + [c[rlo:rhi] for c in coords] +
+                    [cells[f], periodic])
+            rebuild = max_displacement(*args) > skin/2
+        if rebuild:
+            pairs = build(f)
+            ref, rlo, rhi = f, lo, hi
+        lists.append(pairs)
+    return lists
+
+
+def _compute_pdist(universe, dmax, vector, workers, dtype, skin):
+    """Free boundary conditions; see :func:`~exatomic.core.two.compute_pdist`."""
+    (x, y, z), index, frames, bounds = _atom_by_frame(universe, ['x', 'y', 'z'])
+    args = [(x[lo:hi], y[lo:hi], z[lo:hi], index[lo:hi], float(dmax))
+            for lo, hi in zip(bounds[:-1], bounds[1:])]
+    if not skin:
+        return _compute_pairs(_free_pairs, args, vector, False, workers, dtype)
+
+    def build(f):
+        lo, hi = bounds[f], bounds[f + 1]
+        v = _free_alloc(x[lo:hi], y[lo:hi], z[lo:hi], np.arange(hi - lo),
+                        float(dmax + skin), False)
+        return v[4], v[5]
+
+    cells = np.tile(np.eye(3), (len(frames), 1, 1))
+    lists = _verlet_lists((x, y, z), cells, bounds, False, skin, build)
+    args = [arg + pairs for arg, pairs in zip(args, lists)]
+    return _compute_pairs(_free_list_pairs, args, vector, False, workers, dtype)
+
+
+def compute_pdist(universe, dmax=8.0, workers=1, dtype=np.float64, skin=None):
     """
     Compute interatomic distances for atoms in free boundary conditions.
 
     Does return distance vector.
+
+    Args:
+        universe (:class:`~exatomic.core.universe.Universe`): A universe
+        dmax (float): Maximum distance of interest
+        workers (int): Number of threads over which frames are distributed
+        dtype (type): Float type of the distances (int32 atom indices for float32)
+        skin (float): Reuse Verlet lists with this skin distance across frames
     """
-    dxs = []
-    dys = []
-    dzs = []
-    drs = []
-    atom0s = []
-    atom1s = []
-    for _, group in universe.atom.groupby("frame"):
-        if len(group) > 0:
-            values = pdist(group['x'].values.astype(float),
-                           group['y'].values.astype(float),
-                           group['z'].values.astype(float),
-                           group.index.values.astype(int), dmax)
-            dxs.append(values[0])
-            dys.append(values[1])
-            dzs.append(values[2])
-            drs.append(values[3])
-            atom0s.append(values[4])
-            atom1s.append(values[5])
-    dxs = np.concatenate(dxs)
-    dys = np.concatenate(dys)
-    dzs = np.concatenate(dzs)
-    drs = np.concatenate(drs)
-    atom0s = np.concatenate(atom0s)
-    atom1s = np.concatenate(atom1s)
-    return AtomTwo.from_dict({'dx': dxs, 'dy': dys, 'dz': dzs, 'dr': drs,
-                              'atom0': atom0s, 'atom1': atom1s})
-
-
-def compute_pdist_nv(universe, dmax=8.0):
+    return _compute_pdist(universe, dmax, True, workers, dtype, skin)
+
+
+def compute_pdist_nv(universe, dmax=8.0, workers=1, dtype=np.float64, skin=None):
     """
     Compute interatomic distances for atoms in free boundary conditions.
 
     Does not return distance vector.
+
+    Args:
+        universe (:class:`~exatomic.core.universe.Universe`): A universe
+        dmax (float): Maximum distance of interest
+        workers (int): Number of threads over which frames are distributed
+        dtype (type): Float type of the distances (int32 atom indices for float32)
+        skin (float): Reuse Verlet lists with this skin distance across frames
+    """
+    return _compute_pdist(universe, dmax, False, workers, dtype, skin)
+
+
+def _compute_pdist_ortho(universe, dmax, vector, cell_list, workers, dtype, skin):
     """
-    drs = []
-    atom0s = []
-    atom1s = []
-    #for fdx, group in universe.atom.groupby("frame"):
-    for _, group in universe.atom.groupby("frame"):
-        if len(group) > 0:
-            values = pdist_nv(group['x'].values.astype(float),
-                              group['y'].values.astype(float),
-                              group['z'].values.astype(float),
-                              group.index.values.astype(int), dmax)
-            drs.append(values[0])
-            atom0s.append(values[1])
-            atom1s.append(values[2])
-    drs = np.concatenate(drs)
-    atom0s = np.concatenate(atom0s)
-    atom1s = np.concatenate(atom1s)
-    return AtomTwo.from_dict({'dr': drs, 'atom0': atom0s, 'atom1': atom1s})
-
-
-def compute_pdist_ortho(universe, dmax=8.0):
+    Orthorhombic periodic cells; see :func:`~exatomic.core.two.compute_pdist_ortho`.
+    Positions are wrapped into the cell of their own frame.
+    """
+    (ux, uy, uz), abc, index, frames, bounds = _ortho_frames(universe)
+    rmax = float(dmax + skin) if skin else float(dmax)
+    args = []
+    nbins = []
+    for (a, b, c), lo, hi in zip(abc, bounds[:-1], bounds[1:]):
+        if cell_list:
+            nbins.append(_ortho_nbin(a, b, c, rmax))
+        else:
+            nbins.append(np.ones((3, ), dtype=np.int64))
+        args.append((ux[lo:hi], uy[lo:hi], uz[lo:hi], a, b, c, index[lo:hi],
+                     float(dmax)))
+    if not skin:
+        args = [arg + (nbin, ) for arg, nbin in zip(args, nbins)]
+        return _compute_pairs(_ortho_pairs, args, vector, True, workers, dtype)
+
+    def build(f):
+        lo, hi = bounds[f], bounds[f + 1]
+        v = _ortho_alloc(ux[lo:hi], uy[lo:hi], uz[lo:hi], abc[f, 0], abc[f, 1],
+                         abc[f, 2], np.arange(hi - lo), rmax, nbins[f], False)
+        return v[4], v[5]
+
+    cells = np.zeros((len(frames), 3, 3))
+    for i in range(3):
+        cells[:, i, i] = abc[:, i]
+    rep = np.repeat(abc, np.diff(bounds), axis=0)
+    frac = (ux/rep[:, 0], uy/rep[:, 1], uz/rep[:, 2])
+    lists = _verlet_lists(frac, cells, bounds, True, skin, build)
+    args = [arg + pairs for arg, pairs in zip(args, lists)]
+    return _compute_pairs(_ortho_list_pairs, args, vector, True, workers, dtype)
+
+
+def compute_pdist_ortho(universe, dmax=8.0, cell_list=False, workers=1,
+                        dtype=np.float64, skin=None):
     """
     Compute interatomic distances between atoms in an orthorhombic
     periodic cell.
 
     Args:
         universe (:class:`~exatomic.core.universe.Universe`): A universe
-        bonds (bool): Compute bonds as well as distances
-        bond_extra (float): Extra factor to use when determining bonds
         dmax (float): Maximum distance of interest
-        rtol (float): Relative tolerance (float equivalence)
-        atol (float): Absolute tolerance (float equivalence)
-        radii (kwargs): Custom (covalent) radii to use when determining bonds
+        cell_list (bool): Use the linked cell list algorithm
+        workers (int): Number of threads over which frames are distributed
+        dtype (type): Float type of the distances (int32 atom indices for float32)
+        skin (float): Reuse Verlet lists with this skin distance across frames
     """
-    if "rx" not in universe.frame.columns:
-        universe.frame.compute_cell_magnitudes()
-    dxs = []
-    dys = []
-    dzs = []
-    drs = []
-    atom0s = []
-    atom1s = []
-    prjs = []
-    atom = universe.atom[["x", "y", "z", "frame"]].copy()
-    atom.update(universe.unit_atom)
-    for fdx, group in atom.groupby("frame"):
-        if len(group) > 0:
-            a, b, c = universe.frame.loc[fdx, ["rx", "ry", "rz"]]
-            values = pdist_ortho(group['x'].values.astype(float),
-                                 group['y'].values.astype(float),
-                                 group['z'].values.astype(float),
-                                 a, b, c,
-                                 group.index.values.astype(int), dmax)
-            dxs.append(values[0])
-            dys.append(values[1])
-            dzs.append(values[2])
-            drs.append(values[3])
-            atom0s.append(values[4])
-            atom1s.append(values[5])
-            prjs.append(values[6])
-    dxs = np.concatenate(dxs)
-    dys = np.concatenate(dys)
-    dzs = np.concatenate(dzs)
-    drs = np.concatenate(drs)
-    atom0s = np.concatenate(atom0s)
-    atom1s = np.concatenate(atom1s)
-    prjs = np.concatenate(prjs)
-    return AtomTwo.from_dict({'dx': dxs, 'dy': dys, 'dz': dzs, 'dr': drs,
-                              'atom0': atom0s, 'atom1': atom1s, 'projection': prjs})
-
-
-def compute_pdist_ortho_nv(universe, dmax=8.0):
+    return _compute_pdist_ortho(universe, dmax, True, cell_list, workers, dtype, skin)
+
+
+def compute_pdist_ortho_nv(universe, dmax=8.0, cell_list=False, workers=1,
+                           dtype=np.float64, skin=None):
     """
     Compute interatomic distances between atoms in an orthorhombic
     periodic cell.
 
+    Does not return distance vector.
+
     Args:
         universe (:class:`~exatomic.core.universe.Universe`): A universe
-        bonds (bool): Compute bonds as well as distances
-        bond_extra (float): Extra factor to use when determining bonds
         dmax (float): Maximum distance of interest
-        rtol (float): Relative tolerance (float equivalence)
-        atol (float): Absolute tolerance (float equivalence)
-        radii (kwargs): Custom (covalent) radii to use when determining bonds
+        cell_list (bool): Use the linked cell list algorithm
+        workers (int): Number of threads over which frames are distributed
+        dtype (type): Float type of the distances (int32 atom indices for float32)
+        skin (float): Reuse Verlet lists with this skin distance across frames
     """
-    if "rx" not in universe.frame.columns:
-        universe.frame.compute_cell_magnitudes()
-    drs = []
-    atom0s = []
-    atom1s = []
-    prjs = []
-    atom = universe.atom[["x", "y", "z", "frame"]].copy()
-    atom.update(universe.unit_atom)
-    for fdx, group in atom.groupby("frame"):
-        if len(group) > 0:
-            a, b, c = universe.frame.loc[fdx, ["rx", "ry", "rz"]]
-            values = pdist_ortho_nv(group['x'].values.astype(float),
-                                    group['y'].values.astype(float),
-                                    group['z'].values.astype(float),
-                                    a, b, c,
-                                    group.index.values.astype(int), dmax)
-            drs.append(values[0])
-            atom0s.append(values[1])
-            atom1s.append(values[2])
-            prjs.append(values[3])
-    drs = np.concatenate(drs)
-    atom0s = np.concatenate(atom0s)
-    atom1s = np.concatenate(atom1s)
-    prjs = np.concatenate(prjs)
-    return AtomTwo.from_dict({'dr': drs, 'atom0': atom0s, 'atom1': atom1s,
-                              'projection': prjs})
+    return _compute_pdist_ortho(universe, dmax, False, cell_list, workers, dtype, skin)
+
+
+def compute_pdist_tric(universe, dmax=8.0, vector=False, cell_list=False,
+                       workers=1, dtype=np.float64, skin=None):
+    """
+    Compute interatomic distances between atoms in a general (triclinic)
+    periodic cell.
+
+    The cell vectors are read from the frame table (per frame, so variable
+    cell trajectories are supported). Cartesian positions are converted to
+    fractional coordinates and wrapped into the unit cell for all frames at
+    once.
+
+    Args:
+        universe (:class:`~exatomic.core.universe.Universe`): A universe
+        dmax (float): Maximum distance of interest
+        vector (bool): Return distance vector components
+        cell_list (bool): Use the linked cell list algorithm
+        workers (int): Number of threads over which frames are distributed
+        dtype (type): Float type of the distances (int32 atom indices for float32)
+        skin (float): Reuse Verlet lists with this skin distance across frames
+    """
+    (sa, sb, sc), cells, index, frames, bounds = _tric_frames(universe)
+    rmax = float(dmax + skin) if skin else float(dmax)
+    args = []
+    nbins = []
+    for cell, lo, hi in zip(cells, bounds[:-1], bounds[1:]):
+        if cell_list:
+            nbins.append(_tric_nbin(cell, rmax))
+        else:
+            nbins.append(np.ones((3, ), dtype=np.int64))
+        args.append((sa[lo:hi], sb[lo:hi], sc[lo:hi], cell, index[lo:hi],
+                     float(dmax)))
+    if not skin:
+        args = [arg + (nbin, ) for arg, nbin in zip(args, nbins)]
+        return _compute_pairs(_tric_pairs, args, vector, True, workers, dtype)
+
+    def build(f):
+        lo, hi = bounds[f], bounds[f + 1]
+        v = _tric_alloc(sa[lo:hi], sb[lo:hi], sc[lo:hi], cells[f],
+                        np.arange(hi - lo), rmax, nbins[f], False)
+        return v[4], v[5]
+
+    lists = _verlet_lists((sa, sb, sc), cells, bounds, True, skin, build)
+    args = [arg + pairs for arg, pairs in zip(args, lists)]
+    return _compute_pairs(_tric_list_pairs, args, vector, True, workers, dtype)
 
 
 def _compute_bonds(atom, atom_two, bond_extra=0.45, **radii):
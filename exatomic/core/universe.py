@@ -25,6 +25,7 @@ from .field import AtomicField
 from .orbital import Orbital, Excitation, MOMatrix, DensityMatrix
 from .basis import Overlap, BasisSet, BasisSetOrder
 from exatomic.algorithms.orbital import add_molecular_orbitals
+from exatomic.algorithms.angles import compute_angles
 from exatomic.algorithms.basis import BasisFunctions, compute_uncontracted_basis_set_order
 from .tensor import Tensor
 
@@ -32,6 +33,7 @@ class Meta(TypedMeta):
     atom = Atom
     frame = Frame
     atom_two = AtomTwo
+    atom_angle = DataFrame
     unit_atom = UnitAtom
     projected_atom = ProjectedAtom
     visual_atom = VisualAtom
@@ -69,6 +71,7 @@ class Universe(six.with_metaclass(Meta, Container)):
         frame (:class:`~exatomic.core.frame.Frame`): State variables:
         atom (:class:`~exatomic.core.atom.Atom`): (Classical) atomic data (e.g. coordinates)
         atom_two (:class:`~exatomic.core.two.AtomTwo`): Interatomic distances
+        atom_angle (:class:`~pandas.DataFrame`): Bond angles
         molecule (:class:`~exatomic.core.molecule.Molecule`): Molecule information
         orbital (:class:`~exatomic.core.orbital.Orbital`): Molecular orbital information
         momatrix (:class:`~exatomic.core.orbital.MOMatrix`): Molecular orbital coefficient matrix
@@ -146,6 +149,15 @@ class Universe(six.with_metaclass(Meta, Container)):
         """
         _compute_bonds(self.atom, self.atom_two, *args, **kwargs)
 
+    def compute_angles(self, *args, **kwargs):
+        """
+        Compute (bond) angles.
+
+        See Also:
+            :func:`~exatomic.algorithms.angles.compute_angles`
+        """
+        self.atom_angle = compute_angles(self, *args, **kwargs)
+
     def compute_bond_count(self):
         """
         Compute bond counts and attach them to the :class:`~exatomic.atom.Atom` table.
@@ -193,29 +205,39 @@ class Universe(six.with_metaclass(Meta, Container)):
         """Compute an uncontracted basis set order."""
         self.uncontracted_basis_set_order = compute_uncontracted_basis_set_order(self)
 
-    def enumerate_shells(self, frame=0):
+    def enumerate_shells(self, frame=0, flat=False):
         """Extract minimal information from the universe to be used in
         numba-compiled numerical procedures.
 
         .. code-block:: python
 
             pointers, atoms, shells = uni.enumerate_shells()
+            pointers, atoms, shells = uni.enumerate_shells(flat=True)  # ShellArrays
 
         Args:
             frame (int): state of the universe (default 0)
+            flat (bool): return a :class:`~exatomic.algorithms.numerical.ShellArrays`
+                         instead of an array of :class:`~exatomic.algorithms.numerical.Shell`
         """
         atom = self.atom.groupby('frame').get_group(frame)
         if self.meta['program'] not in ['molcas', 'adf', 'nwchem', 'gaussian']:
             print('Warning: Check spherical shell parameter for {} '
                   'molecular orbital generation'.format(self.meta['program']))
-        shls = self.basis_set.shells(self.meta['program'],
-                                     self.meta['spherical'],
-                                     self.meta['gaussian'])
-        grps = shls.groupby('set')
+        args = (self.meta['program'], self.meta['spherical'], self.meta['gaussian'])
+        if flat:
+            shls = self.basis_set.shell_arrays(*args)
+            sets = pd.Series(np.arange(len(shls.L))).groupby(shls.set)
+        else:
+            shls = self.basis_set.shells(*args)
+            sets = shls.groupby('set')
+        grps = {seht: grp.index for seht, grp in sets}
         # Pointers into (xyzs, shls) arrays
-        ptrs = np.array([(c, idx) for c, seht in enumerate(atom.set)
-                                  for idx in grps.get_group(seht).index])
-        return ptrs, atom[['x', 'y', 'z']].values, shls[0].values
+        ptrs = np.array([(c, idx) for c, seht in enumerate(atom.set.astype(np.int64))
+                                  for idx in grps[seht]])
+        xyzs = atom[['x', 'y', 'z']].values
+        if flat:
+            return ptrs, xyzs, shls
+        return ptrs, xyzs, shls[0].values
 
     def add_field(self, field):
         """Adds a field object to the universe.
@@ -261,7 +283,8 @@ class Universe(six.with_metaclass(Meta, Container)):
 
     def add_molecular_orbitals(self, field_params=None, mocoefs=None,
                                vector=None, frame=0, replace=False,
-                               inplace=True, verbose=True, irrep=None):
+                               inplace=True, verbose=True, irrep=None,
+                               screen=None, block=None):
         """Add molecular orbitals to universe.
 
         .. code-block:: python
@@ -284,14 +307,18 @@ class Universe(six.with_metaclass(Meta, Container)):
             inplace (bool): add directly to uni or return :class:`~exatomic.core.field.AtomicField` (default True)
             verbose (bool): print timing statistics (default True)
             irrep (int): irreducible representation
+            screen (float): basis function screening threshold (default None)
+            block (int): grid points per block of basis function evaluation
 
         Warning:
             Default behavior just continually adds fields to the universe.  This can
             affect performance if adding many fields. `replace` modifies this behavior.
 
-        Warning:
-            Specifying very high resolution field parameters, e.g. 'nr' > 100
-            may slow things down and/or crash the kernel.  Use with caution.
+        Note:
+            Basis functions are evaluated on blocks of grid points so memory
+            is bounded by the number of basis functions times the block size
+            (plus the resulting fields); very high resolution field
+            parameters, e.g. 'nr' > 100, may still take a while.
         """
         if not hasattr(self, 'momatrix'):
             raise AttributeError('uni must have momatrix attribute.')
@@ -301,7 +328,20 @@ class Universe(six.with_metaclass(Meta, Container)):
                                       mocoefs=mocoefs, vector=vector,
                                       frame=frame, replace=replace,
                                       inplace=inplace, verbose=verbose,
-                                      irrep=irrep)
+                                      irrep=irrep, screen=screen, block=block)
+
+    def clear_basis_cache(self):
+        """Clear basis function values cached on numerical grids by
+        :meth:`~exatomic.core.universe.Universe.add_molecular_orbitals` and
+        :func:`~exatomic.algorithms.orbital.add_density`.
+
+        Note:
+            The cache is cleared automatically when atomic positions or the
+            basis set change.
+        """
+        cache = getattr(self, '_basis_cache', None)
+        if cache is not None:
+            cache.clear()
 
     def write_cube(self, file_name='output', field_number=0):
         """
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2015-2018, Exa Analytics Development Team
+# Distributed under the terms of the Apache License 2.0
+"""
+Test Helpers
+##################
+Synthetic universes shared by the test suites.
+"""
+import numpy as np
+import pandas as pd
+from exatomic.core.atom import Atom
+from exatomic.core.frame import Frame
+from exatomic.core.universe import Universe
+
+
+def random_universe(cell, nat=150, nframe=3, seed=0, step=None):
+    """
+    Random atoms in a (possibly variable) periodic cell; if step is given,
+    atoms follow a random walk (in fractional coordinates) across frames.
+    """
+    rng = np.random.RandomState(seed)
+    cell = np.asarray(cell, dtype=np.float64).reshape(-1, 3, 3)
+    cell = np.repeat(cell, nframe//len(cell), axis=0)
+    if step is None:
+        frac = rng.rand(nframe*nat, 3)
+    else:
+        frac = rng.rand(1, nat, 3) + np.cumsum(
+            rng.normal(scale=step, size=(nframe, nat, 3)), axis=0)
+        frac = frac.reshape(-1, 3)
+    xyz = np.einsum('ni,nij->nj', frac, np.repeat(cell, nat, axis=0))
+    atom = pd.DataFrame(xyz, columns=['x', 'y', 'z'])
+    atom['symbol'] = rng.choice(['O', 'H'], nframe*nat)
+    atom['frame'] = np.repeat(np.arange(nframe), nat)
+    frame = pd.DataFrame(cell.reshape(-1, 9), columns=["xi", "yi", "zi", "xj",
+                         "yj", "zj", "xk", "yk", "zk"])
+    frame['periodic'] = True
+    frame['atom_count'] = nat
+    return Universe(atom=Atom(atom), frame=Frame(frame))